@@ -0,0 +1,42 @@
+import argparse
+import json
+import time
+
+from app.analysis import DEFAULT_BLUNDER_THRESHOLD, analyze_files, summarize
+from app.utils.helpers import render_nice_message
+
+def analyze():
+    started = time.perf_counter()
+    all_games = []
+    report_file = open(args.report, 'w') if args.report else None
+
+    try:
+        for path, games, hit_rate in analyze_files(args.files, args.depth, args.blunder_threshold, args.tablebase, args.workers):
+            print(f"{path}: {len(games)} GAMES, {hit_rate:.0%} OF POSITIONS ALREADY EVALUATED")
+            all_games.extend(games)
+
+            if report_file:
+                for game_index, names, reports in games:
+                    report_file.write(json.dumps({'file': str(path), 'game': game_index, 'players': names, 'moves': reports}) + "\n")
+    finally:
+        if report_file: report_file.close()
+
+    for player, totals in summarize(all_games).items():
+        print(f"{player}: {totals['moves']} MOVES, MEAN LOSS {totals['mean_loss']:.2f}, {totals['blunders']} BLUNDERS")
+
+    render_nice_message(f"ANALYSED {len(all_games)} GAMES IN {time.perf_counter() - started:.1f} SECONDS")
+
+    return None
+
+
+parser = argparse.ArgumentParser(prog="Knucklebones Analysis", description="Score every move of recorded games against the best column")
+parser.add_argument('files', nargs='+', help='Game record files to analyse')
+parser.add_argument('-d', '--depth', type=int, default=2, help='Search depth for each position (Default: 2)')
+parser.add_argument('--blunder-threshold', type=float, default=DEFAULT_BLUNDER_THRESHOLD, help=f'Expected points lost that count as a blunder (Default: {DEFAULT_BLUNDER_THRESHOLD:g})')
+parser.add_argument('--tablebase', help='Tablebase file, to also report win probability lost where it is solved')
+parser.add_argument('-w', '--workers', type=int, default=1, help='Worker processes (Default: 1)')
+parser.add_argument('--report', help='Write every analysed move to this file as JSON lines, one game per line')
+args = parser.parse_args()
+
+if __name__ == "__main__":
+    analyze()
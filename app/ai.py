@@ -0,0 +1,297 @@
+import time
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+
+from app import bitboard, engine, hashing, policy, solver
+from app.knucklebones import KnucklebonesPlayer
+
+# Computer opponents.
+#
+# Values are expected final score margins from the point of view of the player about to place a die.
+# A finished game adds WIN_BONUS to the margin, so the search prefers a sure win over a bigger lead.
+# Given a time limit, the search deepens one turn at a time and plays the best move of the deepest search
+# that finished, so a move takes about as long on any machine; the difficulty levels are such limits.
+# The transposition table is keyed by canonical position (see app.hashing), so a position reached with
+# its columns in another order is only searched once.
+
+WIN_BONUS = 1000
+DEADLINE_CHECK_INTERVAL = 256 # Decision nodes between looks at the clock.
+
+DIFFICULTIES = {
+    'easy': {'depth': 1, 'time_limit': 0.05},
+    'medium': {'depth': 2, 'time_limit': 0.2},
+    'hard': {'depth': 4, 'time_limit': 0.5},
+    'expert': {'depth': 10, 'time_limit': 2.0},
+}
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class TranspositionTable:
+
+    def __init__(self, max_entries=200000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Look up an entry, marking it as recently used.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        return entry
+
+    def store(self, key, entry):
+        """
+        Add an entry, evicting the least recently used one when the table is full.
+        """
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return None
+
+    def clear(self):
+        self._entries.clear()
+
+        return None
+
+
+def terminal_value(mover_board, opponent_board, win_bonus=WIN_BONUS):
+    """
+    Value of a finished game for the player who just moved.
+    """
+    margin = bitboard.board_score(mover_board) - bitboard.board_score(opponent_board)
+
+    if margin > 0:
+        return margin + win_bonus
+    elif margin < 0:
+        return margin - win_bonus
+
+    return 0
+
+
+class ExpectimaxSearch:
+
+    def __init__(self, depth=3, table=None, win_bonus=WIN_BONUS):
+        self.depth = depth
+        self.win_bonus = win_bonus # 0 makes values plain expected margins.
+        self.table = table if table is not None else TranspositionTable()
+        self.completed_depth = 0
+        self._deadline = None
+        self._nodes = 0
+
+    def best_column(self, mover_board, opponent_board, die_value, depth=None):
+        """
+        Search for the best column to place the die in; returns (column_index, value).
+        """
+        best_column, best_value = None, None
+
+        for column_index, value in self.column_values(mover_board, opponent_board, die_value, depth).items():
+            if best_value is None or value > best_value:
+                best_column, best_value = column_index, value
+
+        return best_column, best_value
+
+    def column_values(self, mover_board, opponent_board, die_value, depth=None):
+        """
+        Search every open column; returns {column_index: value}.
+        """
+        depth = depth or self.depth
+
+        return {
+            column_index: self._move_value(mover_board, opponent_board, column_index, die_value, depth)
+            for column_index in bitboard.open_columns(mover_board)
+        }
+
+    def iterative_best_column(self, mover_board, opponent_board, die_value, time_limit, max_depth=None):
+        """
+        Search one turn deeper at a time until the time limit; returns (column_index, value). Each
+        search tries the columns best first by the last one, so when time runs out part way, any column
+        that beats the previous best at the new depth is still used. Sets completed_depth.
+        """
+        max_depth = max_depth or self.depth
+        deadline = time.perf_counter() + time_limit
+        order = bitboard.open_columns(mover_board)
+        best_column, best_value = None, None
+        self.completed_depth = 0
+
+        for depth in range(1, max_depth + 1):
+            self._deadline = deadline if depth > 1 else None # Always finish depth 1, to have a move.
+            values = {}
+
+            try:
+                for column_index in order:
+                    values[column_index] = self._move_value(mover_board, opponent_board, column_index, die_value, depth)
+            except SearchTimeout:
+                if order[0] in values:
+                    best_column = max(values, key=values.get)
+                    best_value = values[best_column]
+                break
+            finally:
+                self._deadline = None
+
+            order = sorted(values, key=values.get, reverse=True)
+            best_column, best_value = order[0], values[order[0]]
+            self.completed_depth = depth
+
+            if time.perf_counter() >= deadline:
+                break
+
+        return best_column, best_value
+
+    def _move_value(self, mover_board, opponent_board, column_index, die_value, depth):
+        mover_board, opponent_board = bitboard.apply(mover_board, opponent_board, column_index, die_value)
+
+        if bitboard.is_board_full(mover_board):
+            return terminal_value(mover_board, opponent_board, self.win_bonus)
+
+        if depth <= 1:
+            return bitboard.board_score(mover_board) - bitboard.board_score(opponent_board)
+
+        return -self._chance_value(opponent_board, mover_board, depth - 1)
+
+    def _chance_value(self, mover_board, opponent_board, depth):
+        """
+        Average the decision values over every die the mover could roll.
+        """
+        total = 0
+
+        for die_value in engine.DIE_VALUES:
+            total += self._decision_value(mover_board, opponent_board, die_value, depth)
+
+        return total / engine.DIE_FACES
+
+    def _decision_value(self, mover_board, opponent_board, die_value, depth):
+        key = (hashing.canonical_key(mover_board, opponent_board) << 3) | die_value # Equivalent positions share an entry.
+        entry = self.table.get(key)
+
+        if entry is not None and entry[0] >= depth:
+            return entry[1]
+
+        if self._deadline is not None:
+            self._nodes += 1
+            if not self._nodes % DEADLINE_CHECK_INTERVAL and time.perf_counter() >= self._deadline:
+                raise SearchTimeout # Nothing half-searched has been stored, so the table stays sound.
+
+        best_value = None
+        for column_index in bitboard.open_columns(mover_board):
+            value = self._move_value(mover_board, opponent_board, column_index, die_value, depth)
+
+            if best_value is None or value > best_value:
+                best_value = value
+
+        self.table.store(key, (depth, best_value))
+
+        return best_value
+
+
+class BotPlayer(KnucklebonesPlayer, metaclass=ABCMeta):
+
+    __slots__ = ()
+
+    is_human = False
+
+    def set_player_name(self, name=None):
+        """
+        Use the given name, or a default one; a bot never prompts.
+        """
+        return super().set_player_name(name or "Computer")
+
+    def set_board_size(self, columns, rows, faces=engine.DIE_FACES):
+        """
+        Bots search on packed boards, which only hold the standard board.
+        """
+        if (columns, rows, faces) != (engine.COLUMN_COUNT, engine.ROW_COUNT, engine.DIE_FACES):
+            raise ValueError("Computer players only play on the standard 3x3 board with six-sided dice.")
+
+        return super().set_board_size(columns, rows, faces)
+
+    def choose_column(self, die_value, opponent=None):
+        """
+        Pick a column from the packed boards instead of prompting.
+        """
+        opponent_board = bitboard.pack_matrix(opponent.matrix) if opponent else bitboard.EMPTY_BOARD
+        self._current_column = self.pick_column(bitboard.pack_matrix(self.matrix), opponent_board, die_value)
+
+        return None
+
+    @abstractmethod
+    def pick_column(self, mover_board, opponent_board, die_value):
+        """
+        Choose an open column for the die from the packed boards; every bot provides this.
+        """
+
+
+class ExpectimaxPlayer(BotPlayer):
+
+    __slots__ = ('search', 'time_limit')
+
+    def __init__(self, depth=3, table_size=200000, time_limit=None):
+        super().__init__()
+        self.search = ExpectimaxSearch(depth, TranspositionTable(table_size))
+        self.time_limit = time_limit # Seconds per move; depth is then the deepest the search goes.
+
+    def pick_column(self, mover_board, opponent_board, die_value):
+        if self.time_limit is None:
+            column_index, _ = self.search.best_column(mover_board, opponent_board, die_value)
+        else:
+            column_index, _ = self.search.iterative_best_column(mover_board, opponent_board, die_value, self.time_limit)
+
+        return column_index
+
+
+class TablebasePlayer(ExpectimaxPlayer):
+
+    __slots__ = ('tablebase',)
+
+    def __init__(self, tablebase, depth=3, table_size=200000, time_limit=None):
+        super().__init__(depth, table_size, time_limit)
+        self.tablebase = tablebase if isinstance(tablebase, solver.Tablebase) else solver.Tablebase(tablebase)
+
+    def pick_column(self, mover_board, opponent_board, die_value):
+        """
+        Play the solved move when the position is in the tablebase; search otherwise.
+        """
+        result = self.tablebase.lookup(mover_board, opponent_board, die_value)
+
+        if result is None:
+            return super().pick_column(mover_board, opponent_board, die_value)
+
+        return result[1]
+
+
+class OraclePlayer(ExpectimaxPlayer):
+
+    __slots__ = ('policy',)
+
+    def __init__(self, policy_file, depth=3, table_size=200000, time_limit=None):
+        super().__init__(depth, table_size, time_limit)
+        self.policy = policy_file if isinstance(policy_file, policy.PolicyFile) else policy.PolicyFile(policy_file)
+
+    def pick_column(self, mover_board, opponent_board, die_value):
+        """
+        Read the solved move from the policy file; search when the position is not in it. Share one
+        PolicyFile between players, so every game reads the same mapped pages.
+        """
+        column_index = self.policy.lookup(mover_board, opponent_board, die_value)
+
+        if column_index is None or column_index not in bitboard.open_columns(mover_board): # A rare fingerprint clash.
+            return super().pick_column(mover_board, opponent_board, die_value)
+
+        return column_index
@@ -0,0 +1,149 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from app import ai, bitboard, engine, records, solver
+
+# Post-game move analysis.
+#
+# Every recorded move is compared with the best column an expectimax search finds for the same position
+# and die. The loss of a move is how much expected final margin it gave up, searched without the win
+# bonus the computer players add to finished games, so a move that ends the game counts for its points
+# and no more; when a tablebase holds the position, the loss in win probability is reported too. Files
+# are shared out over worker processes, and each worker keeps an LRU cache of evaluated positions, since
+# opening positions repeat across games.
+
+DEFAULT_BLUNDER_THRESHOLD = 10.0
+
+
+class MoveAnalyzer:
+
+    def __init__(self, depth=2, blunder_threshold=DEFAULT_BLUNDER_THRESHOLD, cache_size=500000, tablebase=None):
+        self.search = ai.ExpectimaxSearch(depth, win_bonus=0)
+        self.blunder_threshold = blunder_threshold
+        self.cache = ai.TranspositionTable(cache_size)
+        self.tablebase = solver.Tablebase(tablebase) if isinstance(tablebase, (str, os.PathLike)) else tablebase
+
+    def evaluate(self, mover_board, opponent_board, die_value):
+        """
+        Values of every open column for a position; cached.
+        """
+        key = solver.state_key(mover_board, opponent_board, die_value)
+        values = self.cache.get(key)
+
+        if values is None:
+            values = self.search.column_values(mover_board, opponent_board, die_value)
+            self.cache.store(key, values)
+
+        return values
+
+    def analyze_game(self, game):
+        """
+        Score every move of a recorded game; returns a list of move reports.
+        """
+        boards = [bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD]
+        reports = []
+
+        for ply, move in enumerate(game):
+            player_index, die_value, column_index = records.MOVES[move]
+            mover_board, opponent_board = boards[player_index], boards[1 - player_index]
+
+            values = self.evaluate(mover_board, opponent_board, die_value)
+            best_column = max(values, key=values.get)
+            loss = values[best_column] - values[column_index]
+
+            report = {
+                'ply': ply,
+                'player': player_index,
+                'die': die_value,
+                'column': column_index,
+                'best_column': best_column,
+                'loss': loss,
+                'blunder': loss >= self.blunder_threshold,
+            }
+
+            if self.tablebase is not None:
+                report['win_probability_loss'] = self._win_probability_loss(mover_board, opponent_board, die_value, column_index)
+
+            reports.append(report)
+            boards[player_index], boards[1 - player_index] = bitboard.apply(mover_board, opponent_board, column_index, die_value)
+
+        return reports
+
+    def _win_probability_loss(self, mover_board, opponent_board, die_value, column_index):
+        """
+        Drop in win probability against perfect play, or None when the tablebase lacks the positions.
+        """
+        best = self.tablebase.lookup(mover_board, opponent_board, die_value)
+        if best is None:
+            return None
+
+        new_mover, new_opponent = bitboard.apply(mover_board, opponent_board, column_index, die_value)
+        if bitboard.is_board_full(new_mover):
+            return best[0] - solver.terminal_win_probability(new_mover, new_opponent)
+
+        # After the move it is the opponent's roll; average their chances over the six dice.
+        chances = [self.tablebase.lookup(new_opponent, new_mover, next_die) for next_die in engine.DIE_VALUES]
+        if None in chances:
+            return None
+
+        return best[0] - (1.0 - sum(chance[0] for chance in chances) / len(chances))
+
+
+_analyzers = {} # One analyzer per process and set of options, so its cache carries over from file to file.
+
+
+def analyze_file(path, depth=2, blunder_threshold=DEFAULT_BLUNDER_THRESHOLD, tablebase=None):
+    """
+    Worker entry point; analyse every game in a record file.
+    Returns (path, [(game_index, player names, move reports), ...], share of positions found in the cache);
+    the names are by seat, or None for a game recorded without them.
+    """
+    options = (depth, blunder_threshold, tablebase)
+    analyzer = _analyzers.get(options)
+
+    if analyzer is None:
+        analyzer = _analyzers[options] = MoveAnalyzer(depth, blunder_threshold, tablebase=tablebase)
+
+    hits, misses = analyzer.cache.hits, analyzer.cache.misses
+    games = [(game_index, names, analyzer.analyze_game(game)) for game_index, (names, game) in enumerate(records.iter_named_games(path))]
+    hits, misses = analyzer.cache.hits - hits, analyzer.cache.misses - misses
+
+    return path, games, hits / (hits + misses) if hits + misses else 0.0
+
+def analyze_files(paths, depth=2, blunder_threshold=DEFAULT_BLUNDER_THRESHOLD, tablebase=None, workers=1):
+    """
+    Analyse many record files, across worker processes when workers > 1; yields analyze_file results
+    in the order the paths were given. A tablebase must be given as a path, so each worker can map it.
+    """
+    options = (depth, blunder_threshold, tablebase)
+
+    if workers <= 1:
+        for path in paths:
+            yield analyze_file(path, *options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(analyze_file, paths, *([option] * len(paths) for option in options))
+
+def player_label(names, seat):
+    return names[seat] if names else f"PLAYER {seat + 1}"
+
+def summarize(games):
+    """
+    Per-player totals for a list of (game_index, player names, move reports), keyed by name, or by
+    seat as "PLAYER 1" and "PLAYER 2" for games recorded without names.
+    """
+    summary = {}
+
+    for _, names, reports in games:
+        for report in reports:
+            label = player_label(names, report['player'])
+            totals = summary.setdefault(label, {'moves': 0, 'total_loss': 0.0, 'blunders': 0})
+            totals['moves'] += 1
+            totals['total_loss'] += report['loss']
+            totals['blunders'] += report['blunder']
+
+    for totals in summary.values():
+        totals['mean_loss'] = totals['total_loss'] / totals['moves'] if totals['moves'] else 0.0
+
+    return summary
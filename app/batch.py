@@ -0,0 +1,173 @@
+import numpy as np
+
+from app import engine
+
+# Batch simulation; N games advance together as array operations.
+#
+# Boards are held as an (N, 2, 3, 3) int8 array indexed [game, player, column, row], in the same
+# layout as KnucklebonesPlayer.matrix: each column fills from the last row up, and knocked-out
+# dice let the rest of the column fall back down. Placement, removal and scoring follow the
+# rules in app.engine.
+
+FACE_VALUES = np.arange(1, engine.DIE_FACES + 1, dtype=np.int16)
+
+
+def new_boards(games):
+    return np.zeros((games, 2, engine.COLUMN_COUNT, engine.ROW_COUNT), dtype=np.int8)
+
+def column_scores(boards):
+    """
+    Score every column of an array of boards; the last axis of the result indexes columns.
+    """
+    counts = (boards[..., None] == FACE_VALUES).sum(axis=-2, dtype=np.int16) # [..., column, face]
+
+    return (counts * counts * FACE_VALUES).sum(axis=-1)
+
+def scores(boards):
+    return column_scores(boards).sum(axis=-1)
+
+def legal_columns(boards, to_move):
+    """
+    Open columns of the player to move in every game, as an (N, 3) bool mask.
+    """
+    return boards[np.arange(len(boards)), to_move, :, 0] == 0
+
+def place(mover_boards, columns, dice):
+    """
+    Place dice into the chosen columns of a stack of (k, 3, 3) boards, in place.
+    """
+    games = np.arange(len(mover_boards))
+    open_rows = (mover_boards[games, columns] == 0).sum(axis=1) - 1
+    mover_boards[games, columns, open_rows] = dice
+
+    return None
+
+def remove(opponent_boards, columns, dice):
+    """
+    Knock matching dice out of the chosen columns of a stack of (k, 3, 3) boards, in place.
+    Returns the number of dice removed per game.
+    """
+    games = np.arange(len(opponent_boards))
+    column = opponent_boards[games, columns]
+    removed = (column == dice[:, None]).sum(axis=1)
+    keep = (column != 0) & (column != dice[:, None])
+
+    # A stable sort on the keep flags moves the surviving dice to the bottom, in their original order.
+    order = np.argsort(keep, axis=1, kind='stable')
+    opponent_boards[games, columns] = np.take_along_axis(column, order, axis=1) * np.take_along_axis(keep, order, axis=1)
+
+    return removed
+
+def step(boards, to_move, columns, dice):
+    """
+    Play one move in each game; returns (finished, removed) arrays.
+    """
+    games = np.arange(len(boards))
+    mover_boards = boards[games, to_move]
+    opponent_boards = boards[games, 1 - to_move]
+
+    place(mover_boards, columns, dice)
+    removed = remove(opponent_boards, columns, dice)
+
+    boards[games, to_move] = mover_boards
+    boards[games, 1 - to_move] = opponent_boards
+
+    finished = (mover_boards[:, :, 0] != 0).all(axis=1) # Only the mover's board can have filled up.
+
+    return finished, removed
+
+def random_policy(boards, to_move, dice, legal, rng):
+    """
+    Pick any open column.
+    """
+    return np.argmax(rng.random(legal.shape) * legal, axis=1)
+
+def greedy_policy(boards, to_move, dice, legal, rng):
+    """
+    Pick the column that most improves the score difference right away; ties break at random.
+    """
+    gains = np.full(legal.shape, -np.inf)
+
+    for column_index in range(engine.COLUMN_COUNT):
+        open_games = legal[:, column_index]
+
+        if open_games.any():
+            trial = boards[open_games] # Boolean indexing copies, so the real boards are untouched.
+            trial_to_move = to_move[open_games]
+            step(trial, trial_to_move, np.full(len(trial), column_index), dice[open_games])
+
+            trial_scores = scores(trial).astype(np.int32)
+            trial_games = np.arange(len(trial))
+            gains[open_games, column_index] = trial_scores[trial_games, trial_to_move] - trial_scores[trial_games, 1 - trial_to_move]
+
+    gains += rng.random(gains.shape) * 0.5 # Below one point, so it only separates ties.
+
+    return np.argmax(gains, axis=1)
+
+
+class BatchSimulator:
+
+    def __init__(self, games, policies=(random_policy, random_policy), seed=None):
+        self.games = games
+        self.policies = policies
+        self.rng = np.random.default_rng(seed)
+        self.boards = new_boards(games)
+        self.first_player = self.rng.integers(0, 2, games).astype(np.int8)
+        self.to_move = self.first_player.copy()
+        self.finished = np.zeros(games, dtype=bool)
+        self.plies = np.zeros(games, dtype=np.int16)
+        self.removed = np.zeros(games, dtype=np.int32)
+
+    def step(self):
+        """
+        Roll one die per unfinished game and play the move each policy picks.
+        """
+        active = np.flatnonzero(~self.finished)
+        boards = self.boards[active]
+        to_move = self.to_move[active]
+        dice = self.rng.integers(1, engine.DIE_FACES + 1, len(active)).astype(np.int8)
+        legal = legal_columns(boards, to_move)
+        columns = np.empty(len(active), dtype=np.intp)
+
+        for player in (0, 1):
+            turn = to_move == player
+            if turn.any():
+                columns[turn] = self.policies[player](boards[turn], to_move[turn], dice[turn], legal[turn], self.rng)
+
+        finished, removed = step(boards, to_move, columns, dice)
+
+        self.boards[active] = boards
+        self.finished[active] = finished
+        self.removed[active] += removed
+        self.plies[active] += 1
+        self.to_move[active] = np.where(finished, to_move, 1 - to_move)
+
+        return None
+
+    def run(self):
+        """
+        Play every game to the end; returns the final scores as an (N, 2) array.
+        """
+        while not self.finished.all():
+            self.step()
+
+        return scores(self.boards)
+
+    def summary(self):
+        """
+        Aggregate results of finished games.
+        """
+        final_scores = scores(self.boards)
+        margin = final_scores[:, 0].astype(np.int32) - final_scores[:, 1]
+        first_margin = np.where(self.first_player == 0, margin, -margin)
+
+        return {
+            'games': int(self.games),
+            'player_one_win_rate': float((margin > 0).mean()),
+            'player_two_win_rate': float((margin < 0).mean()),
+            'draw_rate': float((margin == 0).mean()),
+            'first_player_win_rate': float((first_margin > 0).mean()),
+            'mean_margin': float(margin.mean()),
+            'mean_plies': float(self.plies.mean()),
+            'mean_dice_removed': float(self.removed.mean()),
+        }
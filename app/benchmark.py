@@ -0,0 +1,240 @@
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+
+from app import engine, env
+from app.knucklebones import KnucklebonesGame, KnucklebonesPlayer
+from app.rng import DiceStream
+
+# Throughput benchmarks for the hot paths.
+#
+# A benchmark is a factory that sets up its fixtures and returns (function, operations per call); the
+# result is operations per second, the best of a few repeats. Results are saved as JSON baselines, and
+# a run regresses when any benchmark falls more than the threshold below its baseline. Baselines only
+# compare meaningfully on the machine and Python they were recorded with.
+#
+# Footprints are measured the same way, as factories: the bytes each new object holds on to, counted with
+# tracemalloc over many objects, with anything they share with each other built once beforehand.
+
+DEFAULT_THRESHOLD = 0.3
+
+
+class _FirstOpenColumnPlayer(KnucklebonesPlayer):
+
+    is_human = False
+
+    def choose_column(self, die_value, opponent=None):
+        self._current_column = next(i for i, column in enumerate(self.matrix) if not engine.is_column_full(column))
+
+        return None
+
+
+def _player(matrix):
+    player = KnucklebonesPlayer()
+    player.set_player_name('Bench')
+
+    for column_index, column in enumerate(matrix):
+        player.matrix[column_index][:] = column
+        player.update_column_score(column_index)
+
+    return player
+
+def _update_column_score():
+    player = _player([[0, 2, 2], [3, 4, 5], [6, 6, 6]])
+
+    return lambda: player.update_column_score(1), 1
+
+def _remove_from_matrix():
+    player = _player([[0, 4, 4], [3, 4, 5], [0, 0, 6]])
+    column = player.matrix[0]
+
+    def run():
+        column[:] = (0, 4, 4) # Put the knocked out dice back, so every call removes two.
+        player.remove_from_matrix(4, 0)
+        player.remove_from_matrix(1, 1) # And one call that finds nothing, the more common case.
+
+    return run, 2
+
+def _make_unmake_move():
+    player = _player([[0, 0, 3], [0, 4, 5], [0, 0, 6]])
+    opponent = _player([[0, 4, 4], [0, 1, 2], [0, 0, 0]])
+
+    def run():
+        player.unmake_move(player.make_move(4, 0, opponent), opponent) # Knocks out two dice, and puts them back.
+        player.unmake_move(player.make_move(1, 2, opponent), opponent)
+
+    return run, 2
+
+def _is_column_full():
+    player = _player([[1, 2, 3], [0, 4, 5], [0, 0, 0]])
+    player._current_column = 0
+
+    return player.is_column_full, 1
+
+def _check_for_full_matrix():
+    game = KnucklebonesGame(['Bench', 'Mark'])
+    matrix = [[1, 2, 3], [4, 5, 6], [0, 1, 2]]
+
+    return lambda: game.check_for_full_matrix(matrix), 1
+
+def _render_player_matrix():
+    game = KnucklebonesGame(['Bench', 'Mark'])
+    matrix = [[0, 2, 2], [3, 4, 5], [0, 0, 6]]
+
+    return lambda: game._render_player_matrix(matrix), 1
+
+def _headless_game():
+    rng = random.Random(1)
+    policies = [lambda state, die_value: engine.random_policy(state, die_value, rng)] * 2
+    dice = DiceStream(random.Random(2))
+
+    return lambda: engine.play_headless_game(policies, dice=dice), 1
+
+def _game_loop():
+    """
+    Whole games through KnucklebonesGame, with bots on both sides and the output thrown away.
+    """
+    game = KnucklebonesGame(['Bench', 'Mark'], players=[_FirstOpenColumnPlayer(), _FirstOpenColumnPlayer()], rng=random.Random(3))
+    game.renderer.stream = io.StringIO()
+
+    def run():
+        game.renderer.stream.seek(0)
+        game.renderer.stream.truncate()
+
+        with contextlib.redirect_stdout(game.renderer.stream):
+            for player in game.players: player.set_player_board()
+            game.play_game()
+
+    return run, 1
+
+def _env_step():
+    """
+    Moves through the vectorized environment, a batch of games at a time, always in the first open column.
+    """
+    knucklebones_env = env.KnucklebonesEnv(seed=4)
+    knucklebones_env.reset(1024)
+
+    def run():
+        knucklebones_env.step(knucklebones_env.legal.argmax(axis=1))
+
+    return run, 1024
+
+BENCHMARKS = {
+    'update_column_score': _update_column_score,
+    'remove_from_matrix': _remove_from_matrix,
+    'make_unmake_move': _make_unmake_move,
+    'is_column_full': _is_column_full,
+    'check_for_full_matrix': _check_for_full_matrix,
+    '_render_player_matrix': _render_player_matrix,
+    'headless_game': _headless_game,
+    'game_loop': _game_loop,
+    'env_step': _env_step,
+}
+
+
+def _drawn_game():
+    """
+    A game between turns: both boards half full and drawn once, as a server would hold it.
+    """
+    game = KnucklebonesGame(['Bench', 'Mark'])
+    game.renderer.stream = io.StringIO()
+
+    for player in game.players:
+        for column_index in range(engine.COLUMN_COUNT): player.place_die(column_index + 1, column_index)
+
+    game.draw_grid()
+    game.renderer.stream = None
+
+    return game
+
+FOOTPRINTS = {
+    'player': KnucklebonesPlayer,
+    'game': lambda: KnucklebonesGame(['Bench', 'Mark']),
+    'drawn_game': _drawn_game,
+    'state': engine.KnucklebonesState,
+}
+
+
+def measure_footprint(factory, count=1000):
+    """
+    Bytes held per object, averaged over count objects built by the factory.
+    """
+    factory() # Fill any shared caches first, so they are not charged to the objects.
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing: tracemalloc.start()
+
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [factory() for _ in range(count)]
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if not tracing: tracemalloc.stop()
+
+    return (held - sys.getsizeof(objects)) / len(objects)
+
+def measure_footprints(names=None, count=1000):
+    """
+    Measure the named footprints, or all of them; returns {name: bytes per object}.
+    """
+    return {footprint_name: measure_footprint(FOOTPRINTS[footprint_name], count) for footprint_name in names or FOOTPRINTS}
+
+def measure(function, operations=1, min_time=0.2, repeats=3):
+    """
+    Operations per second; the best of several timed runs of at least min_time seconds each.
+    """
+    timer = timeit.Timer(function)
+    number = 1
+
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / elapsed * 1.1)) if elapsed > 0 else number * 10
+
+    best = elapsed
+    for _ in range(repeats - 1):
+        best = min(best, timer.timeit(number))
+
+    return number * operations / best
+
+def run_benchmarks(names=None, min_time=0.2, repeats=3):
+    """
+    Run the named benchmarks, or all of them; returns {name: operations per second}.
+    """
+    results = {}
+
+    for benchmark_name in names or BENCHMARKS:
+        function, operations = BENCHMARKS[benchmark_name]()
+        results[benchmark_name] = measure(function, operations, min_time, repeats)
+
+    return results
+
+def environment():
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(), 'machine': platform.machine()}
+
+def save_baseline(path, results):
+    with open(path, 'w') as baseline_file:
+        json.dump({'environment': environment(), 'results': results}, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write("\n")
+
+    return None
+
+def load_baseline(path):
+    with open(path) as baseline_file:
+        return json.load(baseline_file)['results']
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare results with a baseline; returns [(name, result, baseline, ratio), ...] for every benchmark
+    both contain, and the names of those that fell more than the threshold below their baseline.
+    """
+    rows = [(name, result, baseline[name], result / baseline[name]) for name, result in results.items() if name in baseline]
+    regressions = [name for name, _, _, ratio in rows if ratio < 1.0 - threshold]
+
+    return rows, regressions
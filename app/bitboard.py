@@ -0,0 +1,137 @@
+from app import engine
+
+# Compact board encoding for simulation and search.
+#
+# A column (top, middle, bottom) is packed into one base-7 integer, top * 49 + middle * 7 + bottom,
+# so every column fits in 9 bits; a board is three of those side by side in one int.
+# Scoring, placement and removal for every column and die value are precomputed below,
+# which turns each move into a handful of table lookups with no allocation.
+
+COLUMN_BITS = 9
+COLUMN_MASK = (1 << COLUMN_BITS) - 1
+COLUMN_SHIFTS = tuple(i * COLUMN_BITS for i in range(engine.COLUMN_COUNT))
+COLUMN_STATES = (engine.DIE_FACES + 1) ** engine.ROW_COUNT # 343 packed columns.
+FULL_COLUMN_MIN = (engine.DIE_FACES + 1) ** (engine.ROW_COUNT - 1) # The top die is set from here up.
+EMPTY_BOARD = 0
+
+
+def pack_column(column):
+    code = 0
+
+    for value in column:
+        code = code * (engine.DIE_FACES + 1) + value
+
+    return code
+
+def unpack_column(code):
+    column = []
+
+    for _ in range(engine.ROW_COUNT):
+        code, value = divmod(code, engine.DIE_FACES + 1)
+        column.append(value)
+
+    column.reverse()
+
+    return column
+
+def _build_tables():
+    """
+    Precompute the score of every column, and the column left behind by every placement and removal.
+    Placement and removal tables are indexed by (code << 3) | die_value.
+    """
+    scores = [0] * COLUMN_STATES
+    placements = [-1] * (COLUMN_STATES << 3)
+    removals = [0] * (COLUMN_STATES << 3)
+    removed_counts = [0] * (COLUMN_STATES << 3)
+
+    for code in range(COLUMN_STATES):
+        column = unpack_column(code)
+        scores[code] = engine.score_column(column)
+        settled = not any(column[:column.count(0)]) # Dice sit at the bottom with no gaps below them.
+
+        for die_value in range(1, engine.DIE_FACES + 1):
+            index = (code << 3) | die_value
+
+            if settled and not engine.is_column_full(column):
+                placed = column[:]
+                engine.place_die(placed, die_value)
+                placements[index] = pack_column(placed)
+
+            remaining = column[:]
+            removed_counts[index] = engine.remove_die_value(remaining, die_value)
+            removals[index] = pack_column(remaining)
+
+    return tuple(scores), tuple(placements), tuple(removals), tuple(removed_counts)
+
+COLUMN_SCORE, COLUMN_PLACE, COLUMN_REMOVE, COLUMN_REMOVED_COUNT = _build_tables()
+
+
+def pack_matrix(matrix):
+    """
+    Pack a list-of-columns board, as held by KnucklebonesPlayer.matrix, into one int.
+    """
+    board = 0
+
+    for shift, column in zip(COLUMN_SHIFTS, matrix):
+        board |= pack_column(column) << shift
+
+    return board
+
+def unpack_board(board):
+    return [unpack_column((board >> shift) & COLUMN_MASK) for shift in COLUMN_SHIFTS]
+
+def column_code(board, column_index):
+    return (board >> COLUMN_SHIFTS[column_index]) & COLUMN_MASK
+
+def board_score(board):
+    return (COLUMN_SCORE[board & COLUMN_MASK]
+            + COLUMN_SCORE[(board >> 9) & COLUMN_MASK]
+            + COLUMN_SCORE[(board >> 18) & COLUMN_MASK])
+
+def is_board_full(board):
+    return ((board & COLUMN_MASK) >= FULL_COLUMN_MIN
+            and ((board >> 9) & COLUMN_MASK) >= FULL_COLUMN_MIN
+            and (board >> 18) >= FULL_COLUMN_MIN)
+
+def open_columns(board):
+    """
+    Column indices that can still accept a die.
+    """
+    return [i for i, shift in enumerate(COLUMN_SHIFTS) if ((board >> shift) & COLUMN_MASK) < FULL_COLUMN_MIN]
+
+def place(board, column_index, die_value):
+    """
+    Return the board with a die added to the column; the column must not be full.
+    """
+    shift = COLUMN_SHIFTS[column_index]
+    code = (board >> shift) & COLUMN_MASK
+    placed = COLUMN_PLACE[(code << 3) | die_value]
+
+    if placed < 0:
+        raise ValueError("Cannot place a die in a full column.")
+
+    return board ^ ((code ^ placed) << shift)
+
+def remove(board, column_index, die_value):
+    """
+    Return the board with every die of the given value knocked out of the column.
+    """
+    shift = COLUMN_SHIFTS[column_index]
+    code = (board >> shift) & COLUMN_MASK
+
+    return board ^ ((code ^ COLUMN_REMOVE[(code << 3) | die_value]) << shift)
+
+def apply(mover_board, opponent_board, column_index, die_value):
+    """
+    Play one move; returns the new (mover_board, opponent_board) pair.
+    """
+    return place(mover_board, column_index, die_value), remove(opponent_board, column_index, die_value)
+
+def from_state(state):
+    """
+    Pack an engine.KnucklebonesState; returns (board_one, board_two, player_to_move).
+    """
+    return pack_matrix(state.matrices[0]), pack_matrix(state.matrices[1]), state.player_to_move
+
+def to_state(board_one, board_two, player_to_move=0):
+    return engine.KnucklebonesState([unpack_board(board_one), unpack_board(board_two)], player_to_move)
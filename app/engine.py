@@ -0,0 +1,181 @@
+import random
+
+# Headless game rules. Nothing in this module reads input or prints output, so it can
+# drive the command line game, bots and bulk simulations alike.
+#
+# The standard game has three columns of three dice with six faces, but the rules work for any number of
+# columns, rows and faces. The packed boards of app.bitboard, and everything built on them, only cover
+# the standard game.
+
+COLUMN_COUNT = 3
+ROW_COUNT = 3
+DIE_FACES = 6
+DIE_VALUES = tuple(range(1, DIE_FACES + 1))
+
+
+def new_matrix(columns=COLUMN_COUNT, rows=ROW_COUNT):
+    """
+    Build an empty board; a list of columns, each filled from the last index up.
+    """
+    return [[0] * rows for _ in range(columns)]
+
+def score_column(column, faces=DIE_FACES):
+    """
+    Score a column; every value counts (value * occurrences) * occurrences.
+    Counting first keeps this linear in the column height: each die adds value * occurrences.
+    """
+    counts = [0] * (faces + 1)
+    for value in column:
+        counts[value] += 1
+
+    total = 0
+    for value in column:
+        total += value * counts[value]
+
+    return total
+
+def is_column_full(column):
+    """
+    Check if a column can no longer accept a die.
+    """
+    return column[0] != 0 # Columns fill from the bottom, so the first index is filled last.
+
+def is_matrix_full(matrix):
+    """
+    Check if every column of a board is full.
+    """
+    for column in matrix:
+        if column[0] == 0: return False
+
+    return True
+
+def place_die(column, die_value):
+    """
+    Put a die in the highest open index of a column.
+    """
+    open_index = column.count(0) - 1
+
+    if open_index < 0 or column[open_index] != 0:
+        raise ValueError("Cannot place a die in a full column.")
+
+    column[open_index] = die_value
+
+    return None
+
+def remove_die_value(column, die_value):
+    """
+    Knock every die of the given value out of a column, in place.
+    Returns the number of dice removed.
+    """
+    removed = column.count(die_value)
+
+    if removed:
+        remaining = [n for n in column if n and n != die_value]
+        column[:] = [0] * (len(column) - len(remaining)) + remaining
+
+    return removed
+
+
+class KnucklebonesState:
+
+    __slots__ = ('faces', 'matrices', 'column_scores', 'open_cells', 'player_to_move', '_terminal')
+
+    def __init__(self, matrices=None, player_to_move=0, columns=COLUMN_COUNT, rows=ROW_COUNT, faces=DIE_FACES):
+        if matrices is None:
+            matrices = [new_matrix(columns, rows), new_matrix(columns, rows)]
+
+        self.faces = faces
+        self.matrices = matrices
+        self.column_scores = [[score_column(column, faces) for column in matrix] for matrix in matrices]
+        self.open_cells = [sum(column.count(0) for column in matrix) for matrix in matrices] # Kept up to date by apply.
+        self.player_to_move = player_to_move
+        self._terminal = not self.open_cells[0] or not self.open_cells[1]
+
+    @property
+    def scores(self):
+        return (sum(self.column_scores[0]), sum(self.column_scores[1]))
+
+    @property
+    def winner(self):
+        """
+        Index of the winning player, or None for a draw or an unfinished game.
+        """
+        if not self._terminal:
+            return None
+
+        first, second = self.scores
+        if first == second:
+            return None
+
+        return 0 if first > second else 1
+
+    def is_terminal(self):
+        return self._terminal
+
+    def legal_moves(self):
+        """
+        Columns the player to move may place a die in.
+        """
+        return [i for i, column in enumerate(self.matrices[self.player_to_move]) if column[0] == 0]
+
+    def apply(self, die_value, column_index):
+        """
+        Place a die for the player to move, knock matching dice out of the opponent's column,
+        and pass the turn. Returns the number of opponent dice removed.
+        """
+        if self._terminal:
+            raise ValueError("The game is already over.")
+
+        mover = self.player_to_move
+        opponent = 1 - mover
+        column = self.matrices[mover][column_index]
+
+        place_die(column, die_value)
+        self.column_scores[mover][column_index] = score_column(column, self.faces)
+        self.open_cells[mover] -= 1
+
+        opponent_column = self.matrices[opponent][column_index]
+        removed = remove_die_value(opponent_column, die_value)
+        if removed:
+            self.column_scores[opponent][column_index] = score_column(opponent_column, self.faces)
+            self.open_cells[opponent] += removed
+
+        # Only the mover's board can have filled up; dice are never added to the opponent's.
+        self._terminal = not self.open_cells[mover]
+        self.player_to_move = opponent
+
+        return removed
+
+    def copy(self):
+        state = KnucklebonesState.__new__(KnucklebonesState)
+        state.faces = self.faces
+        state.matrices = [[column[:] for column in matrix] for matrix in self.matrices]
+        state.column_scores = [scores[:] for scores in self.column_scores]
+        state.open_cells = self.open_cells[:]
+        state.player_to_move = self.player_to_move
+        state._terminal = self._terminal
+
+        return state
+
+
+def random_policy(state, die_value, rng=random):
+    """
+    Pick any open column.
+    """
+    return rng.choice(state.legal_moves())
+
+def play_headless_game(policies, rng=random, first_player=0, dice=None, columns=COLUMN_COUNT, rows=ROW_COUNT, faces=DIE_FACES):
+    """
+    Play a full game between two policies without any input or output.
+    A policy is a callable taking the state and the rolled die value, returning a column index.
+    Dice come from rng, unless an iterable of pre-rolled dice is given.
+    """
+    state = KnucklebonesState(player_to_move=first_player, columns=columns, rows=rows, faces=faces)
+    rolls = iter(dice) if dice is not None else iter(lambda: rng.randint(1, state.faces), None)
+
+    while not state.is_terminal():
+        die_value = next(rolls)
+        column_index = policies[state.player_to_move](state, die_value)
+        state.apply(die_value, column_index)
+
+    return state
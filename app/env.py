@@ -0,0 +1,116 @@
+import numpy as np
+
+from app import batch, engine
+
+# Vectorized environment for training placement policies with self-play.
+#
+# N games step together, with the same rules as app.batch and nothing held per game but array rows.
+# Every game is seen from the player about to move: an observation is one int8 row of
+#   cells 0-8    the mover's board, column by column, in the layout of KnucklebonesPlayer.matrix
+#   cells 9-17   the opponent's board, likewise
+#   cell 18      the die the mover has to place
+# and an action is the column to place it in, 0-2 for L, M and R. The boards live inside the
+# observation buffer and are swapped round after every move, so building an observation is one copy.
+# A move's reward is how much it changed the mover's lead (their score less their opponent's), so a
+# move that knocks out dice is rewarded for the points it takes away as well as the points it adds.
+# Finished games start again at once, and step() reports each one's final margin for the player who
+# made the last move.
+
+BOARD_CELLS = engine.COLUMN_COUNT * engine.ROW_COUNT
+OBSERVATION_SIZE = 2 * BOARD_CELLS + 1
+DIE_CELL = OBSERVATION_SIZE - 1
+CELL_VALUES = engine.DIE_FACES + 1
+CELL_WEIGHTS = CELL_VALUES ** np.arange(engine.ROW_COUNT - 1, -1, -1) # A column's cells read as a base-7 number.
+
+
+def _build_column_scores():
+    """
+    Score of every possible column, indexed by its cells as a base-7 number; looking scores up here
+    is several times faster than counting faces across the batch.
+    """
+    codes = np.arange(CELL_VALUES ** engine.ROW_COUNT)
+    columns = (codes[:, None] // CELL_WEIGHTS) % CELL_VALUES
+
+    return batch.column_scores(columns[:, None, :].astype(np.int8))[:, 0].astype(np.int16)
+
+COLUMN_SCORES = _build_column_scores()
+
+
+def board_scores(boards):
+    """
+    Scores of an (N, 2, 3, 3) array of boards, as an (N, 2) array.
+    """
+    return COLUMN_SCORES[boards @ CELL_WEIGHTS].sum(axis=-1, dtype=np.int32)
+
+
+class KnucklebonesEnv:
+
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.games = 0
+        self.reset(0)
+
+    @property
+    def legal(self):
+        """
+        Open columns of the player to move in every game, as an (N, 3) bool mask.
+        """
+        return self.boards[:, 0, :, 0] == 0
+
+    def reset(self, games, seed=None):
+        """
+        Start a batch of games; returns the observations and an info dict of legal masks and seats.
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+
+        self.games = games
+        self._observations = np.zeros((games, OBSERVATION_SIZE), dtype=np.int8)
+        self.boards = self._observations[:, :DIE_CELL].reshape(games, 2, engine.COLUMN_COUNT, engine.ROW_COUNT) # A view, not a copy.
+        self.dice = self._observations[:, DIE_CELL]
+        self.to_move = self.rng.integers(0, 2, games).astype(np.int8) # Seat of the player to move, 0 or 1.
+        self._lead = np.zeros(games, dtype=np.int32) # The mover's lead before their move.
+
+        self.dice[:] = self.rng.integers(1, engine.DIE_FACES + 1, games)
+
+        return self._observations.copy(), {'legal': self.legal, 'to_move': self.to_move.copy()}
+
+    def step(self, actions):
+        """
+        Place every game's die in the chosen columns; returns (observations, rewards, dones, info).
+        The info dict holds the legal masks and seats for the next moves, and final_margin, which
+        is meaningful only where a game is done.
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+
+        if actions.shape != (self.games,):
+            raise ValueError(f"Expected {self.games} actions, got an array of shape {actions.shape}.")
+
+        games = np.arange(self.games)
+        in_range = ((actions >= 0) & (actions < engine.COLUMN_COUNT)).all()
+        if not (in_range and self.legal[games, actions].all()):
+            raise ValueError("Every action must be an open column of the player to move.")
+
+        boards = self.boards
+        batch.place(boards[:, 0], actions, self.dice)
+        batch.remove(boards[:, 1], actions, self.dice)
+
+        scores = board_scores(boards)
+        lead = scores[:, 0] - scores[:, 1]
+        rewards = (lead - self._lead).astype(np.float32)
+        dones = (boards[:, 0, :, 0] != 0).all(axis=1) # Only the mover's board can have filled up.
+
+        boards[:] = boards[:, ::-1].copy() # Hand every game over to the other player.
+        self._lead[:] = -lead
+        self.to_move ^= 1
+
+        if dones.any():
+            boards[dones] = 0
+            self._lead[dones] = 0
+            self.to_move[dones] = self.rng.integers(0, 2, int(dones.sum()))
+
+        self.dice[:] = self.rng.integers(1, engine.DIE_FACES + 1, self.games)
+
+        info = {'legal': self.legal, 'to_move': self.to_move.copy(), 'final_margin': np.where(dones, lead, 0)}
+
+        return self._observations.copy(), rewards, dones, info
@@ -0,0 +1,85 @@
+import time
+from collections import namedtuple
+
+# Structured events and phase timing for the game loop.
+#
+# KnucklebonesGame owns an EventHooks and emits through it at each step of a turn. The game checks the
+# `listening` flag before building an event, so with nobody subscribed an emission costs one attribute
+# lookup. A PhaseTimer, when attached, adds up the time spent in each phase of a turn.
+
+GAME_START = 'game_start'
+ROLL = 'roll'
+PLACEMENT = 'placement'
+REMOVAL = 'removal'
+SCORE_CHANGE = 'score_change'
+GAME_END = 'game_end'
+EVENTS = (GAME_START, ROLL, PLACEMENT, REMOVAL, SCORE_CHANGE, GAME_END)
+
+Event = namedtuple('Event', ['name', 'game_number', 'player', 'data'])
+
+
+class EventHooks:
+
+    def __init__(self):
+        self._subscribers = {event_name: [] for event_name in EVENTS}
+        self.listening = False
+
+    def subscribe(self, callback, event_names=EVENTS):
+        """
+        Call back with every Event of the given names; returns the callback, so this works as a decorator.
+        """
+        for event_name in event_names:
+            if event_name not in self._subscribers:
+                raise ValueError(f"{event_name} is not a game event.")
+
+            self._subscribers[event_name].append(callback)
+
+        self.listening = True
+
+        return callback
+
+    def unsubscribe(self, callback):
+        for subscribers in self._subscribers.values():
+            while callback in subscribers:
+                subscribers.remove(callback)
+
+        self.listening = any(self._subscribers.values())
+
+        return None
+
+    def emit(self, event_name, game_number, player=None, **data):
+        subscribers = self._subscribers[event_name]
+
+        if subscribers:
+            event = Event(event_name, game_number, player, data)
+            for callback in subscribers:
+                callback(event)
+
+        return None
+
+
+class PhaseTimer:
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.totals = {}
+        self.counts = {}
+
+    def lap(self, phase, started):
+        """
+        Add the time since started to a phase; returns now, to start the next phase from.
+        """
+        now = self.clock()
+        self.totals[phase] = self.totals.get(phase, 0.0) + (now - started)
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+        return now
+
+    def mean(self, phase):
+        return self.totals[phase] / self.counts[phase] if self.counts.get(phase) else 0.0
+
+    def reset(self):
+        self.totals.clear()
+        self.counts.clear()
+
+        return None
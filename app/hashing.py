@@ -0,0 +1,123 @@
+import random
+
+from app import bitboard, engine
+
+# Canonical position keys and incremental hashing.
+#
+# Two positions play out the same whenever
+#   * the dice in a column are in another order, since scoring and removal only count them; or
+#   * the column pairs are in another order, each of the mover's columns moving with the opponent's
+#     column at the same index, since columns only ever interact across a pair.
+# So each column reduces to one of 84 classes (its dice, sorted), each column pair to one of 84 * 84
+# pair classes, and a position to the sorted set of its three pair classes, merging up to six column
+# orders and every order of dice within them into one key.
+#
+# canonical_key turns packed boards into that set, as an exact integer, with a few table lookups and
+# a three-element sorting network; it keys the same positions together as solver.canonical_position,
+# without building the canonical boards. PositionHash keeps a Zobrist-style hash of the boards held by
+# two KnucklebonesPlayer.matrix lists: every pair class has a random 64-bit key, and a position hashes
+# to the sum of its pair keys. A sum does not depend on the order of the pairs, so the hash is already
+# canonical, and unlike an XOR two equal pairs do not cancel out. A move only changes one column pair,
+# so the hash is updated by swapping that pair's key, and never recomputed.
+
+HASH_MASK = 0xFFFFFFFFFFFFFFFF
+ZOBRIST_SEED = 0x4B6E75636B6C65 # Fixed, so hashes are the same from run to run.
+
+
+def _build_column_classes():
+    classes, table = {}, []
+
+    for code in range(bitboard.COLUMN_STATES):
+        table.append(classes.setdefault(tuple(sorted(bitboard.unpack_column(code))), len(classes)))
+
+    return tuple(table), len(classes)
+
+COLUMN_CLASS, COLUMN_CLASSES = _build_column_classes() # Packed column code to its class, 0-83.
+PAIR_CLASSES = COLUMN_CLASSES * COLUMN_CLASSES
+MOVER_PAIR_CLASS = tuple(column_class * COLUMN_CLASSES for column_class in COLUMN_CLASS)
+
+
+def _build_pair_keys():
+    rng = random.Random(ZOBRIST_SEED)
+
+    return tuple(rng.getrandbits(64) for _ in range(PAIR_CLASSES))
+
+PAIR_KEYS = _build_pair_keys()
+
+
+def canonical_key(mover_board, opponent_board):
+    """
+    Exact key of a position, the same for every position it is equivalent to; under 2**39.
+    """
+    mask = bitboard.COLUMN_MASK
+    a = MOVER_PAIR_CLASS[mover_board & mask] + COLUMN_CLASS[opponent_board & mask]
+    b = MOVER_PAIR_CLASS[(mover_board >> 9) & mask] + COLUMN_CLASS[(opponent_board >> 9) & mask]
+    c = MOVER_PAIR_CLASS[mover_board >> 18] + COLUMN_CLASS[opponent_board >> 18]
+
+    if a > b: a, b = b, a
+    if b > c: b, c = c, b
+    if a > b: a, b = b, a
+
+    return (c * PAIR_CLASSES + b) * PAIR_CLASSES + a
+
+def pair_class(mover_column, opponent_column):
+    """
+    Class of a column pair, from two columns as held in KnucklebonesPlayer.matrix.
+    """
+    return MOVER_PAIR_CLASS[bitboard.pack_column(mover_column)] + COLUMN_CLASS[bitboard.pack_column(opponent_column)]
+
+def position_hash(mover_matrix, opponent_matrix):
+    """
+    Zobrist-style hash of a position, from two boards as held in KnucklebonesPlayer.matrix.
+    """
+    return sum(PAIR_KEYS[pair_class(mover_column, opponent_column)] for mover_column, opponent_column in zip(mover_matrix, opponent_matrix)) & HASH_MASK
+
+
+class PositionHash:
+
+    def __init__(self, player, opponent):
+        for board_player in (player, opponent):
+            if (board_player.rows, board_player.faces) != (engine.ROW_COUNT, engine.DIE_FACES):
+                raise ValueError("Position hashing only covers columns of three six-sided dice.")
+
+        self.players = (player, opponent)
+        self.refresh()
+
+    def refresh(self):
+        """
+        Hash both boards from scratch.
+        """
+        player, opponent = self.players
+        self._pairs = [pair_class(*columns) for columns in zip(player.matrix, opponent.matrix)]
+        self._hashes = [
+            sum(PAIR_KEYS[pair] for pair in self._pairs) & HASH_MASK,
+            sum(PAIR_KEYS[self._swapped(pair)] for pair in self._pairs) & HASH_MASK
+        ]
+
+        return None
+
+    def update(self, column_index):
+        """
+        Account for a change to either board's column, as after make_move or unmake_move.
+        """
+        player, opponent = self.players
+        old_pair = self._pairs[column_index]
+        new_pair = pair_class(player.matrix[column_index], opponent.matrix[column_index])
+
+        if new_pair != old_pair:
+            self._pairs[column_index] = new_pair
+            self._hashes[0] = (self._hashes[0] - PAIR_KEYS[old_pair] + PAIR_KEYS[new_pair]) & HASH_MASK
+            self._hashes[1] = (self._hashes[1] - PAIR_KEYS[self._swapped(old_pair)] + PAIR_KEYS[self._swapped(new_pair)]) & HASH_MASK
+
+        return None
+
+    def hash_for(self, player):
+        """
+        Hash of the position seen from the given player, as the player about to move.
+        """
+        return self._hashes[self.players.index(player)]
+
+    def _swapped(self, pair):
+        mover_class, opponent_class = divmod(pair, COLUMN_CLASSES)
+
+        return opponent_class * COLUMN_CLASSES + mover_class
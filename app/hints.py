@@ -0,0 +1,290 @@
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app import bitboard, engine, solver
+from app.ai import ExpectimaxSearch, TranspositionTable
+
+# Move hints over HTTP.
+#
+#   POST /evaluate   {"mover": board, "opponent": board, "die": 4}, or {"positions": [position, ...]}
+#                    A board is a list of columns as in KnucklebonesPlayer.matrix, e.g. [[0, 0, 3], [0, 2, 5], [0, 0, 0]].
+#                    Answers {"column": "L", "column_index": 0, "value": 3.5, "values": {"L": 3.5, ...}} for
+#                    each position, or {"results": [...]} for many; values are as in app.ai.
+#   GET /metrics     Request, batch and cache counts.
+#
+# Request threads only parse and queue positions. One evaluator thread takes everything queued within a
+# short window as one batch, evaluates each distinct position in it once, and hands the answers back; so a
+# burst of requests for the same position costs one search. Answers are kept in an LRU cache keyed by
+# canonical position (see solver.canonical_position), so positions that differ only in the order of their
+# columns share an entry, and each answer is mapped back to the columns as the caller sent them.
+
+COLUMN_NAMES = 'LMR'
+MAX_BODY_BYTES = 1 << 20
+MAX_POSITIONS = 1000
+
+
+class PositionError(ValueError):
+    pass
+
+
+def parse_board(board):
+    """
+    Check a board as held in KnucklebonesPlayer.matrix, and pack it.
+    """
+    if not isinstance(board, list) or len(board) != engine.COLUMN_COUNT:
+        raise PositionError(f"A board must be a list of {engine.COLUMN_COUNT} columns.")
+
+    for column in board:
+        if (not isinstance(column, list) or len(column) != engine.ROW_COUNT
+                or not all(type(value) is int and 0 <= value <= engine.DIE_FACES for value in column)):
+            raise PositionError(f"A column must be a list of {engine.ROW_COUNT} dice from 0 to {engine.DIE_FACES}.")
+
+        if any(column[:column.count(0)]):
+            raise PositionError("Columns fill from the last index up, with no gaps.")
+
+    return bitboard.pack_matrix(board)
+
+def parse_position(position):
+    """
+    Check a position; returns (mover_board, opponent_board, die_value), packed.
+    """
+    if not isinstance(position, dict):
+        raise PositionError("A position must be an object with mover, opponent and die.")
+
+    die_value = position.get('die')
+    if type(die_value) is not int or not 1 <= die_value <= engine.DIE_FACES:
+        raise PositionError(f"The die must be from 1 to {engine.DIE_FACES}.")
+
+    mover_board = parse_board(position.get('mover'))
+    opponent_board = parse_board(position.get('opponent'))
+
+    if not bitboard.open_columns(mover_board):
+        raise PositionError("The mover's board is full; the game is over.")
+
+    return mover_board, opponent_board, die_value
+
+
+class _Request:
+
+    def __init__(self, positions):
+        self.positions = positions
+        self.results = None
+        self.done = threading.Event()
+
+
+class MoveEvaluator:
+
+    def __init__(self, depth=3, cache_size=100000, table_size=500000, batch_size=256, batch_window=0.002):
+        self.search = ExpectimaxSearch(depth, TranspositionTable(table_size))
+        self.cache = TranspositionTable(cache_size) # Canonical state key to {canonical column: value}.
+        self.batch_size = batch_size # Positions in a batch, after which it is evaluated without waiting.
+        self.batch_window = batch_window # Seconds a batch waits for more requests to join it.
+        self.requests = 0
+        self.positions = 0
+        self.batches = 0
+        self.coalesced = 0 # Positions answered by another copy of themselves in the same batch.
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='move-evaluator', daemon=True)
+        self._thread.start()
+
+        return None
+
+    def close(self):
+        if self._thread:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+        return None
+
+    def evaluate(self, positions):
+        """
+        Queue packed (mover_board, opponent_board, die_value) positions for the next batch, and wait for
+        their results.
+        """
+        request = _Request(positions)
+        self._queue.put(request)
+        request.done.wait()
+
+        return request.results
+
+    def evaluate_batch(self, positions):
+        """
+        Evaluate positions right away, each distinct one once; returns a result dict per position.
+        """
+        answers = {}
+        results = []
+
+        for mover_board, opponent_board, die_value in positions:
+            mover, opponent, order = solver.canonical_position(mover_board, opponent_board)
+            key = solver.state_key(mover, opponent, die_value)
+
+            if key in answers:
+                self.coalesced += 1
+                values = answers[key]
+            else:
+                values = self.cache.get(key)
+                if values is None:
+                    values = self.search.column_values(mover, opponent, die_value)
+                    self.cache.store(key, values)
+                answers[key] = values
+
+            results.append(self._result(values, order))
+
+        self.positions += len(positions)
+        self.batches += 1
+
+        return results
+
+    def metrics(self):
+        lookups = self.cache.hits + self.cache.misses
+
+        return {
+            'requests': self.requests,
+            'positions': self.positions,
+            'batches': self.batches,
+            'mean_batch_size': self.positions / self.batches if self.batches else 0.0,
+            'coalesced': self.coalesced,
+            'cache_entries': len(self.cache),
+            'cache_hits': self.cache.hits,
+            'cache_misses': self.cache.misses,
+            'cache_hit_rate': self.cache.hits / lookups if lookups else 0.0,
+        }
+
+    def _result(self, values, order):
+        """
+        Map values by canonical column back to the caller's columns.
+        """
+        best = max(values, key=values.get)
+
+        return {
+            'column': COLUMN_NAMES[order[best]],
+            'column_index': order[best],
+            'value': values[best],
+            'values': {COLUMN_NAMES[order[column_index]]: value for column_index, value in sorted(values.items(), key=lambda item: order[item[0]])},
+        }
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return None
+
+            batch = [request]
+            size = len(request.positions)
+            closes_at = time.perf_counter() + self.batch_window
+
+            while size < self.batch_size:
+                try:
+                    request = self._queue.get(timeout=max(0.0, closes_at - time.perf_counter()))
+                except queue.Empty:
+                    break
+
+                if request is None:
+                    self._queue.put(None) # Finish this batch, then stop.
+                    break
+
+                batch.append(request)
+                size += len(request.positions)
+
+            try:
+                results = self.evaluate_batch([position for request in batch for position in request.positions])
+            except Exception as error:
+                results = [error] * size
+
+            self.requests += len(batch)
+            start = 0
+            for request in batch:
+                request.results = results[start:start + len(request.positions)]
+                start += len(request.positions)
+                request.done.set()
+
+
+class HintRequestHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1' # Keep connections open; every response gives its Content-Length.
+    disable_nagle_algorithm = True # Headers and body go out as two writes; do not hold the body back.
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            return self._send(404, {'error': "Not found."})
+
+        return self._send(200, self.server.evaluator.metrics())
+
+    def do_POST(self):
+        if self.path != '/evaluate':
+            return self._send(404, {'error': "Not found."})
+
+        length = self.headers.get('Content-Length')
+        if length is None or not length.strip().isdecimal() or int(length) > MAX_BODY_BYTES:
+            self.close_connection = True # The body is left unread, so the connection cannot be reused.
+
+            if length is None:
+                return self._send(411, {'error': "A Content-Length is required."})
+            elif not length.strip().isdecimal():
+                return self._send(400, {'error': "The Content-Length must be a whole number of bytes."})
+
+            return self._send(413, {'error': f"Requests are limited to {MAX_BODY_BYTES} bytes."})
+
+        length = int(length)
+
+        try:
+            body = json.loads(self.rfile.read(length))
+            many = isinstance(body, dict) and 'positions' in body
+            positions = body['positions'] if many else [body]
+
+            if not isinstance(positions, list) or not 0 < len(positions) <= MAX_POSITIONS:
+                raise PositionError(f"positions must be a list of 1 to {MAX_POSITIONS} positions.")
+
+            positions = [parse_position(position) for position in positions]
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return self._send(400, {'error': "The body must be JSON."})
+        except PositionError as error:
+            return self._send(400, {'error': str(error)})
+
+        results = self.server.evaluator.evaluate(positions)
+
+        if any(isinstance(result, Exception) for result in results):
+            return self._send(500, {'error': "The position could not be evaluated."})
+
+        return self._send(200, {'results': results} if many else results[0])
+
+    def log_message(self, format, *args):
+        return None # Hints are asked for at a high rate; a line per request would drown everything else.
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+        return None
+
+
+class HintServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=8777, evaluator=None):
+        super().__init__((host, port), HintRequestHandler)
+        self.evaluator = evaluator if evaluator is not None else MoveEvaluator()
+        self.evaluator.start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def server_close(self):
+        super().server_close()
+        self.evaluator.close()
+
+        return None
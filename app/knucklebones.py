@@ -1,26 +1,109 @@
 import random
+from collections import namedtuple
 from os import system, name
 
+from app import bitboard, engine, events
+from app.renderer import TerminalRenderer
 from app.utils.helpers import render_nice_message, get_input
 
+# Games and players are kept small, so a process can hold a great many of them: both use __slots__, and
+# everything that is the same from game to game (how each die is drawn, the rendered lines of each column,
+# the keys that choose a column) lives at module level and is shared. A game only builds its EventHooks
+# once something subscribes to them.
+
+# How each die is drawn, line by line, indexed by its value; 0 is an empty cell.
+DIE_RENDERS = (
+    ("           ",
+     "           ",
+     "           ",
+     "           ",
+     "           "),
+    ("┌─────────┐",
+     "│         │",
+     "│    ●    │",
+     "│         │",
+     "└─────────┘"),
+    ("┌─────────┐",
+     "│    ●    │",
+     "│         │",
+     "│    ●    │",
+     "└─────────┘"),
+    ("┌─────────┐",
+     "│  ●      │",
+     "│    ●    │",
+     "│      ●  │",
+     "└─────────┘"),
+    ("┌─────────┐",
+     "│  ●   ●  │",
+     "│         │",
+     "│  ●   ●  │",
+     "└─────────┘"),
+    ("┌─────────┐",
+     "│  ●   ●  │",
+     "│    ●    │",
+     "│  ●   ●  │",
+     "└─────────┘"),
+    ("┌─────────┐",
+     "│  ●   ●  │",
+     "│  ●   ●  │",
+     "│  ●   ●  │",
+     "└─────────┘"),
+)
+DIE_RENDER_LOOKUP = {str(value): render for value, render in enumerate(DIE_RENDERS)}
+COLUMN_LOOKUP = {
+    'L': 0,
+    'M': 1,
+    'R': 2
+}
+COLUMN_PROMPT = "(L)eft, (M)iddle, or (R)ight"
+
+_column_line_cache = {} # Rendered lines of every column drawn so far, shared by all games; see _column_lines.
+_silent_hooks = events.EventHooks() # Stands in for the hooks of games nobody has subscribed to.
+
+
 class KnucklebonesGame:
 
-    def __init__(self, player_names):
+    __slots__ = (
+        '_active', '_current_die_value', '_games_played', '_draws', 'recorder', 'stats', 'rng', '_dice',
+        'renderer', '_events', 'timer', 'meter', '_meter_text', '_next_player', 'columns', 'rows', 'faces',
+        'players', 'seats', 'player_names'
+    )
+
+    die_render_lookup = DIE_RENDER_LOOKUP
+
+    def __init__(self, player_names, players=None, recorder=None, rng=None, dice=None,
+                 columns=engine.COLUMN_COUNT, rows=engine.ROW_COUNT, faces=engine.DIE_FACES, meter=None, stats=None):
         self._active = False
         self._current_die_value = None
-        self.die_render_lookup = {
-            '0': self.render_no_die,
-            '1': self.render_die_1,
-            '2': self.render_die_2,
-            '3': self.render_die_3,
-            '4': self.render_die_4,
-            '5': self.render_die_5,
-            '6': self.render_die_6
-        }
-
-        self.players = [KnucklebonesPlayer(), KnucklebonesPlayer()]
+        self._games_played = 0
+        self._draws = 0
+        self.recorder = recorder
+        self.stats = stats # A stats.StatsStore, to keep every result after the session ends.
+        self.rng = rng if rng is not None else random.Random() # Pass a seeded random.Random to make the game reproducible.
+        self._dice = iter(dice) if dice is not None else None
+        self.renderer = TerminalRenderer()
+        self._events = None # Built by the events property on first use.
+        self.timer = None # An events.PhaseTimer, to time each phase of a turn.
+        self.meter = meter # A meter.WinProbabilityMeter, to show each player's chances beside their score.
+        self._meter_text = {}
+        self._next_player = None
+
+        self.columns = columns
+        self.rows = rows
+        self.faces = faces
+
+        self.players = players if players else [KnucklebonesPlayer(), KnucklebonesPlayer()]
+        self.seats = tuple(self.players) # Stays in the order given, while players is reordered every game.
         self.player_names = player_names
 
+        if (columns, rows, faces) != (engine.COLUMN_COUNT, engine.ROW_COUNT, engine.DIE_FACES):
+            if meter:
+                raise ValueError("The win probability meter only reads the standard 3x3 board with six-sided dice.")
+            if recorder:
+                raise ValueError("Game records only hold the standard 3x3 board with six-sided dice.")
+
+            for player in self.players: player.set_board_size(columns, rows, faces)
+
         for i in range(len(self.players)):
             try:
                 self.players[i].set_player_name(self.player_names[i])
@@ -36,60 +119,57 @@ class KnucklebonesGame:
     def current_die_value(self):
         return self._current_die_value
 
+    @property
+    def games_played(self):
+        return self._games_played
+
+    @property
+    def draws(self):
+        return self._draws
+
+    @property
+    def events(self):
+        if self._events is None:
+            self._events = events.EventHooks()
+
+        return self._events
+
     @property
     def render_no_die(self):
-        return ("           ",
-                "           ",
-                "           ",
-                "           ",
-                "           ")
+        return DIE_RENDERS[0]
 
     @property
     def render_die_1(self):
-        return ("┌─────────┐",
-                "│         │",
-                "│    ●    │",
-                "│         │",
-                "└─────────┘")
+        return DIE_RENDERS[1]
 
     @property
     def render_die_2(self):
-        return ("┌─────────┐",
-                "│    ●    │",
-                "│         │",
-                "│    ●    │",
-                "└─────────┘")
+        return DIE_RENDERS[2]
 
     @property
-    def render_die_3(sef):
-        return ("┌─────────┐",
-                "│  ●      │",
-                "│    ●    │",
-                "│      ●  │",
-                "└─────────┘")
+    def render_die_3(self):
+        return DIE_RENDERS[3]
 
     @property
     def render_die_4(self):
-        return ("┌─────────┐",
-                "│  ●   ●  │",
-                "│         │",
-                "│  ●   ●  │",
-                "└─────────┘")
+        return DIE_RENDERS[4]
 
     @property
     def render_die_5(self):
-        return ("┌─────────┐",
-                "│  ●   ●  │",
-                "│    ●    │",
-                "│  ●   ●  │",
-                "└─────────┘")
+        return DIE_RENDERS[5]
 
     @property
     def render_die_6(self):
+        return DIE_RENDERS[6]
+
+    def render_die_number(self, value):
+        """
+        Dice past six faces show their number instead of pips.
+        """
         return ("┌─────────┐",
-                "│  ●   ●  │",
-                "│  ●   ●  │",
-                "│  ●   ●  │",
+                "│         │",
+                f"│{str(value):^9}│",
+                "│         │",
                 "└─────────┘")
 
     @property
@@ -116,17 +196,19 @@ class KnucklebonesGame:
         """
         Choose a random player to make the first roll.
         """
-        random.shuffle(players)
+        self.rng.shuffle(players)
 
         return players
 
-    def roll_the_die(self, player_name):
+    def roll_the_die(self, player_name, prompt=True):
         """
         Let the player "roll" the die; and store the value rolled.
+        Dice come from the game's rng, or from the pre-rolled dice it was given.
         """
-        _ = get_input(f"\n{'>' * 10} {player_name} MUST PRESS ENTER TO ROLL THE DIE! {'<' * 10}")
+        if prompt:
+            _ = get_input(f"\n{'>' * 10} {player_name} MUST PRESS ENTER TO ROLL THE DIE! {'<' * 10}")
 
-        self._current_die_value = random.randint(1, 6)
+        self._current_die_value = next(self._dice) if self._dice is not None else self.rng.randint(1, self.faces)
         render_nice_message(f"{player_name} ROLLED A {self.current_die_value}!")
 
         return None
@@ -135,52 +217,110 @@ class KnucklebonesGame:
         """
         Display the game board.
         """
-        self._render_player_matrix(matrices[0], reverse=False)
+        print("\n".join(self.grid_lines(matrices)))
 
-        print(f"\n{'=' * 99}\n")
+        return None
 
-        self._render_player_matrix(matrices[1], reverse=True)
+    def draw_grid(self):
+        """
+        Redraw the parts of the game board that changed since it was last drawn.
+        """
+        if self.meter: self.update_meter()
+
+        self.renderer.draw(self.grid_lines([self.player_one.matrix, self.player_two.matrix]))
 
         return None
 
+    def update_meter(self):
+        """
+        Read each player's win probability and expected final margin, for the scoreboards.
+        """
+        mover = self._next_player
+        if mover is None:
+            return None
+
+        opponent = self.player_two if mover is self.player_one else self.player_one
+
+        if self.active:
+            mover_board, opponent_board = bitboard.pack_matrix(mover.matrix), bitboard.pack_matrix(opponent.matrix)
+            win_probability, margin, exact = self.meter.evaluate(mover_board, opponent_board)
+        else: # The game is over; the result is known.
+            margin, exact = mover.score - opponent.score, True
+            win_probability = 1.0 if margin > 0 else 0.5 if margin == 0 else 0.0
+
+        mark = '' if exact else '~'
+        self._meter_text = {
+            mover: f"{mark}{win_probability:.0%} WIN {margin:+.1f}",
+            opponent: f"{mark}{1.0 - win_probability:.0%} WIN {-margin:+.1f}",
+        }
+
+        return None
+
+    def grid_lines(self, matrices):
+        """
+        Lay out the whole game board, line by line.
+        """
+        player_one_lines = self._render_player_matrix(matrices[0], reverse=False)
+
+        return player_one_lines + ['', '=' * len(player_one_lines[0]), ''] + self._render_player_matrix(matrices[1], reverse=True)
+
     def _render_player_matrix(self, matrix, reverse=False):
         """
-        Show the layout of the dice.
+        Lay out the dice.
         """
-        for i in range(len(matrix)):
-            for line in range(self.die_height): # The die need to render line-by-line to show properly on the command line.
+        dice_lines = [' * '.join(cells) for cells in zip(*(self._column_lines(column, reverse) for column in matrix))]
+        die_height = self.die_height
+        rows = len(matrix[0])
+        lines = []
+
+        for i in range(rows):
+            for line in range(die_height): # The die need to render line-by-line to show properly on the command line.
                 if reverse:
-                    index = len(matrix) - i - 1 # The second matrix should render inverted.
-                    right_scoreboard_msg, left_scoreboard_msg = self._set_scoreboard(i, line, self.player_two)
+                    right_scoreboard_msg, left_scoreboard_msg = self._set_scoreboard(i, line, self.player_two, rows)
                 else:
-                    index = i
-                    left_scoreboard_msg, right_scoreboard_msg = self._set_scoreboard(i, line, self.player_one)
+                    left_scoreboard_msg, right_scoreboard_msg = self._set_scoreboard(i, line, self.player_one, rows)
 
-                print(
-                    f"{left_scoreboard_msg}" \
-                    f"{self.die_render_lookup[str(matrix[0][index])][line]} * " \
-                    f"{self.die_render_lookup[str(matrix[1][index])][line]} * " \
-                    f"{self.die_render_lookup[str(matrix[2][index])][line]}" \
-                    f"{right_scoreboard_msg}"
-                )
+                lines.append(left_scoreboard_msg + dice_lines[i * die_height + line] + right_scoreboard_msg)
 
-        return None
+        return lines
 
-    def _set_scoreboard(self, index, line_number, player):
+    def _column_lines(self, column, reverse=False):
         """
-        Show the player's name and their score in the proper place.
+        Every rendered line of a column, top to bottom; cached by the dice the column holds.
+        """
+        key = (tuple(column), reverse)
+        lines = _column_line_cache.get(key)
+
+        if lines is None:
+            values = reversed(column) if reverse else column # The second matrix should render inverted.
+            lines = tuple(
+                die_line for value in values
+                for die_line in (self.die_render_lookup[str(value)] if value <= 6 else self.render_die_number(value))
+            )
+            _column_line_cache[key] = lines
+
+        return lines
+
+    def _set_scoreboard(self, index, line_number, player, rows=engine.ROW_COUNT):
+        """
+        Show the player's name and their score in the proper place; beside the middle row.
         """
         scoreboard_length = 30
         padding = 4
         standard_fill = f"{'*' * scoreboard_length}"
 
-        if index == 1 and line_number == 1:
+        middle = rows // 2
+
+        if index == middle and line_number == 1:
             message_wrap_length = int((scoreboard_length - len(player.name) - 2) / 2)
             return f"*  {player.name}{' ' * (scoreboard_length - len(player.name) - padding)}*", standard_fill
-        elif index == 1 and line_number == 2:
+        elif index == middle and line_number == 2:
             message_wrap_length = int((scoreboard_length - len(str(player.score)) - 2) / 2)
             return f"*  {str(player.score)}{' ' * (scoreboard_length - len(str(player.score)) - padding)}*", standard_fill
-        elif index == 1:
+        elif index == middle and line_number == 3 and player in self._meter_text:
+            reading = self._meter_text[player]
+            return f"*  {reading}{' ' * (scoreboard_length - len(reading) - padding)}*", standard_fill
+        elif index == middle:
             return f"*{' ' * (scoreboard_length - 2)}*", standard_fill
         else:
             return standard_fill, standard_fill
@@ -200,14 +340,16 @@ class KnucklebonesGame:
         """
         Check if a matrix is full, to determine if a game should end.
         """
-        open_space = False
+        if engine.is_matrix_full(matrix):
+            self._active = False
 
-        for column in matrix:
-            if column[0] == 0: # We only need to check the first index to determine if space is open.
-                open_space = True
-                break
+        return None
 
-        if not open_space:
+    def check_for_full_board(self, player):
+        """
+        Same as check_for_full_matrix, from the count of open cells the player keeps instead of a scan.
+        """
+        if player.is_matrix_full():
             self._active = False
 
         return None
@@ -217,6 +359,7 @@ class KnucklebonesGame:
         Show the winner of the game.
         """
         if self.player_one.score == self.player_two.score:
+            self._draws += 1
             render_nice_message("THE GAME WAS A DRAW! WOW!")
         else:
             if self.player_one.score > self.player_two.score:
@@ -237,7 +380,7 @@ class KnucklebonesGame:
         if self.player_one.wins == self.player_two.wins:
             render_nice_message("BOTH PLAYERS WON AN EQUAL NUMBER OF GAMES! WOW!")
         elif (self.player_one.wins + self.player_two.wins) == 1:
-            return None # Only one game played, no need to display this messaging.
+            pass # Only one game played, no need to display this messaging.
         else:
             if self.player_one.wins > self.player_two.wins:
                 winner = self.player_one.name
@@ -246,18 +389,49 @@ class KnucklebonesGame:
 
             render_nice_message(f"{winner} WON MORE ROUNDS! THE ROUND TOTALS WERE {self.player_one.wins} TO {self.player_two.wins}")
 
+        if self.stats:
+            wins, losses, draws = self.stats.head_to_head(self.player_one.name, self.player_two.name)
+            render_nice_message(f"ALL TIME: {self.player_one.name} {wins} TO {self.player_two.name} {losses}, WITH {draws} DRAWS")
+
         return None
 
-    def loop(self):
+    def loop(self, games=None):
         """
-        Run the game loop.
+        Run the series loop; play games until the players stop, or until the given number of games is played.
+        """
+        while True:
+            self.play_game()
+
+            if games is not None:
+                if self.games_played >= games: break
+            else:
+                play_again = get_input(">> Would you like to play again? (Y/N) ")
+                if play_again.upper() not in ['Y', 'YES']: break
+
+            for player in self.players: player.set_player_board()
+
+        self.determine_series_winner()
+
+        return None
+
+    def play_game(self):
+        """
+        Play a single game to the end.
         """
         self.set_game_to_active()
 
         ordered_players = self.set_player_order(self.players)
+        self._next_player = ordered_players[0]
+        if self.recorder: self.recorder.start_game(*(player.name for player in self.seats))
+        hooks, timer = self._events or _silent_hooks, self.timer
+        game_number = self.games_played + 1
 
+        self.renderer.reset() # The last game's result and the replay prompt are still under the board.
+        self.draw_grid()
         render_nice_message(f"{ordered_players[0].name} WILL GO FIRST!")
 
+        if hooks.listening: hooks.emit(events.GAME_START, game_number, order=[player.name for player in ordered_players])
+
         while self.active:
             index = 0
             for player in ordered_players:
@@ -267,43 +441,90 @@ class KnucklebonesGame:
                     index += 1
                     opponent = ordered_players[index]
 
-                self.show_grid(matrices=[self.player_one.matrix, self.player_two.matrix])
+                if timer: turn_started = mark = timer.clock()
+
+                self.roll_the_die(player.name, prompt=player.is_human)
+                if timer: mark = timer.lap('roll', mark)
+                if hooks.listening: hooks.emit(events.ROLL, game_number, player.name, die=self.current_die_value)
+
+                player.add_to_matrix(self.current_die_value, opponent)
+                if player.column_prompts > 1: self.renderer.reset() # Every re-ask printed more than the renderer keeps room for.
+                if timer: mark = timer.lap('place', mark)
 
-                self.roll_the_die(player.name)
+                removed = opponent.remove_from_matrix(self.current_die_value, player.current_column)
+                if timer: mark = timer.lap('remove', mark)
 
-                player.add_to_matrix(self.current_die_value)
-                opponent.remove_from_matrix(self.current_die_value, player.current_column)
+                if self.recorder:
+                    self.recorder.record_move(self.seats.index(player), self.current_die_value, player.current_column)
 
-                self.check_for_full_matrix(player.matrix)
-                self.clear_screen()
+                if hooks.listening: self._emit_turn(game_number, player, opponent, removed)
+
+                self.check_for_full_board(player)
+                self._next_player = opponent
+                self.draw_grid() # Also clears this turn's messages from under the board.
+
+                if timer:
+                    timer.lap('render', mark)
+                    timer.lap('turn', turn_started)
 
                 if not self.active: break # Game is over.
 
-        self.show_grid(matrices=[self.player_one.matrix, self.player_two.matrix])
         self.determine_game_winner()
 
-        play_again = get_input(">> Would you like to play again? (Y/N) ")
+        if self.recorder: self.recorder.end_game()
+        if self.stats: self.stats.record_game(self.player_one.name, self.player_two.name, self.player_one.score, self.player_two.score)
+        self._games_played += 1
 
-        if play_again.upper() in ['Y', 'YES']:
-            for player in self.players: player.set_player_board()
-            return self.loop()
-        else:
-            self.determine_series_winner()
-            return None
+        if hooks.listening:
+            scores = (self.player_one.score, self.player_two.score)
+            winner = None if scores[0] == scores[1] else (self.player_one if scores[0] > scores[1] else self.player_two).name
+            hooks.emit(events.GAME_END, game_number, winner, scores=scores)
+
+        return None
+
+    def _emit_turn(self, game_number, player, opponent, removed):
+        """
+        Tell subscribers where the die went, what it knocked out and the new scores.
+        """
+        hooks = self.events
+        die_value, column_index = self.current_die_value, player.current_column
+
+        hooks.emit(events.PLACEMENT, game_number, player.name, die=die_value, column=column_index)
+        hooks.emit(events.REMOVAL, game_number, opponent.name, die=die_value, column=column_index, removed=removed)
+        hooks.emit(events.SCORE_CHANGE, game_number, player.name, scores=(self.player_one.score, self.player_two.score))
+
+        return None
+
+
+# What KnucklebonesPlayer.make_move changed: the die placed and the row it landed in, the mover's previous
+# column score and current column, and the opponent's column before matching dice were knocked out of it
+# (None if none were), with how many there were and the opponent's previous column score.
+Move = namedtuple('Move', [
+    'die_value', 'column_index', 'row', 'current_column', 'column_score',
+    'opponent_column', 'removed', 'opponent_column_score'
+])
 
 
 class KnucklebonesPlayer:
 
+    __slots__ = (
+        'columns', 'rows', 'faces', '_matrix', '_column_scores', '_open_cells', '_name', 'column_lookup',
+        '_column_prompt', '_wins', '_current_column', '_column_prompts'
+    )
+
+    is_human = True
+
     def __init__(self):
+        self.columns = engine.COLUMN_COUNT
+        self.rows = engine.ROW_COUNT
+        self.faces = engine.DIE_FACES
         self.set_player_board()
         self._name = ''
-        self.column_lookup = {
-            'L': 0,
-            'M': 1,
-            'R': 2
-        }
+        self.column_lookup = COLUMN_LOOKUP # Shared, unless set_board_size numbers the columns.
+        self._column_prompt = COLUMN_PROMPT
         self._wins = 0
         self._current_column = None
+        self._column_prompts = 0
 
     @property
     def name(self):
@@ -321,6 +542,10 @@ class KnucklebonesPlayer:
     def current_column(self):
         return self._current_column
 
+    @property
+    def column_prompts(self):
+        return self._column_prompts # Times the player was asked for a column on their last turn.
+
     @property
     def column_scores(self):
         return self._column_scores
@@ -349,83 +574,117 @@ class KnucklebonesPlayer:
 
         return None
 
-    def add_to_matrix(self, die_value):
+    def set_board_size(self, columns, rows, faces=engine.DIE_FACES):
         """
-        Prompt the player to choose the column where they wish to add their rolled value.
+        Play on a board of another size; columns are then chosen by number rather than L, M or R.
         """
-        def choose_column():
-            self._current_column = get_input(">> Please choose a column to insert your die. (L)eft, (M)iddle, or (R)ight: ")
+        self.columns, self.rows, self.faces = columns, rows, faces
 
-            if self.current_column.upper() not in ['L', 'M', 'R']:
-                print(f"Please put a valid entry of L, M, or R!")
-                choose_column()
-            else:
-                self._current_column = self.column_lookup[self.current_column.upper()]
+        if columns != engine.COLUMN_COUNT:
+            self.column_lookup = {str(i + 1): i for i in range(columns)}
+            self._column_prompt = f"1 to {columns}"
 
-                if self.is_column_full():
-                    print(f"Select a different column; the column you selected is full!")
-                    choose_column()
-                else:
-                    return None
+        self.set_player_board()
 
-        choose_column()
+        return None
 
-        highest_open_index = 0
-        for i in range(len(self.matrix[self.current_column])):
-            if self.matrix[self.current_column][i] == 0:
-                highest_open_index = i
-            else:
-                break # We've got the highest index.
+    def add_to_matrix(self, die_value, opponent=None):
+        """
+        Have the player choose the column where they wish to add their rolled value.
+        """
+        self._column_prompts = 0
+        self.choose_column(die_value, opponent)
+
+        self.place_die(die_value, self.current_column)
+
+        return None
+
+    def choose_column(self, die_value, opponent=None):
+        """
+        Prompt the player for a column until an open one is chosen.
+        """
+        self._column_prompts += 1
+        self._current_column = get_input(f">> Please choose a column to insert your die. {self._column_prompt}: ")
+
+        if self.current_column.upper() not in self.column_lookup:
+            print(f"Please put a valid entry of {self._column_prompt}!")
+            return self.choose_column(die_value, opponent)
 
-        self.matrix[self.current_column][highest_open_index] = die_value
+        self._current_column = self.column_lookup[self.current_column.upper()]
 
-        self.update_column_score(self.current_column)
+        if self.is_column_full():
+            print(f"Select a different column; the column you selected is full!")
+            return self.choose_column(die_value, opponent)
+
+        return None
+
+    def place_die(self, die_value, column_index):
+        """
+        Put a die in the chosen column, without prompting.
+        """
+        self._current_column = column_index
+
+        engine.place_die(self.matrix[column_index], die_value)
+        self._open_cells -= 1
+        self.update_column_score(column_index)
 
         return None
 
     def remove_from_matrix(self, die_value, column_index):
         """
         Check if the opposing player added a matching value to a matching column;
-        and remove values from current player's matrix.
+        and remove values from current player's matrix; returns how many were removed.
         """
-        self.matrix[column_index] = [n for n in self.matrix[column_index] if n != die_value]
-        
-        if len(self.matrix[column_index]) < 3:
-            while len(self.matrix[column_index]) < 3:
-                self.matrix[column_index].insert(0, 0)
+        removed = engine.remove_die_value(self.matrix[column_index], die_value)
 
+        if removed:
+            self._open_cells += removed
             self.update_column_score(column_index) # This only needs to recalculate if values have been removed.
 
-        return None
+        return removed
 
-    def update_column_score(self, column_index):
+    def make_move(self, die_value, column_index, opponent):
         """
-        Update the specified column's score after an action happened.
+        Place a die and knock matching dice out of the opponent's column, in place, without prompting.
+        Returns a Move recording what changed, for unmake_move to put back.
         """
-        column = self.matrix[column_index].copy()
-        column.sort()
+        column = self._matrix[column_index]
+        opponent_column = opponent.matrix[column_index]
+        removed = opponent_column.count(die_value)
 
-        matches, idx = 0, 1
-        for n in column:
-            if n == column[idx]:
-                matches += 1
-                match_value = n
+        move = Move(
+            die_value, column_index, column.count(0) - 1, self._current_column, self._column_scores[column_index],
+            tuple(opponent_column) if removed else None, removed, opponent.column_scores[column_index]
+        )
 
-            idx += 1
-            if idx >= len(column):
-                break
+        self.place_die(die_value, column_index) # Raises ValueError, with nothing changed, if the column is full.
+        opponent.remove_from_matrix(die_value, column_index)
 
-        if matches:
-            # TODO: Less hardcoding here.
-            if matches < 2:
-                remainder_value = [n for n in column if n != match_value][0]
-            else:
-                remainder_value = 0
+        return move
 
-            matches += 1
-            self._column_scores[column_index] = (match_value * matches) * matches + remainder_value
-        else:
-            self._column_scores[column_index] = sum(column)
+    def unmake_move(self, move, opponent):
+        """
+        Take back a move made with make_move; moves must be taken back in the reverse order they were made.
+        """
+        column_index = move.column_index
+
+        self._matrix[column_index][move.row] = 0
+        self._column_scores[column_index] = move.column_score
+        self._open_cells += 1
+        self._current_column = move.current_column
+
+        if move.removed:
+            opponent._matrix[column_index][:] = move.opponent_column
+            opponent._column_scores[column_index] = move.opponent_column_score
+            opponent._open_cells -= move.removed
+
+        return None
+
+    def update_column_score(self, column_index):
+        """
+        Update the specified column's score after an action happened.
+        """
+        self._column_scores[column_index] = engine.score_column(self.matrix[column_index], self.faces)
 
         return None
 
@@ -433,19 +692,21 @@ class KnucklebonesPlayer:
         """
         Check if column can accept new die values.
         """
-        column = self.matrix[self.current_column]
-
-        for i in column:
-            if i == 0: return False
+        return engine.is_column_full(self.matrix[self.current_column])
 
-        return True
+    def is_matrix_full(self):
+        """
+        Check if every column is full, from the count of open cells kept as dice come and go.
+        """
+        return not self._open_cells
 
     def set_player_board(self):
         """
         Initialize an empty player board and score.
         """
-        self._matrix = [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
-        self._column_scores = [0, 0, 0]
+        self._matrix = engine.new_matrix(self.columns, self.rows)
+        self._column_scores = [0] * self.columns
+        self._open_cells = self.columns * self.rows
 
         return None
 
@@ -0,0 +1,254 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app import bitboard, engine, solver
+from app.ai import BotPlayer
+
+# Monte Carlo tree search over packed boards.
+#
+# Decision nodes are keyed on (mover_board, opponent_board, die) and shared through one table, so
+# transpositions merge and the statistics from earlier turns are still there when the game reaches them.
+# Chance nodes pick the least visited die next, which spreads playouts evenly over the six outcomes.
+# Leaves are gathered in batches, with their visits counted up front as a virtual loss, and the
+# random playouts for a batch are shared out over a process pool.
+
+
+def random_playout(mover_board, opponent_board, rng):
+    """
+    Play random moves to the end of the game; returns the result for the player about to roll.
+    """
+    to_move, waiting = mover_board, opponent_board
+    mover_to_move = True
+
+    while True:
+        die_value = rng.randint(1, engine.DIE_FACES)
+        column_index = rng.choice(bitboard.open_columns(to_move))
+        to_move, waiting = bitboard.apply(to_move, waiting, column_index, die_value)
+
+        if bitboard.is_board_full(to_move):
+            break
+
+        to_move, waiting = waiting, to_move
+        mover_to_move = not mover_to_move
+
+    to_move_score, waiting_score = bitboard.board_score(to_move), bitboard.board_score(waiting)
+
+    if to_move_score == waiting_score:
+        return 0.5
+
+    return 1.0 if (to_move_score > waiting_score) == mover_to_move else 0.0
+
+def run_playouts(positions, seed):
+    """
+    Worker entry point; one playout per (mover_board, opponent_board) position.
+    """
+    rng = random.Random(seed)
+
+    return [random_playout(mover_board, opponent_board, rng) for mover_board, opponent_board in positions]
+
+
+class DecisionNode:
+
+    __slots__ = ('columns', 'visits', 'column_visits', 'column_wins')
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.visits = 0
+        self.column_visits = [0] * len(columns)
+        self.column_wins = [0.0] * len(columns)
+
+
+class MonteCarloTreeSearch:
+
+    def __init__(self, playouts=2000, time_budget=None, workers=0, batch_size=None, exploration=1.4, max_nodes=500000, seed=None):
+        self.playouts = playouts
+        self.time_budget = time_budget
+        self.workers = workers
+        self.batch_size = batch_size or 64 * max(1, workers) # Big enough batches keep every worker busy.
+        self.exploration = exploration
+        self.max_nodes = max_nodes
+        self._rng = random.Random(seed)
+        self._nodes = {}
+        self._chance_visits = {}
+        self._executor = None
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def _node(self, mover_board, opponent_board, die_value):
+        key = solver.state_key(mover_board, opponent_board, die_value)
+        node = self._nodes.get(key)
+
+        if node is None:
+            node = DecisionNode(tuple(bitboard.open_columns(mover_board)))
+            self._nodes[key] = node
+
+        return node
+
+    def root_statistics(self, mover_board, opponent_board, die_value):
+        """
+        Visits and mean results per open column at a position; kept between turns.
+        """
+        node = self._node(mover_board, opponent_board, die_value)
+
+        return {
+            column_index: (visits, wins / visits if visits else None)
+            for column_index, visits, wins in zip(node.columns, node.column_visits, node.column_wins)
+        }
+
+    def best_column(self, mover_board, opponent_board, die_value):
+        """
+        Search until the playout count or time budget runs out; returns the most visited column.
+        """
+        if len(self._nodes) > self.max_nodes:
+            self._nodes.clear()
+            self._chance_visits.clear()
+
+        root = self._node(mover_board, opponent_board, die_value)
+        if len(root.columns) == 1:
+            return root.columns[0]
+
+        deadline = time.perf_counter() + self.time_budget if self.time_budget else None
+        remaining = self.playouts
+
+        while remaining > 0:
+            batch = [self._select(mover_board, opponent_board, die_value) for _ in range(min(self.batch_size, remaining))]
+            self._evaluate(batch)
+            remaining -= len(batch)
+
+            if deadline and time.perf_counter() >= deadline:
+                break
+
+        visits, column_index = max(zip(root.column_visits, root.columns))
+
+        return column_index
+
+    def _select(self, mover_board, opponent_board, die_value):
+        """
+        Walk down the tree to an unexplored move; returns the path and the leaf to evaluate.
+        """
+        path = []
+
+        while True:
+            node = self._node(mover_board, opponent_board, die_value)
+            choice = self._choose(node)
+            unexplored = node.column_visits[choice] == 0
+
+            node.visits += 1
+            node.column_visits[choice] += 1 # Counted now so the rest of the batch spreads out.
+            path.append((node, choice))
+
+            new_mover, new_opponent = bitboard.apply(mover_board, opponent_board, node.columns[choice], die_value)
+
+            if bitboard.is_board_full(new_mover):
+                mover_score, opponent_score = bitboard.board_score(new_mover), bitboard.board_score(new_opponent)
+                result = 0.5 if mover_score == opponent_score else float(mover_score > opponent_score)
+                return path, None, result
+
+            if unexplored:
+                return path, (new_opponent, new_mover), None
+
+            mover_board, opponent_board = new_opponent, new_mover
+            die_value = self._roll(mover_board, opponent_board)
+
+    def _choose(self, node):
+        """
+        UCT over the columns; untried columns first.
+        """
+        best_index, best_score = 0, -1.0
+        log_visits = math.log(node.visits + 1)
+
+        for index, visits in enumerate(node.column_visits):
+            if not visits:
+                return index
+
+            score = node.column_wins[index] / visits + self.exploration * math.sqrt(log_visits / visits)
+            if score > best_score:
+                best_index, best_score = index, score
+
+        return best_index
+
+    def _roll(self, mover_board, opponent_board):
+        """
+        Chance node; take the die outcome that has been explored the least.
+        """
+        key = solver.position_key(mover_board, opponent_board)
+        counts = self._chance_visits.get(key)
+
+        if counts is None:
+            counts = [0] * engine.DIE_FACES
+            self._chance_visits[key] = counts
+
+        fewest = min(counts)
+        index = self._rng.choice([i for i, count in enumerate(counts) if count == fewest])
+        counts[index] += 1
+
+        return engine.DIE_VALUES[index]
+
+    def _evaluate(self, batch):
+        pending = [(i, leaf) for i, (_, leaf, _) in enumerate(batch) if leaf is not None]
+        results = [result for _, _, result in batch]
+
+        if pending:
+            playouts = self._run_playouts([leaf for _, leaf in pending])
+            for (i, _), playout in zip(pending, playouts):
+                results[i] = 1.0 - playout # The playout is scored for the opponent of the last mover.
+
+        for (path, _, _), result in zip(batch, results):
+            for node, choice in reversed(path):
+                node.column_wins[choice] += result
+                result = 1.0 - result
+
+        return None
+
+    def _run_playouts(self, positions):
+        if self.workers <= 1:
+            return run_playouts(positions, self._rng.getrandbits(64))
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        chunk = math.ceil(len(positions) / self.workers)
+        futures = [
+            self._executor.submit(run_playouts, positions[i:i + chunk], self._rng.getrandbits(64))
+            for i in range(0, len(positions), chunk)
+        ]
+
+        results = []
+        for future in futures:
+            results.extend(future.result())
+
+        return results
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        return None
+
+
+class MCTSPlayer(BotPlayer):
+
+    __slots__ = ('search',)
+
+    def __init__(self, playouts=2000, time_budget=None, workers=0, **search_options):
+        super().__init__()
+        self.search = MonteCarloTreeSearch(playouts, time_budget, workers, **search_options)
+
+    def pick_column(self, mover_board, opponent_board, die_value):
+        return self.search.best_column(mover_board, opponent_board, die_value)
+
+    def close(self):
+        """
+        Shut down the search's worker processes, if it started any.
+        """
+        return self.search.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
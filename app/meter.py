@@ -0,0 +1,97 @@
+import math
+
+from app import bitboard, engine, hashing
+from app.ai import TranspositionTable
+
+# Live win probability and expected margin.
+#
+# Chance nodes average over the six dice; at each decision the player to move picks the column that
+# gives the best chance of winning, then the biggest margin. Past the horizon, the position is
+# estimated from the current margin and how many cells are still open, and the reading is marked as
+# an estimate; a reading whose every line ends before the horizon is exact. Keep the depth even, so both
+# players get as many turns before the horizon; an odd depth flatters the player about to roll.
+# Results are cached by canonical position and depth in a bounded LRU table, which carries over from
+# turn to turn and game to game, since the next turn's positions are mostly the ones just searched.
+
+
+def _build_column_dice():
+    return tuple(sum(1 for value in bitboard.unpack_column(code) if value) for code in range(bitboard.COLUMN_STATES))
+
+COLUMN_DICE = _build_column_dice()
+
+
+def open_cells(board):
+    return engine.COLUMN_COUNT * engine.ROW_COUNT - sum(COLUMN_DICE[(board >> shift) & bitboard.COLUMN_MASK] for shift in bitboard.COLUMN_SHIFTS)
+
+def final_reading(mover_board, opponent_board):
+    """
+    Reading of a finished game for the first board; draws count as half a win.
+    """
+    margin = bitboard.board_score(mover_board) - bitboard.board_score(opponent_board)
+
+    return (1.0 if margin > 0 else 0.5 if margin == 0 else 0.0), margin, True
+
+
+class WinProbabilityMeter:
+
+    def __init__(self, depth=2, cache_size=200000):
+        self.depth = depth
+        self.cache = TranspositionTable(cache_size)
+
+    def evaluate(self, mover_board, opponent_board):
+        """
+        Reading for the player about to roll: (win probability, expected final margin, exact).
+        """
+        return self._chance_value(mover_board, opponent_board, self.depth)
+
+    def _chance_value(self, mover_board, opponent_board, depth):
+        key = (hashing.canonical_key(mover_board, opponent_board) << 4) | depth
+        reading = self.cache.get(key)
+
+        if reading is not None:
+            return reading
+
+        if depth == 0:
+            reading = self._estimate(mover_board, opponent_board)
+        else:
+            win_probability, margin, exact = 0.0, 0.0, True
+
+            for die_value in engine.DIE_VALUES:
+                die_probability, die_margin, die_exact = self._decision_value(mover_board, opponent_board, die_value, depth)
+                win_probability += die_probability
+                margin += die_margin
+                exact = exact and die_exact
+
+            reading = (win_probability / engine.DIE_FACES, margin / engine.DIE_FACES, exact)
+
+        self.cache.store(key, reading)
+
+        return reading
+
+    def _decision_value(self, mover_board, opponent_board, die_value, depth):
+        best, exact = None, True
+
+        for column_index in bitboard.open_columns(mover_board):
+            new_mover, new_opponent = bitboard.apply(mover_board, opponent_board, column_index, die_value)
+
+            if bitboard.is_board_full(new_mover):
+                reading = final_reading(new_mover, new_opponent)
+            else:
+                win_probability, margin, child_exact = self._chance_value(new_opponent, new_mover, depth - 1)
+                reading = (1.0 - win_probability, -margin, child_exact)
+
+            exact = exact and reading[2] # Every option must be exact, or the choice between them is not.
+            if best is None or reading[:2] > best[:2]:
+                best = reading
+
+        return best[0], best[1], exact
+
+    def _estimate(self, mover_board, opponent_board):
+        """
+        Past the horizon: the current margin, turned into a probability that is less sure the more
+        cells are still open.
+        """
+        margin = bitboard.board_score(mover_board) - bitboard.board_score(opponent_board)
+        scale = 4.0 + 1.5 * (open_cells(mover_board) + open_cells(opponent_board))
+
+        return 1.0 / (1.0 + math.exp(-margin / scale)), float(margin), False
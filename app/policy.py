@@ -0,0 +1,144 @@
+import mmap
+import struct
+from array import array
+
+from app import solver
+
+# Compact policy files for instant play.
+#
+# A policy file keeps only the best column for every solved position and die, indexed by the canonical
+# position (see solver.canonical_position). Each position takes one 3-byte slot:
+#   bits 0-11   best canonical column for dice 1-6, two bits each; the same 0-2 column indices that
+#               KnucklebonesPlayer.column_lookup maps L, M and R to
+#   bits 12-23  a fingerprint of the position (never 0, so 0 marks an empty slot)
+# Slots are found with a hash-and-displace perfect hash: every position hashes to a bucket, and each
+# bucket stores the 16-bit seed that sends its positions to free slots. A lookup reads one seed and one
+# slot, with no probing, and the whole file costs about five bits per position and die. Positions the
+# file was not built with are turned away by the fingerprint, all but once in 4095 times.
+
+POLICY_MAGIC = b'KBPO'
+POLICY_VERSION = 1
+HEADER = struct.Struct('<4sIQQQ')
+SEED = struct.Struct('<H')
+SLOT_SIZE = 3
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+class PolicyBuildError(Exception):
+    pass
+
+
+def _mix(key, seed):
+    """
+    SplitMix64 finaliser over the key and a seed.
+    """
+    value = (key + seed * 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+
+    return value ^ (value >> 31)
+
+def _fingerprint(mixed):
+    return (mixed >> 52) % 4095 + 1
+
+def pack_columns(best_columns):
+    """
+    Pack the best column for dice 1-6 into twelve bits.
+    """
+    code = 0
+
+    for die_index, column_index in enumerate(best_columns):
+        code |= column_index << (2 * die_index)
+
+    return code
+
+def write_policy(path, policies, load_factor=0.9, bucket_size=4):
+    """
+    Write (position_key, best columns for dice 1-6) pairs, as from Solver.policies(), to a policy file.
+    """
+    keys, codes = [], []
+    for key, best_columns in policies:
+        keys.append(key)
+        codes.append(pack_columns(best_columns))
+
+    slot_count = max(1, int(len(keys) / load_factor) + 1)
+    bucket_count = max(1, -(-len(keys) // bucket_size))
+    buckets = [[] for _ in range(bucket_count)]
+    fingerprints = []
+
+    for entry, key in enumerate(keys):
+        mixed = _mix(key, 0)
+        buckets[mixed % bucket_count].append(entry)
+        fingerprints.append(_fingerprint(mixed))
+
+    seeds = array('H', [0]) * bucket_count
+    slots = array('L', [0]) * slot_count
+
+    # Place the biggest buckets first, while the table is emptiest.
+    for bucket in sorted(range(bucket_count), key=lambda b: len(buckets[b]), reverse=True):
+        entries = buckets[bucket]
+        if not entries:
+            break
+
+        for seed in range(1, 1 << 16):
+            chosen = [_mix(keys[entry], seed) % slot_count for entry in entries]
+
+            if len(set(chosen)) == len(chosen) and not any(slots[slot] for slot in chosen):
+                break
+        else:
+            raise PolicyBuildError(f"No seed places bucket {bucket}; lower the load factor.")
+
+        seeds[bucket] = seed
+        for slot, entry in zip(chosen, entries):
+            slots[slot] = (fingerprints[entry] << 12) | codes[entry]
+
+    with open(path, 'wb') as policy_file:
+        policy_file.write(HEADER.pack(POLICY_MAGIC, POLICY_VERSION, len(keys), bucket_count, slot_count))
+        policy_file.write(struct.pack(f'<{bucket_count}H', *seeds))
+        policy_file.write(b''.join(slot.to_bytes(SLOT_SIZE, 'little') for slot in slots))
+
+    return None
+
+
+class PolicyFile:
+
+    def __init__(self, path):
+        with open(path, 'rb') as policy_file:
+            self._map = mmap.mmap(policy_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.position_count, self._bucket_count, self._slot_count = HEADER.unpack_from(self._map, 0)
+
+        if magic != POLICY_MAGIC or version != POLICY_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {POLICY_VERSION} Knucklebones policy file.")
+
+        self._slots_offset = HEADER.size + SEED.size * self._bucket_count
+
+    def __len__(self):
+        return self.position_count
+
+    def lookup(self, mover_board, opponent_board, die_value):
+        """
+        Best column for the player about to place the die, in the caller's column order; None if the
+        position is not in the file.
+        """
+        mover, opponent, order = solver.canonical_position(mover_board, opponent_board)
+        key = solver.position_key(mover, opponent)
+        mixed = _mix(key, 0)
+
+        seed, = SEED.unpack_from(self._map, HEADER.size + SEED.size * (mixed % self._bucket_count))
+        if not seed:
+            return None
+
+        offset = self._slots_offset + SLOT_SIZE * (_mix(key, seed) % self._slot_count)
+        slot = int.from_bytes(self._map[offset:offset + SLOT_SIZE], 'little')
+
+        if slot >> 12 != _fingerprint(mixed):
+            return None
+
+        return order[(slot >> (2 * (die_value - 1))) & 3]
+
+    def close(self):
+        self._map.close()
+
+        return None
@@ -0,0 +1,160 @@
+from app import bitboard
+
+# Compact, append-only game records.
+#
+# A file starts with a short header, followed by games back to back. Every move is one byte:
+#   bits 0-2  die value (1-6)
+#   bits 3-4  column index (0-2)
+#   bit 5     player index (0 or 1), the player's seat for the whole series, not their turn order
+# Since a die is never 0, a move byte is never 0, and a 0 byte marks the end of a game. Scanning an
+# archive is therefore a bytes.split, and replaying a game needs nothing but the packed boards.
+#
+# From version 2, a game may open with the players' names, by seat: 0xFF, the first name, 0xFE, the
+# second name, 0xFF, all in UTF-8. Neither marker byte ever occurs in UTF-8 or in a move, and names
+# hold no 0 bytes, so games still split on the end marker. Version 1 files are read as games without names.
+
+RECORD_MAGIC = b'KBGR'
+RECORD_VERSION = 2
+HEADER = RECORD_MAGIC + bytes([RECORD_VERSION])
+READABLE_HEADERS = (RECORD_MAGIC + b'\x01', HEADER)
+END_OF_GAME = b'\x00'
+NAMES_MARK = b'\xff'
+NAME_SEPARATOR = b'\xfe'
+
+
+def encode_move(player_index, die_value, column_index):
+    if player_index not in (0, 1) or not 0 <= column_index <= 2 or not 1 <= die_value <= 6:
+        raise ValueError(f"Only the standard board fits in a move byte; got player {player_index}, die {die_value}, column {column_index}.")
+
+    return (player_index << 5) | (column_index << 3) | die_value
+
+def _build_move_table():
+    moves = [None] * 256
+
+    for player_index in (0, 1):
+        for column_index in range(3):
+            for die_value in range(1, 7):
+                moves[encode_move(player_index, die_value, column_index)] = (player_index, die_value, column_index)
+
+    return tuple(moves)
+
+MOVES = _build_move_table() # Move byte -> (player_index, die_value, column_index).
+
+
+def decode_move(move):
+    decoded = MOVES[move]
+
+    if decoded is None:
+        raise ValueError(f"{move} is not a valid move byte.")
+
+    return decoded
+
+
+class GameRecordWriter:
+
+    def __init__(self, path):
+        self._file = open(path, 'ab')
+
+        if self._file.tell() == 0:
+            self._file.write(HEADER)
+
+        self._moves = bytearray()
+
+    def start_game(self, name_one, name_two):
+        """
+        Begin a game with the names of the players in seats 0 and 1.
+        """
+        names = (name.replace('\x00', '').encode() for name in (name_one, name_two))
+        self._moves = bytearray(NAMES_MARK + NAME_SEPARATOR.join(names) + NAMES_MARK)
+
+        return None
+
+    def record_move(self, player_index, die_value, column_index):
+        self._moves.append(encode_move(player_index, die_value, column_index))
+
+        return None
+
+    def end_game(self):
+        """
+        Append the finished game to the file.
+        """
+        self._moves += END_OF_GAME
+        self._file.write(self._moves)
+        self._file.flush()
+        self._moves = bytearray()
+
+        return None
+
+    def close(self):
+        self._file.close()
+
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def split_game(game):
+    """
+    Separate a recorded game into (names, moves); names is a (seat 0, seat 1) tuple, or None when
+    the game was recorded without them.
+    """
+    if not game.startswith(NAMES_MARK):
+        return None, game
+
+    end = game.index(NAMES_MARK, 1)
+    name_one, name_two = game[1:end].split(NAME_SEPARATOR)
+
+    return (name_one.decode(), name_two.decode()), game[end + 1:]
+
+def iter_named_games(path, chunk_size=1 << 20):
+    """
+    Yield every recorded game in a file as (names, bytes of move codes); see split_game.
+    """
+    for game in _iter_raw_games(path, chunk_size):
+        yield split_game(game)
+
+def iter_games(path, chunk_size=1 << 20):
+    """
+    Yield every recorded game in a file as bytes of move codes, reading the file in chunks.
+    """
+    for _, moves in iter_named_games(path, chunk_size):
+        yield moves
+
+def _iter_raw_games(path, chunk_size):
+    with open(path, 'rb') as record_file:
+        if record_file.read(len(HEADER)) not in READABLE_HEADERS:
+            raise ValueError(f"{path} is not a Knucklebones game record of version {RECORD_VERSION} or earlier.")
+
+        remainder = b''
+        while True:
+            chunk = record_file.read(chunk_size)
+            if not chunk:
+                break
+
+            games = (remainder + chunk).split(END_OF_GAME)
+            remainder = games.pop() # Everything after the last marker belongs to a game still being read.
+            yield from games
+
+    if remainder:
+        raise ValueError(f"{path} ends part way through a game.")
+
+def replay(game):
+    """
+    Play back a recorded game on packed boards; returns (board_one, board_two).
+    """
+    boards = [bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD]
+
+    for move in game:
+        player_index, die_value, column_index = MOVES[move]
+        boards[player_index], boards[1 - player_index] = bitboard.apply(boards[player_index], boards[1 - player_index], column_index, die_value)
+
+    return boards[0], boards[1]
+
+def final_scores(game):
+    board_one, board_two = replay(game)
+
+    return bitboard.board_score(board_one), bitboard.board_score(board_two)
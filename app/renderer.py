@@ -0,0 +1,93 @@
+import shutil
+import sys
+from array import array
+from os import system, name
+
+# Incremental terminal drawing with ANSI escape codes.
+#
+# The renderer remembers the last frame it drew at the top of the screen, as the hash of each line rather
+# than the line itself. Each new frame moves the cursor to the lines that changed and rewrites only those,
+# then parks the cursor below the frame and clears the rest of the screen, so messages and prompts from
+# the last turn go away. Everything is sent as one write. Rows are addressed from the top of the screen,
+# so that only holds while the frame and the messages under it fit the terminal; once they would scroll
+# it, every frame is drawn in full from a cleared screen instead.
+
+CURSOR_HOME = "\033[H"
+CLEAR_SCREEN = "\033[2J"
+CLEAR_LINE_END = "\033[K"
+CLEAR_SCREEN_END = "\033[J"
+
+# Rows kept under the frame for what a turn prints before the next draw: the first turn of a game has
+# the 4-line first-player message, the 2-line roll prompt, the 4-line roll message and the column prompt,
+# and the cursor ends a line below them. A turn that re-asks for a column prints more, and the game
+# resets the renderer after it.
+MESSAGE_LINES = 12
+
+_windows_console_ready = False
+
+
+def _prepare_windows_console():
+    """
+    Windows consoles only honour escape codes once virtual terminal processing is on; an empty
+    shell command turns it on for the rest of the process.
+    """
+    global _windows_console_ready
+
+    if name == 'nt' and not _windows_console_ready:
+        _ = system('')
+        _windows_console_ready = True
+
+    return None
+
+def fits_terminal(height):
+    """
+    Whether a frame of the given height, and the messages under it, fit the terminal without scrolling.
+    """
+    return height + MESSAGE_LINES <= shutil.get_terminal_size().lines
+
+def move_to(row):
+    return f"\033[{row + 1};1H"
+
+
+class TerminalRenderer:
+
+    __slots__ = ('stream', '_previous')
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self._previous = None
+
+    def reset(self):
+        """
+        Forget the last frame, so the next one clears the screen and draws everything.
+        """
+        self._previous = None
+
+        return None
+
+    def draw(self, lines):
+        """
+        Bring the screen up to date with the given frame lines.
+        """
+        stream = self.stream or sys.stdout
+        previous = self._previous
+        hashes = array('q', map(hash, lines)) # Hashes are all a comparison needs, at a fraction of the memory.
+        output = []
+
+        if previous is None or len(previous) != len(lines) or not fits_terminal(len(lines)):
+            _prepare_windows_console()
+            output.append(CURSOR_HOME + CLEAR_SCREEN)
+            output.append("\n".join(lines))
+        elif hashes != previous:
+            for row, (line, line_hash, previous_hash) in enumerate(zip(lines, hashes, previous)):
+                if line_hash != previous_hash:
+                    output.append(move_to(row) + line + CLEAR_LINE_END)
+
+        output.append(move_to(len(lines)) + CLEAR_SCREEN_END)
+
+        stream.write("".join(output))
+        stream.flush()
+
+        self._previous = hashes
+
+        return None
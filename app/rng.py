@@ -0,0 +1,61 @@
+import hashlib
+import random
+
+from app import engine
+
+# Random number streams for reproducible simulation.
+#
+# Every game or worker should own a random.Random seeded from spawn_seeds(), rather than share the
+# global one. Child seeds are hashes of the parent seed and the child's index, so they do not depend
+# on how many other children are drawn, in what order, or in which process; and a child seed can be
+# spawned from again.
+
+
+def spawn_seeds(seed, count, start=0):
+    """
+    Derive independent 128-bit child seeds from a parent seed; a parent of None draws fresh entropy.
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(128)
+
+    parent = str(seed).encode()
+
+    return [
+        int.from_bytes(hashlib.blake2b(parent + b':' + str(index).encode(), digest_size=16).digest(), 'little')
+        for index in range(start, start + count)
+    ]
+
+def spawn_rngs(seed, count, start=0):
+    return [random.Random(child) for child in spawn_seeds(seed, count, start)]
+
+
+class DiceStream:
+
+    def __init__(self, rng=None, faces=engine.DIE_FACES, block_size=1024):
+        self.rng = rng if rng is not None else random.Random()
+        self.faces = faces
+        self.block_size = block_size
+        self._limit = 256 - 256 % faces # Bytes at or past this would favour the low faces.
+
+    def block(self):
+        """
+        Roll a block of dice at once from random bytes; fewer than block_size after rejections.
+        """
+        faces, limit = self.faces, self._limit
+
+        return [byte % faces + 1 for byte in self.rng.randbytes(self.block_size) if byte < limit]
+
+    def __iter__(self):
+        while True:
+            yield from self.block()
+
+    def take(self, count):
+        """
+        Roll exactly count dice.
+        """
+        dice = []
+
+        while len(dice) < count:
+            dice.extend(self.block())
+
+        return dice[:count]
@@ -0,0 +1,383 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import engine
+from app.rng import spawn_seeds
+
+# Multiplayer game server over a line-based TCP protocol.
+#
+# Client to server:
+#   JOIN <name>           Enter matchmaking.
+#   PLACE <L|M|R>         Place the rolled die when it is your turn.
+#   QUIT                  Leave; an unfinished game is forfeited.
+#
+# Server to client:
+#   WELCOME, WAITING
+#   START <opponent> <FIRST|SECOND>
+#   ROLL <YOU|OPPONENT> <die>
+#   YOUR_TURN <die> <open columns, e.g. LMR>
+#   MOVE <YOU|OPPONENT> <die> <column> <dice removed>
+#   BOARD <your board> <their board> <your score> <their score>    Boards read as 003,025,000; columns top to bottom.
+#   GAME_OVER <WIN|LOSS|DRAW|FORFEIT_WIN|FORFEIT_LOSS> <your score> <their score>
+#   ERROR <message>
+#
+# Every match is a headless engine.KnucklebonesState; nothing in the turn path blocks the event loop.
+# Finished matches go to the stats store on a single writer thread, so SQLite never runs on the loop,
+# and a queue that has not filled up is written by one timer at most.
+
+COLUMN_NAMES = 'LMR'
+
+
+def format_board(matrix):
+    return ','.join(''.join(str(value) for value in column) for column in matrix)
+
+
+class Connection:
+
+    def __init__(self, reader, writer, timeout=None):
+        self.reader = reader
+        self.writer = writer
+        self.timeout = timeout
+        self.name = ''
+        self.finished = asyncio.get_running_loop().create_future()
+
+    async def send(self, *parts):
+        self.writer.write((' '.join(str(part) for part in parts) + '\n').encode())
+        await self.writer.drain()
+
+        return None
+
+    async def receive(self):
+        """
+        Read one command; returns (command, arguments), or (None, '') once the client has gone or
+        broken the protocol.
+        """
+        try:
+            line = await asyncio.wait_for(self.reader.readline(), self.timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            return None, ''
+        except (ValueError, asyncio.LimitOverrunError): # A line longer than the stream limit.
+            try:
+                await self.send('ERROR', 'Line too long')
+            except ConnectionError:
+                pass
+            return None, ''
+
+        if not line:
+            return None, ''
+
+        command, _, argument = line.decode(errors='replace').strip().partition(' ')
+
+        return command.upper(), argument.strip()
+
+    async def close(self):
+        self.writer.close()
+
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+        return None
+
+
+class PlayerLeft(Exception):
+
+    def __init__(self, index):
+        super().__init__(f"Player {index} left the match.")
+        self.index = index
+
+
+class Match:
+
+    def __init__(self, connections, rng):
+        self.connections = connections
+        self.rng = rng
+        self.state = engine.KnucklebonesState(player_to_move=rng.randrange(2))
+
+    async def _send(self, index, *parts):
+        """
+        Send a line to one player; raises PlayerLeft if their connection has gone.
+        """
+        try:
+            await self.connections[index].send(*parts)
+        except ConnectionError:
+            raise PlayerLeft(index) from None
+
+        return None
+
+    async def _broadcast(self, mover, *parts):
+        """
+        Send a line to both players, with YOU or OPPONENT filled in for each.
+        """
+        for index in range(len(self.connections)):
+            await self._send(index, parts[0], 'YOU' if index == mover else 'OPPONENT', *parts[1:])
+
+        return None
+
+    async def run(self):
+        """
+        Play the match out; returns the winner's index, or None for a draw. A player who leaves,
+        whether on their turn or not, forfeits.
+        """
+        try:
+            for index in range(len(self.connections)):
+                await self._send(index, 'START', self.connections[1 - index].name, 'FIRST' if index == self.state.player_to_move else 'SECOND')
+
+            while not self.state.is_terminal():
+                mover = self.state.player_to_move
+                die_value = self.rng.randint(1, engine.DIE_FACES)
+
+                await self._broadcast(mover, 'ROLL', die_value)
+
+                column_index = await self._ask_for_column(mover, die_value)
+                if column_index is None:
+                    return await self._forfeit(mover)
+
+                removed = self.state.apply(die_value, column_index)
+
+                await self._broadcast(mover, 'MOVE', die_value, COLUMN_NAMES[column_index], removed)
+                await self._send_boards()
+        except PlayerLeft as left:
+            return await self._forfeit(left.index)
+
+        return await self._finish()
+
+    async def _ask_for_column(self, mover, die_value):
+        connection = self.connections[mover]
+        legal_moves = self.state.legal_moves()
+        open_columns = ''.join(COLUMN_NAMES[i] for i in legal_moves)
+
+        await self._send(mover, 'YOUR_TURN', die_value, open_columns)
+
+        while True:
+            command, argument = await connection.receive()
+
+            if command is None or command == 'QUIT':
+                return None
+            elif command != 'PLACE' or argument.upper() not in tuple(COLUMN_NAMES):
+                await self._send(mover, 'ERROR', 'Expected PLACE L, PLACE M or PLACE R')
+            elif COLUMN_NAMES.index(argument.upper()) not in legal_moves:
+                await self._send(mover, 'ERROR', f"That column is full; open columns are {open_columns}")
+            else:
+                return COLUMN_NAMES.index(argument.upper())
+
+    async def _send_boards(self):
+        scores = self.state.scores
+
+        for index in range(len(self.connections)):
+            await self._send(
+                index,
+                'BOARD',
+                format_board(self.state.matrices[index]), format_board(self.state.matrices[1 - index]),
+                scores[index], scores[1 - index]
+            )
+
+        return None
+
+    async def _finish(self):
+        scores = self.state.scores
+        winner = self.state.winner
+
+        for index, connection in enumerate(self.connections):
+            result = 'DRAW' if winner is None else ('WIN' if winner == index else 'LOSS')
+            try:
+                await connection.send('GAME_OVER', result, scores[index], scores[1 - index])
+            except ConnectionError:
+                pass # The result stands; there is just nobody left to tell.
+
+        return winner
+
+    async def _forfeit(self, leaver):
+        scores = self.state.scores
+
+        for index, connection in enumerate(self.connections):
+            try:
+                await connection.send('GAME_OVER', 'FORFEIT_LOSS' if index == leaver else 'FORFEIT_WIN', scores[index], scores[1 - index])
+            except ConnectionError:
+                pass
+
+        return 1 - leaver
+
+
+class KnucklebonesServer:
+
+    def __init__(self, host='127.0.0.1', port=7777, turn_timeout=60, seed=None, stats=None):
+        self.host = host
+        self.port = port
+        self.turn_timeout = turn_timeout
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(128)
+        self.stats = stats # A stats.StatsStore; finished matches are queued there and written in batches.
+        self.matches_started = 0
+        self.matches_finished = 0
+        self._waiting = None
+        self._server = None
+        self._stats_writer = None # A one-thread executor that owns every call into the stats store.
+        self._flush_timer = None
+
+    @property
+    def active_matches(self):
+        return self.matches_started - self.matches_finished
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=1024)
+        self.port = self._server.sockets[0].getsockname()[1] # Resolves port 0 to the one picked.
+
+        return None
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stop accepting connections, and write out every queued match before the stats store is
+        handed back; the store may be closed once this returns.
+        """
+        self._server.close()
+
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        if self._stats_writer is not None:
+            await asyncio.get_running_loop().run_in_executor(self._stats_writer, self.stats.flush)
+            self._stats_writer.shutdown()
+            self._stats_writer = None
+
+        await self._server.wait_closed()
+
+        return None
+
+    async def _handle(self, reader, writer):
+        connection = Connection(reader, writer, self.turn_timeout)
+
+        try:
+            await connection.send('WELCOME')
+            command, argument = await connection.receive()
+
+            if command is None:
+                return None
+            elif command != 'JOIN':
+                await connection.send('ERROR', 'Expected JOIN <name>')
+                return None
+
+            connection.name = (argument or 'Player').split()[0][:24]
+            await self._matchmake(connection)
+        except ConnectionError:
+            pass
+        finally:
+            if self._waiting is connection:
+                self._waiting = None
+
+            await connection.close()
+
+        return None
+
+    async def _matchmake(self, connection):
+        """
+        Pair the connection with whoever is waiting, or wait for the next arrival.
+        Whichever handler completes the pair runs the match; the other waits until it is over.
+        """
+        opponent = self._waiting
+
+        if opponent is None or opponent.reader.at_eof(): # Nobody waiting, or they hung up while queued.
+            if opponent is not None and not opponent.finished.done():
+                opponent.finished.set_result(None) # Let their handler close the connection.
+
+            self._waiting = connection
+            await connection.send('WAITING')
+            await connection.finished
+            return None
+
+        self._waiting = None
+        match_seed, = spawn_seeds(self.seed, 1, start=self.matches_started) # Every match rolls its own dice.
+        self.matches_started += 1
+
+        match = Match((opponent, connection), random.Random(match_seed))
+
+        try:
+            await match.run()
+            if self.stats: self._record(match)
+        finally:
+            self.matches_finished += 1
+            if not opponent.finished.done():
+                opponent.finished.set_result(None)
+
+        return None
+
+
+    def _record(self, match):
+        """
+        Queue a finished match for the stats store on the writer thread, and make sure it is written
+        even if no other match finishes for a while.
+        """
+        if not match.state.is_terminal():
+            return None # Forfeited.
+
+        loop = asyncio.get_running_loop()
+        scores = match.state.scores
+
+        if self._stats_writer is None:
+            self._stats_writer = ThreadPoolExecutor(1, thread_name_prefix='stats-writer')
+
+        loop.run_in_executor(self._stats_writer, self.stats.record_game, match.connections[0].name, match.connections[1].name, scores[0], scores[1])
+
+        if self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.stats.flush_interval, self._flush_stats)
+
+        return None
+
+    def _flush_stats(self):
+        self._flush_timer = None
+        asyncio.get_running_loop().run_in_executor(self._stats_writer, self.stats.flush)
+
+        return None
+
+
+async def play_bot_client(host, port, name, rng):
+    """
+    Join a game and place dice at random until it ends; returns the GAME_OVER arguments.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+
+    try:
+        writer.write(f"JOIN {name}\n".encode())
+        await writer.drain()
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+
+            command, _, argument = line.decode().strip().partition(' ')
+
+            if command == 'YOUR_TURN':
+                _, open_columns = argument.split()
+                writer.write(f"PLACE {rng.choice(open_columns)}\n".encode())
+                await writer.drain()
+            elif command == 'GAME_OVER':
+                return argument.split()
+    finally:
+        writer.close()
+
+async def run_load_test(host, port, clients, seed=None):
+    """
+    Connect many random bots at once; returns (games finished, seconds taken).
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    results = await asyncio.gather(
+        *(play_bot_client(host, port, f"bot{i}", random.Random(rng.getrandbits(64))) for i in range(clients)),
+        return_exceptions=True
+    )
+
+    finished = sum(1 for result in results if isinstance(result, list))
+
+    return finished // 2, time.perf_counter() - started
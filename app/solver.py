@@ -0,0 +1,280 @@
+import mmap
+import struct
+
+from app import bitboard, engine
+
+# Exact solver and on-disk tablebase.
+#
+# Positions are seen from the player about to roll: (mover_board, opponent_board), packed as in app.bitboard.
+# Two normalisations keep the state count down without changing any values:
+#   * the order of dice inside a column never matters again (scoring and removal only look at counts),
+#     so every column is stored sorted;
+#   * columns only interact with the opponent's column at the same index, so the three column pairs
+#     are sorted as a unit.
+# Dice can be knocked out, so positions repeat and the game graph has cycles; values are found by
+# value iteration over every position reachable from the roots rather than by plain recursion.
+
+
+class SolverLimitError(Exception):
+    pass
+
+
+def _build_sorted_columns():
+    table = [0] * bitboard.COLUMN_STATES
+
+    for code in range(bitboard.COLUMN_STATES):
+        table[code] = bitboard.pack_column(sorted(bitboard.unpack_column(code)))
+
+    return tuple(table)
+
+SORTED_COLUMN = _build_sorted_columns()
+
+
+def canonical_position(mover_board, opponent_board):
+    """
+    Normalise a position; returns (mover_board, opponent_board, order) where order[i] is the
+    original index of canonical column i.
+    """
+    pairs = sorted(
+        (SORTED_COLUMN[(mover_board >> shift) & bitboard.COLUMN_MASK],
+         SORTED_COLUMN[(opponent_board >> shift) & bitboard.COLUMN_MASK],
+         index)
+        for index, shift in enumerate(bitboard.COLUMN_SHIFTS)
+    )
+
+    mover, opponent = 0, 0
+    for shift, (mover_code, opponent_code, _) in zip(bitboard.COLUMN_SHIFTS, pairs):
+        mover |= mover_code << shift
+        opponent |= opponent_code << shift
+
+    return mover, opponent, tuple(index for _, _, index in pairs)
+
+def position_key(mover_board, opponent_board):
+    return (mover_board << 27) | opponent_board
+
+def state_key(mover_board, opponent_board, die_value):
+    return (position_key(mover_board, opponent_board) << 3) | die_value
+
+def terminal_win_probability(mover_board, opponent_board):
+    """
+    Result of a finished game for the player who just moved; a draw counts as half a win.
+    """
+    mover_score = bitboard.board_score(mover_board)
+    opponent_score = bitboard.board_score(opponent_board)
+
+    if mover_score == opponent_score:
+        return 0.5
+
+    return 1.0 if mover_score > opponent_score else 0.0
+
+
+class Solver:
+
+    def __init__(self, max_positions=2000000, tolerance=1e-12, max_iterations=10000):
+        self.max_positions = max_positions
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self._index = {}
+        self._positions = []
+        self._moves = [] # Per position and die: a list of (column, successor index or None, terminal value).
+        self.values = []
+        self.iterations = 0
+
+    def solve(self, roots):
+        """
+        Solve every position reachable from the given (mover_board, opponent_board) roots.
+        """
+        for mover_board, opponent_board in roots:
+            if bitboard.is_board_full(mover_board) or bitboard.is_board_full(opponent_board):
+                raise ValueError("A full board means the game is over; there is nothing left to solve.")
+
+            mover_board, opponent_board, _ = canonical_position(mover_board, opponent_board)
+            self._add_position(mover_board, opponent_board)
+
+        cursor = 0
+        while cursor < len(self._positions):
+            self._expand(cursor)
+            cursor += 1
+
+        self._iterate()
+
+        return self
+
+    def _add_position(self, mover_board, opponent_board):
+        key = position_key(mover_board, opponent_board)
+        index = self._index.get(key)
+
+        if index is None:
+            if len(self._positions) >= self.max_positions:
+                raise SolverLimitError(f"More than {self.max_positions} positions are reachable; raise the limit or solve from a later position.")
+
+            index = len(self._positions)
+            self._index[key] = index
+            self._positions.append((mover_board, opponent_board))
+            self._moves.append(None)
+            self.values.append(0.5)
+
+        return index
+
+    def _expand(self, index):
+        mover_board, opponent_board = self._positions[index]
+        moves_by_die = []
+
+        for die_value in engine.DIE_VALUES:
+            moves = []
+
+            for column_index in bitboard.open_columns(mover_board):
+                new_mover, new_opponent = bitboard.apply(mover_board, opponent_board, column_index, die_value)
+
+                if bitboard.is_board_full(new_mover):
+                    moves.append((column_index, None, terminal_win_probability(new_mover, new_opponent)))
+                else:
+                    next_mover, next_opponent, _ = canonical_position(new_opponent, new_mover)
+                    moves.append((column_index, self._add_position(next_mover, next_opponent), 0.0))
+
+            moves_by_die.append(moves)
+
+        self._moves[index] = moves_by_die
+
+        return None
+
+    def _move_value(self, move):
+        _, successor, terminal = move
+
+        if successor is None:
+            return terminal
+
+        return 1.0 - self.values[successor]
+
+    def _iterate(self):
+        """
+        Gauss-Seidel value iteration until no value moves by more than the tolerance.
+        """
+        values = self.values
+
+        for self.iterations in range(1, self.max_iterations + 1):
+            largest_change = 0.0
+
+            for index, moves_by_die in enumerate(self._moves):
+                total = 0.0
+                for moves in moves_by_die:
+                    total += max(self._move_value(move) for move in moves)
+
+                value = total / engine.DIE_FACES
+                change = abs(value - values[index])
+                if change > largest_change:
+                    largest_change = change
+
+                values[index] = value
+
+            if largest_change <= self.tolerance:
+                break
+
+        return None
+
+    def position_count(self):
+        return len(self._positions)
+
+    def entries(self):
+        """
+        Yield (state_key, win_probability, best_column) for every solved position and die.
+        Columns are in canonical order.
+        """
+        for index, (mover_board, opponent_board) in enumerate(self._positions):
+            for die_value, moves in zip(engine.DIE_VALUES, self._moves[index]):
+                best = max(moves, key=self._move_value)
+                yield state_key(mover_board, opponent_board, die_value), self._move_value(best), best[0]
+
+    def policies(self):
+        """
+        Yield (position_key, best column for each of dice 1-6) for every solved position.
+        Columns are in canonical order.
+        """
+        for index, (mover_board, opponent_board) in enumerate(self._positions):
+            yield position_key(mover_board, opponent_board), tuple(max(moves, key=self._move_value)[0] for moves in self._moves[index])
+
+    def win_probability(self, mover_board, opponent_board):
+        """
+        Chance the player about to roll wins a solved position, before the roll.
+        """
+        mover_board, opponent_board, _ = canonical_position(mover_board, opponent_board)
+
+        return self.values[self._index[position_key(mover_board, opponent_board)]]
+
+
+# Tablebase file layout: a header, then an open-addressing hash table of fixed-size slots.
+# A slot holds the state key plus one (zero marks an empty slot), the win probability and the best column.
+
+TABLEBASE_MAGIC = b'KBTB'
+TABLEBASE_VERSION = 1
+HEADER = struct.Struct('<4sIQQ')
+SLOT = struct.Struct('<QfB3x')
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def _slot_for(key, slot_bits):
+    return ((key * HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - slot_bits)
+
+def write_tablebase(path, entries):
+    """
+    Write (state_key, win_probability, best_column) entries to a tablebase file.
+    """
+    entries = list(entries)
+    slot_bits = max(4, (2 * len(entries)).bit_length()) # Keep the table at most half full.
+    slot_mask = (1 << slot_bits) - 1
+    table = bytearray(HEADER.size + SLOT.size * (1 << slot_bits))
+    HEADER.pack_into(table, 0, TABLEBASE_MAGIC, TABLEBASE_VERSION, slot_bits, len(entries))
+
+    for key, win_probability, best_column in entries:
+        slot = _slot_for(key, slot_bits)
+
+        while SLOT.unpack_from(table, HEADER.size + slot * SLOT.size)[0]:
+            slot = (slot + 1) & slot_mask
+
+        SLOT.pack_into(table, HEADER.size + slot * SLOT.size, key + 1, win_probability, best_column)
+
+    with open(path, 'wb') as tablebase_file:
+        tablebase_file.write(table)
+
+    return None
+
+
+class Tablebase:
+
+    def __init__(self, path):
+        with open(path, 'rb') as tablebase_file:
+            self._map = mmap.mmap(tablebase_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._slot_bits, self.entry_count = HEADER.unpack_from(self._map, 0)
+
+        if magic != TABLEBASE_MAGIC or version != TABLEBASE_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {TABLEBASE_VERSION} Knucklebones tablebase.")
+
+        self._slot_mask = (1 << self._slot_bits) - 1
+
+    def __len__(self):
+        return self.entry_count
+
+    def lookup(self, mover_board, opponent_board, die_value):
+        """
+        Return (win_probability, best_column) for the player about to place the die, or None if unsolved.
+        """
+        mover, opponent, order = canonical_position(mover_board, opponent_board)
+        stored_key = state_key(mover, opponent, die_value) + 1
+        slot = _slot_for(stored_key - 1, self._slot_bits)
+
+        while True:
+            key, win_probability, best_column = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)
+
+            if key == stored_key:
+                return win_probability, order[best_column]
+            elif not key:
+                return None
+
+            slot = (slot + 1) & self._slot_mask
+
+    def close(self):
+        self._map.close()
+
+        return None
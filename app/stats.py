@@ -0,0 +1,204 @@
+import sqlite3
+import time
+
+# Persistent player statistics in SQLite.
+#
+# Finished games are queued in memory and written in batches, each batch in one transaction, so a busy
+# server does not pay for a commit per game. Every game adds a row to games, and one row per player to
+# results, which is what the record and head-to-head queries read through its indexes. Each player's
+# totals are kept up to date on their players row in the same transaction, so the leaderboard is a
+# read of the first rows of an index in leaderboard order rather than a count over every result.
+# Queries write out anything still queued first. The store expects to be the only writer to its file.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    draws INTEGER NOT NULL DEFAULT 0,
+    games INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at REAL NOT NULL,
+    player_one_id INTEGER NOT NULL REFERENCES players (id),
+    player_two_id INTEGER NOT NULL REFERENCES players (id),
+    score_one INTEGER NOT NULL,
+    score_two INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    player_id INTEGER NOT NULL REFERENCES players (id),
+    opponent_id INTEGER NOT NULL REFERENCES players (id),
+    score INTEGER NOT NULL,
+    opponent_score INTEGER NOT NULL,
+    outcome INTEGER NOT NULL -- 1 for a win, 0 for a draw, -1 for a loss.
+);
+CREATE INDEX IF NOT EXISTS results_by_player ON results (player_id, outcome);
+CREATE INDEX IF NOT EXISTS results_by_pairing ON results (player_id, opponent_id, outcome);
+"""
+
+RANKING_INDEX = "CREATE INDEX IF NOT EXISTS players_by_rank ON players (wins DESC, losses, name)"
+
+# Stores written before players kept their totals get the columns added and filled in from results.
+TOTAL_COLUMNS = ('wins', 'losses', 'draws', 'games')
+BACKFILL_TOTALS = """
+UPDATE players SET
+    wins = (SELECT COUNT(*) FROM results WHERE player_id = players.id AND outcome = 1),
+    losses = (SELECT COUNT(*) FROM results WHERE player_id = players.id AND outcome = -1),
+    draws = (SELECT COUNT(*) FROM results WHERE player_id = players.id AND outcome = 0),
+    games = (SELECT COUNT(*) FROM results WHERE player_id = players.id)
+"""
+
+LEADERBOARD_QUERY = """
+SELECT name, wins, losses, draws, games
+FROM players
+WHERE games >= ?
+ORDER BY wins DESC, losses ASC, name ASC
+LIMIT ?
+"""
+
+ADD_TOTALS = "UPDATE players SET wins = wins + ?, losses = losses + ?, draws = draws + ?, games = games + 1 WHERE id = ?"
+
+RECORD_QUERY = """
+SELECT COALESCE(SUM(outcome = 1), 0), COALESCE(SUM(outcome = -1), 0), COALESCE(SUM(outcome = 0), 0)
+FROM results
+WHERE player_id = (SELECT id FROM players WHERE name = ?)
+"""
+
+HEAD_TO_HEAD_QUERY = RECORD_QUERY.strip() + " AND opponent_id = (SELECT id FROM players WHERE name = ?)"
+
+
+def _outcome(score, opponent_score):
+    return (score > opponent_score) - (score < opponent_score)
+
+
+class StatsStore:
+
+    def __init__(self, path, batch_size=200, flush_interval=2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval # Seconds a game may wait in the queue before a write.
+        # Transactions are begun explicitly. The server hands the store to a writer thread, so it may be
+        # used from a thread other than its creator's, though only ever from one thread at a time.
+        self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(SCHEMA)
+        self._add_total_columns()
+        self._connection.execute(RANKING_INDEX)
+        self._player_ids = {name: player_id for player_id, name in self._connection.execute("SELECT id, name FROM players")}
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self.batches_written = 0
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def record_game(self, name_one, name_two, score_one, score_two, played_at=None):
+        """
+        Queue a finished game; the queue is written once it is full or has waited long enough.
+        """
+        self._pending.append((played_at or time.time(), name_one, name_two, score_one, score_two))
+
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+        return None
+
+    def flush(self):
+        """
+        Write every queued game in a single transaction.
+        """
+        self._last_flush = time.monotonic()
+
+        if not self._pending:
+            return None
+
+        pending, self._pending = self._pending, []
+        connection = self._connection
+
+        connection.execute("BEGIN")
+        try:
+            new_names = {name for game in pending for name in game[1:3] if name not in self._player_ids}
+            connection.executemany("INSERT OR IGNORE INTO players (name) VALUES (?)", ((name,) for name in new_names))
+            for name in new_names:
+                self._player_ids[name] = connection.execute("SELECT id FROM players WHERE name = ?", (name,)).fetchone()[0]
+
+            first_id = connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM games").fetchone()[0]
+            games, results = [], []
+
+            for game_id, (played_at, name_one, name_two, score_one, score_two) in enumerate(pending, first_id):
+                one, two = self._player_ids[name_one], self._player_ids[name_two]
+                games.append((game_id, played_at, one, two, score_one, score_two))
+                results.append((game_id, one, two, score_one, score_two, _outcome(score_one, score_two)))
+                results.append((game_id, two, one, score_two, score_one, _outcome(score_two, score_one)))
+
+            connection.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?)", games)
+            connection.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)", results)
+            connection.executemany(ADD_TOTALS, ((outcome == 1, outcome == -1, outcome == 0, player_id) for _, player_id, _, _, _, outcome in results))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            self._player_ids = {name: player_id for player_id, name in connection.execute("SELECT id, name FROM players")}
+            self._pending = pending + self._pending
+            raise
+
+        self.batches_written += 1
+
+        return None
+
+    def _add_total_columns(self):
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(players)")}
+
+        if not set(TOTAL_COLUMNS) <= columns:
+            self._connection.execute("BEGIN")
+            for column in TOTAL_COLUMNS:
+                if column not in columns:
+                    self._connection.execute(f"ALTER TABLE players ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            self._connection.execute(BACKFILL_TOTALS)
+            self._connection.execute("COMMIT")
+
+        return None
+
+    def leaderboard(self, limit=10, min_games=1):
+        """
+        Players with the most wins; returns [(name, wins, losses, draws, games), ...].
+        """
+        self.flush()
+
+        return self._connection.execute(LEADERBOARD_QUERY, (min_games, limit)).fetchall()
+
+    def player_record(self, name):
+        """
+        All-time (wins, losses, draws) of a player.
+        """
+        self.flush()
+
+        return self._connection.execute(RECORD_QUERY, (name,)).fetchone()
+
+    def head_to_head(self, name, opponent_name):
+        """
+        All-time (wins, losses, draws) of a player against one opponent.
+        """
+        self.flush()
+
+        return self._connection.execute(HEAD_TO_HEAD_QUERY, (name, opponent_name)).fetchone()
+
+    def game_count(self):
+        self.flush()
+
+        return self._connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+        return None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
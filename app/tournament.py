@@ -0,0 +1,265 @@
+import itertools
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app import ai, bitboard, engine, mcts
+from app.rng import DiceStream, spawn_seeds
+
+# Strategy tournaments.
+#
+# A strategy is a factory returning a policy; a policy takes (mover_board, opponent_board, die_value)
+# on packed boards and returns a column index. Factories are looked up by name inside each worker
+# process, so nothing but names, seeds and results crosses the process boundary. Task seeds are spawned
+# from the tournament seed by task number, so results do not depend on which worker plays what, or when.
+
+
+def _random_strategy(rng):
+    return lambda mover_board, opponent_board, die_value: rng.choice(bitboard.open_columns(mover_board))
+
+def _expectimax_strategy(depth):
+    def factory(rng):
+        search = ai.ExpectimaxSearch(depth=depth)
+        return lambda mover_board, opponent_board, die_value: search.best_column(mover_board, opponent_board, die_value)[0]
+
+    return factory
+
+def _mcts_strategy(rng):
+    return mcts.MonteCarloTreeSearch(playouts=200, seed=rng.getrandbits(64)).best_column
+
+STRATEGIES = {
+    'random': _random_strategy,
+    'greedy': _expectimax_strategy(1),
+    'expectimax-2': _expectimax_strategy(2),
+    'expectimax-3': _expectimax_strategy(3),
+    'mcts': _mcts_strategy,
+}
+
+
+def register_strategy(name, factory):
+    """
+    Make a strategy available by name. Worker processes import this module afresh, so register
+    strategies at import time of a module the workers also load.
+    """
+    STRATEGIES[name] = factory
+
+    return None
+
+def play_game(policies, rng, first_player=0, dice=None):
+    """
+    Play one game between two policies; returns the final (score_one, score_two).
+    Dice come from rng, unless an iterable of pre-rolled dice is given.
+    """
+    boards = [bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD]
+    mover = first_player
+    rolls = iter(dice) if dice is not None else iter(lambda: rng.randint(1, engine.DIE_FACES), None)
+
+    while True:
+        die_value = next(rolls)
+        column_index = policies[mover](boards[mover], boards[1 - mover], die_value)
+        boards[mover], boards[1 - mover] = bitboard.apply(boards[mover], boards[1 - mover], column_index, die_value)
+
+        if bitboard.is_board_full(boards[mover]):
+            return bitboard.board_score(boards[0]), bitboard.board_score(boards[1])
+
+        mover = 1 - mover
+
+def play_match(strategy_one, strategy_two, games, seed):
+    """
+    Worker entry point; play a run of games between two named strategies, alternating who goes first.
+    Returns (strategy_one, strategy_two, [(score_one, score_two), ...]).
+    The policies share one stream spawned from the seed, and every game rolls its own.
+    """
+    policy_seed, *game_seeds = spawn_seeds(seed, games + 1)
+    rng = random.Random(policy_seed)
+    policies = (STRATEGIES[strategy_one](rng), STRATEGIES[strategy_two](rng))
+
+    results = [
+        play_game(policies, rng, first_player=i % 2, dice=DiceStream(random.Random(game_seed), block_size=64))
+        for i, game_seed in enumerate(game_seeds)
+    ]
+
+    return strategy_one, strategy_two, results
+
+
+class EloRatings:
+
+    def __init__(self, names, prior_draws=1.0, iterations=500):
+        self.names = list(names)
+        self.prior_draws = prior_draws # Virtual draws per pairing; keeps unbeaten or winless strategies finite.
+        self.iterations = iterations
+        self._points = {} # (one, two) -> [points for one, games]
+
+    def add(self, strategy_one, strategy_two, points, games):
+        """
+        Record games between two strategies; points are strategy_one's wins plus half its draws.
+        """
+        for key, scored in (((strategy_one, strategy_two), points), ((strategy_two, strategy_one), games - points)):
+            tally = self._points.setdefault(key, [0.0, 0])
+            tally[0] += scored
+            tally[1] += games
+
+        return None
+
+    def ratings(self):
+        """
+        Fit a Bradley-Terry model to every result so far; returns {name: (rating, standard_error)} on the
+        Elo scale, centred on 1500.
+        """
+        strengths = {name: 1.0 for name in self.names}
+        pairings = {name: [] for name in self.names}
+
+        for (one, two), (points, games) in self._points.items():
+            pairings[one].append((two, points + self.prior_draws / 2, games + self.prior_draws))
+
+        for _ in range(self.iterations):
+            for name, opponents in pairings.items():
+                if opponents:
+                    points = sum(scored for _, scored, _ in opponents)
+                    weight = sum(games / (strengths[name] + strengths[opponent]) for opponent, _, games in opponents)
+                    strengths[name] = points / weight
+
+            mean_log = sum(math.log(strength) for strength in strengths.values()) / len(strengths)
+            strengths = {name: strength / math.exp(mean_log) for name, strength in strengths.items()}
+
+        scale = 400 / math.log(10)
+        ratings = {}
+
+        for name, opponents in pairings.items():
+            information = sum(
+                games * strengths[name] * strengths[opponent] / (strengths[name] + strengths[opponent]) ** 2
+                for opponent, _, games in opponents
+            )
+            error = scale / math.sqrt(information) if information else float('inf')
+            ratings[name] = (1500 + scale * math.log(strengths[name]), error)
+
+        return ratings
+
+
+class Standing:
+
+    def __init__(self, name):
+        self.name = name
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+        self.rating = 1500.0
+        self.error = float('inf')
+
+    @property
+    def games(self):
+        return self.wins + self.losses + self.draws
+
+    @property
+    def points(self):
+        return self.wins + self.draws / 2
+
+    def interval(self, z=1.96):
+        """
+        Confidence interval of the rating; 95% by default.
+        """
+        return self.rating - z * self.error, self.rating + z * self.error
+
+
+class Tournament:
+
+    def __init__(self, strategies, games_per_match=100, workers=1, seed=None, chunk_size=500, on_result=None):
+        unknown = [name for name in strategies if name not in STRATEGIES]
+        if unknown:
+            raise ValueError(f"Unknown strategies: {', '.join(unknown)}")
+
+        self.standings = {name: Standing(name) for name in strategies}
+        self.ratings = EloRatings(strategies)
+        self.games_per_match = games_per_match
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.on_result = on_result
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(128)
+        self._tasks_spawned = 0
+
+    def round_robin(self):
+        """
+        Every strategy plays every other one.
+        """
+        self._play(list(itertools.combinations(self.standings, 2)))
+
+        return self.table()
+
+    def swiss(self, rounds):
+        """
+        Each round pairs strategies with neighbours in the current ratings, avoiding rematches where possible.
+        """
+        played = set()
+
+        for _ in range(rounds):
+            ranked = [standing.name for standing in self.table()]
+            pairings = []
+
+            while len(ranked) > 1:
+                first = ranked.pop(0)
+                partner = next((name for name in ranked if frozenset((first, name)) not in played), ranked[0])
+                ranked.remove(partner)
+                pairings.append((first, partner))
+                played.add(frozenset((first, partner)))
+
+            self._play(pairings)
+
+        return self.table()
+
+    def _tasks(self, pairings):
+        for strategy_one, strategy_two in pairings:
+            for start in range(0, self.games_per_match, self.chunk_size):
+                games = min(self.chunk_size, self.games_per_match - start)
+                task_seed, = spawn_seeds(self.seed, 1, start=self._tasks_spawned)
+                self._tasks_spawned += 1
+                yield strategy_one, strategy_two, games, task_seed
+
+    def _play(self, pairings):
+        tasks = list(self._tasks(pairings))
+
+        if self.workers <= 1:
+            for task in tasks:
+                self._record(*play_match(*task))
+            return None
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(play_match, *task) for task in tasks]
+            for future in as_completed(futures): # Results stream in as each chunk finishes.
+                self._record(*future.result())
+
+        return None
+
+    def _record(self, strategy_one, strategy_two, results):
+        """
+        Tally a finished chunk of games and refresh the ratings.
+        """
+        one, two = self.standings[strategy_one], self.standings[strategy_two]
+        points = 0.0
+
+        for score_one, score_two in results:
+            if score_one == score_two:
+                one.draws += 1
+                two.draws += 1
+                points += 0.5
+            elif score_one > score_two:
+                one.wins += 1
+                two.losses += 1
+                points += 1
+            else:
+                one.losses += 1
+                two.wins += 1
+
+        self.ratings.add(strategy_one, strategy_two, points, len(results))
+        for name, (rating, error) in self.ratings.ratings().items():
+            self.standings[name].rating, self.standings[name].error = rating, error
+
+        if self.on_result:
+            self.on_result(strategy_one, strategy_two, results)
+
+        return None
+
+    def table(self):
+        """
+        Standings, best rating first.
+        """
+        return sorted(self.standings.values(), key=lambda standing: (-standing.rating, standing.name))
@@ -0,0 +1,61 @@
+import sys
+import json
+import argparse
+
+from app.benchmark import BENCHMARKS, DEFAULT_THRESHOLD, compare, load_baseline, measure_footprints, run_benchmarks, save_baseline
+from app.utils.helpers import render_nice_message
+
+def footprints():
+    for footprint_name, footprint in measure_footprints().items():
+        print(f"{footprint_name:<24}{footprint:>16,.0f} BYTES EACH")
+
+    return 0
+
+def benchmark():
+    results = run_benchmarks(args.benchmarks, min_time=args.min_time, repeats=args.repeats)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+
+        for benchmark_name, result in results.items():
+            print(f"{benchmark_name:<24}{result:>16,.0f} OPS/S")
+
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+
+    rows, regressions = compare(results, load_baseline(args.baseline), args.threshold)
+
+    for benchmark_name, result, baseline, ratio in rows:
+        flag = "  REGRESSED" if benchmark_name in regressions else ""
+        print(f"{benchmark_name:<24}{result:>16,.0f} OPS/S {ratio:>8.0%} OF BASELINE{flag}")
+
+    if regressions:
+        render_nice_message(f"{len(regressions)} BENCHMARKS REGRESSED MORE THAN {args.threshold:.0%}")
+        return 1
+
+    render_nice_message("NO BENCHMARK REGRESSED")
+
+    return 0
+
+
+parser = argparse.ArgumentParser(prog="Knucklebones Benchmarks", description="Measure the hot paths and compare them with a saved baseline")
+parser.add_argument('benchmarks', nargs='*', help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (Default: all)")
+parser.add_argument('--baseline', default='benchmarks/baseline.json', help='Baseline file (Default: benchmarks/baseline.json)')
+parser.add_argument('--save-baseline', action='store_true', help='Record this run as the new baseline instead of comparing')
+parser.add_argument('-t', '--threshold', type=float, default=DEFAULT_THRESHOLD, help=f'Slowdown that counts as a regression (Default: {DEFAULT_THRESHOLD})')
+parser.add_argument('--min-time', type=float, default=0.2, help='Seconds each timed run lasts at least (Default: 0.2)')
+parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark; the best counts (Default: 3)')
+parser.add_argument('-o', '--output', help='Also write the results to this file as JSON')
+parser.add_argument('--memory', action='store_true', help='Measure the memory each player, game and engine state holds instead')
+args = parser.parse_args()
+
+unknown = [benchmark_name for benchmark_name in args.benchmarks if benchmark_name not in BENCHMARKS]
+if unknown:
+    parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+
+if __name__ == "__main__":
+    sys.exit(footprints() if args.memory else benchmark())
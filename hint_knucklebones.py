@@ -0,0 +1,32 @@
+import argparse
+
+from app.hints import HintServer, MoveEvaluator
+from app.utils.helpers import render_nice_message
+
+def serve():
+    evaluator = MoveEvaluator(args.depth, args.cache_size, batch_size=args.batch_size, batch_window=args.batch_window / 1000)
+    server = HintServer(args.host, args.port, evaluator)
+
+    render_nice_message(f"SERVING MOVE HINTS ON http://{args.host}:{server.port}/evaluate")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return None
+
+
+parser = argparse.ArgumentParser(prog="Knucklebones Hints", description="Answer best-column requests over HTTP")
+parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (Default: 127.0.0.1)')
+parser.add_argument('--port', type=int, default=8777, help='Port to listen on (Default: 8777)')
+parser.add_argument('-d', '--depth', type=int, default=3, help='Search depth for each position (Default: 3)')
+parser.add_argument('--cache-size', type=int, default=100000, help='Positions to keep answers for (Default: 100000)')
+parser.add_argument('--batch-size', type=int, default=256, help='Positions in a batch before it is evaluated without waiting (Default: 256)')
+parser.add_argument('--batch-window', type=float, default=2, help='Milliseconds a batch waits for more requests (Default: 2)')
+args = parser.parse_args()
+
+if __name__ == "__main__":
+    serve()
@@ -1,13 +1,33 @@
 import random
 import argparse
 
+from app.ai import DIFFICULTIES, ExpectimaxPlayer, OraclePlayer
 from app.knucklebones import KnucklebonesGame, KnucklebonesPlayer
+from app.meter import WinProbabilityMeter
+from app.records import GameRecordWriter
+from app.stats import StatsStore
 from app.utils.helpers import render_nice_message
 
 def start_game():
-    knucklebones_game = KnucklebonesGame(args.player_names)
-
-    knucklebones_game.loop()
+    players = None
+    if args.bot:
+        settings = DIFFICULTIES[args.difficulty] if args.difficulty else {'depth': args.bot_depth}
+        bot = OraclePlayer(args.policy, **settings) if args.policy else ExpectimaxPlayer(**settings)
+        players = [KnucklebonesPlayer(), bot]
+
+    recorder = GameRecordWriter(args.record) if args.record else None
+    stats = StatsStore(args.stats) if args.stats else None
+    rng = random.Random(args.seed) if args.seed is not None else None
+    knucklebones_game = KnucklebonesGame(
+        args.player_names, players=players, recorder=recorder, rng=rng, columns=args.columns, rows=args.rows, faces=args.faces,
+        meter=WinProbabilityMeter() if args.meter else None, stats=stats
+    )
+
+    try:
+        knucklebones_game.loop()
+    finally:
+        if recorder: recorder.close()
+        if stats: stats.close()
 
     render_nice_message("THANKS FOR PLAYING!")
 
@@ -16,7 +36,21 @@ def start_game():
 
 parser = argparse.ArgumentParser(prog="Knucklebones", description="A simple program for playing Knucklebones")
 parser.add_argument('-p', '--player-name', action='append', help='Set player names (Up to 2)', dest='player_names')
+parser.add_argument('-b', '--bot', action='store_true', help='Play against the computer')
+parser.add_argument('--bot-depth', type=int, default=3, help='How many turns ahead the computer searches (Default: 3)')
+parser.add_argument('--difficulty', choices=list(DIFFICULTIES), help='Give the computer a time limit per move instead of a fixed depth')
+parser.add_argument('--policy', help='Policy file for the computer to play solved positions from instantly')
+parser.add_argument('--record', help='Append every game played to this game record file')
+parser.add_argument('--stats', help='SQLite file to keep results in, for all-time records across sessions')
+parser.add_argument('--seed', type=int, help='Seed the dice and the choice of who goes first, to replay the same rolls')
+parser.add_argument('--meter', action='store_true', help="Show each player's chance of winning and expected final margin")
+parser.add_argument('--columns', type=int, default=3, help='Columns on each board (Default: 3)')
+parser.add_argument('--rows', type=int, default=3, help='Dice each column holds (Default: 3)')
+parser.add_argument('--faces', type=int, default=6, help='Faces on the die (Default: 6)')
 args = parser.parse_args()
 
+if (args.columns, args.rows, args.faces) != (3, 3, 6) and (args.bot or args.record or args.meter):
+    parser.error("--bot, --record and --meter only work on the standard 3x3 board with a six-sided die")
+
 if __name__ == "__main__":
     start_game()
@@ -0,0 +1,53 @@
+import argparse
+import json
+import time
+
+from app.tournament import STRATEGIES, Tournament
+from app.utils.helpers import render_nice_message
+
+def stream_result(strategy_one, strategy_two, results):
+    """
+    Write each finished chunk of games as one JSON line.
+    """
+    if args.results:
+        results_file.write(json.dumps({'strategies': [strategy_one, strategy_two], 'scores': results}) + "\n")
+        results_file.flush()
+
+    return None
+
+def start_tournament():
+    started = time.perf_counter()
+    tournament = Tournament(args.strategies or list(STRATEGIES), games_per_match=args.games, workers=args.workers, seed=args.seed, on_result=stream_result)
+
+    if args.format == 'swiss':
+        table = tournament.swiss(args.rounds)
+    else:
+        table = tournament.round_robin()
+
+    print(f"{'STRATEGY':<16}{'RATING':>8}{'95% INTERVAL':>20}{'W':>9}{'L':>9}{'D':>7}")
+    for standing in table:
+        low, high = standing.interval()
+        print(f"{standing.name:<16}{standing.rating:>8.0f}{f'{low:.0f} - {high:.0f}':>20}{standing.wins:>9}{standing.losses:>9}{standing.draws:>7}")
+
+    games = sum(standing.games for standing in table) // 2
+    render_nice_message(f"{games} GAMES IN {time.perf_counter() - started:.1f} SECONDS")
+
+    return None
+
+
+parser = argparse.ArgumentParser(prog="Knucklebones Tournament", description="Rate bot strategies against each other")
+parser.add_argument('-s', '--strategy', action='append', choices=sorted(STRATEGIES), help='Strategies to enter (Default: all)', dest='strategies')
+parser.add_argument('-f', '--format', choices=['round-robin', 'swiss'], default='round-robin', help='Tournament format (Default: round-robin)')
+parser.add_argument('-g', '--games', type=int, default=1000, help='Games per match (Default: 1000)')
+parser.add_argument('-r', '--rounds', type=int, default=3, help='Rounds in a Swiss tournament (Default: 3)')
+parser.add_argument('-w', '--workers', type=int, default=1, help='Worker processes (Default: 1)')
+parser.add_argument('--seed', type=int, help='Seed for reproducible tournaments')
+parser.add_argument('--results', help='Append results to this file as JSON lines')
+args = parser.parse_args()
+
+if __name__ == "__main__":
+    results_file = open(args.results, 'a') if args.results else None
+    try:
+        start_tournament()
+    finally:
+        if results_file: results_file.close()
@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+
+from app.server import KnucklebonesServer, run_load_test
+from app.stats import StatsStore
+from app.utils.helpers import render_nice_message
+
+async def serve():
+    stats = StatsStore(args.stats) if args.stats else None
+    server = KnucklebonesServer(args.host, args.port, turn_timeout=args.turn_timeout, stats=stats)
+    await server.start()
+
+    render_nice_message(f"SERVING KNUCKLEBONES ON {args.host}:{server.port}")
+
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close() # Writes out the stats queue on the server's writer thread, and stops it.
+        if stats: stats.close()
+
+async def load_test():
+    games, seconds = await run_load_test(args.host, args.port, args.load_test)
+
+    render_nice_message(f"{games} GAMES FINISHED IN {seconds:.2f} SECONDS")
+
+    return None
+
+
+parser = argparse.ArgumentParser(prog="Knucklebones Server", description="Host Knucklebones matches over TCP")
+parser.add_argument('--host', default='127.0.0.1', help='Address to listen on or connect to (Default: 127.0.0.1)')
+parser.add_argument('--port', type=int, default=7777, help='Port to listen on or connect to (Default: 7777)')
+parser.add_argument('--turn-timeout', type=float, default=60, help='Seconds a player has to move before forfeiting (Default: 60)')
+parser.add_argument('--stats', help='SQLite file to keep every finished match in')
+parser.add_argument('--load-test', type=int, metavar='CLIENTS', help='Instead of serving, connect this many random bots to a running server')
+args = parser.parse_args()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(load_test() if args.load_test else serve())
+    except KeyboardInterrupt:
+        pass
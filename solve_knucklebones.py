@@ -0,0 +1,58 @@
+import argparse
+import time
+
+from app import bitboard
+from app.policy import write_policy
+from app.solver import Solver, SolverLimitError, write_tablebase
+from app.utils.helpers import render_nice_message
+
+def parse_board(board):
+    """
+    Read a board written as three columns of three digits, top to bottom; e.g. "111,022,003".
+    """
+    columns = board.split(',')
+
+    if len(columns) != 3 or any(len(column) != 3 or not set(column) <= set('0123456') for column in columns):
+        raise argparse.ArgumentTypeError(f"{board} should look like 111,022,003, with dice from 1 to 6")
+
+    matrix = [[int(n) for n in column] for column in columns]
+
+    if any(any(column[:column.count(0)]) for column in matrix):
+        raise argparse.ArgumentTypeError(f"{board} has a gap; columns fill from the bottom up, e.g. 003 but not 303")
+
+    return bitboard.pack_matrix(matrix)
+
+def solve():
+    started = time.perf_counter()
+    knucklebones_solver = Solver(max_positions=args.max_positions)
+
+    try:
+        knucklebones_solver.solve([(args.mover, args.opponent)])
+    except (SolverLimitError, ValueError) as error:
+        render_nice_message(str(error), full_display_length=len(str(error)) + 20)
+        return None
+
+    write_tablebase(args.output, knucklebones_solver.entries())
+
+    if args.policy:
+        write_policy(args.policy, knucklebones_solver.policies())
+
+    render_nice_message(
+        f"SOLVED {knucklebones_solver.position_count()} POSITIONS IN {time.perf_counter() - started:.1f}S; "
+        f"WIN PROBABILITY {knucklebones_solver.win_probability(args.mover, args.opponent):.4f}",
+        full_display_length=120
+    )
+
+    return None
+
+
+parser = argparse.ArgumentParser(prog="Knucklebones Solver", description="Solve Knucklebones exactly and write a tablebase")
+parser.add_argument('-o', '--output', default='knucklebones.tb', help='Tablebase file to write (Default: knucklebones.tb)')
+parser.add_argument('--policy', help='Also write the best moves alone to this compact policy file')
+parser.add_argument('--mover', type=parse_board, default=bitboard.EMPTY_BOARD, help='Board of the player about to roll, e.g. 111,022,003 (Default: empty)')
+parser.add_argument('--opponent', type=parse_board, default=bitboard.EMPTY_BOARD, help='Board of the other player (Default: empty)')
+parser.add_argument('--max-positions', type=int, default=2000000, help='Stop if more positions than this are reachable (Default: 2000000)')
+args = parser.parse_args()
+
+if __name__ == "__main__":
+    solve()
@@ -0,0 +1,31 @@
+import argparse
+
+from app.stats import StatsStore
+from app.utils.helpers import render_nice_message
+
+def show_stats():
+    with StatsStore(args.file) as stats:
+        if args.versus:
+            name, opponent_name = args.versus
+            wins, losses, draws = stats.head_to_head(name, opponent_name)
+            render_nice_message(f"{name} {wins} TO {opponent_name} {losses}, WITH {draws} DRAWS")
+            return None
+
+        print(f"{'PLAYER':<26}{'WINS':>8}{'LOSSES':>8}{'DRAWS':>8}{'GAMES':>8}")
+        for name, wins, losses, draws, games in stats.leaderboard(args.top, args.min_games):
+            print(f"{name:<26}{wins:>8}{losses:>8}{draws:>8}{games:>8}")
+
+        render_nice_message(f"{stats.game_count()} GAMES RECORDED")
+
+    return None
+
+
+parser = argparse.ArgumentParser(prog="Knucklebones Stats", description="Show the leaderboard or a head-to-head record from a stats file")
+parser.add_argument('file', help='SQLite stats file written with --stats')
+parser.add_argument('-n', '--top', type=int, default=10, help='Players to list (Default: 10)')
+parser.add_argument('--min-games', type=int, default=1, help='Leave out players with fewer games (Default: 1)')
+parser.add_argument('--versus', nargs=2, metavar=('PLAYER', 'OPPONENT'), help="Show one player's record against another instead")
+args = parser.parse_args()
+
+if __name__ == "__main__":
+    show_stats()
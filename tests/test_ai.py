@@ -0,0 +1,162 @@
+from app import ai, bitboard, knucklebones
+from app.utils import helpers
+
+import mock
+import pytest
+
+
+class TestTranspositionTable:
+
+    def test_lookup_miss_and_hit(self):
+        table = ai.TranspositionTable(max_entries=4)
+
+        assert table.get(1) == None
+        table.store(1, (2, 3.0))
+
+        assert table.get(1) == (2, 3.0)
+        assert table.hits == 1
+        assert table.misses == 1
+
+    def test_least_recently_used_entry_is_evicted(self):
+        table = ai.TranspositionTable(max_entries=2)
+        table.store(1, 'a')
+        table.store(2, 'b')
+        table.get(1)
+        table.store(3, 'c')
+
+        assert len(table) == 2
+        assert table.get(2) == None
+        assert table.get(1) == 'a'
+
+
+class TestExpectimaxSearch:
+
+    def setup_method(self, method):
+        self.search = ai.ExpectimaxSearch(depth=2)
+
+    def test_search_knocks_out_opponent_dice(self):
+        mover = bitboard.pack_matrix([[0, 0, 0], [0, 0, 0], [0, 0, 0]])
+        opponent = bitboard.pack_matrix([[0, 0, 1], [0, 0, 2], [0, 6, 6]])
+
+        column_index, value = self.search.best_column(mover, opponent, 6)
+
+        assert column_index == 2
+
+    def test_search_takes_the_winning_move(self):
+        mover = bitboard.pack_matrix([[5, 5, 5], [6, 6, 6], [0, 1, 2]])
+        opponent = bitboard.pack_matrix([[0, 0, 0], [0, 0, 0], [0, 0, 0]])
+
+        column_index, value = self.search.best_column(mover, opponent, 3)
+
+        assert column_index == 2
+        assert value > ai.WIN_BONUS
+
+    def test_only_open_columns_are_chosen(self):
+        mover = bitboard.pack_matrix([[1, 2, 3], [0, 0, 0], [4, 5, 6]])
+
+        column_index, value = self.search.best_column(mover, bitboard.EMPTY_BOARD, 4)
+
+        assert column_index == 1
+
+    def test_search_results_are_cached(self):
+        self.search.best_column(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD, 4)
+
+        assert len(self.search.table) > 0
+
+
+class TestIterativeDeepening:
+
+    def setup_method(self, method):
+        self.search = ai.ExpectimaxSearch(depth=3)
+        self.mover = bitboard.pack_matrix([[0, 0, 3], [0, 0, 0], [0, 0, 5]])
+        self.opponent = bitboard.pack_matrix([[0, 0, 3], [0, 0, 4], [0, 0, 0]])
+
+    def test_unhurried_search_matches_fixed_depth(self):
+        column_index, value = self.search.iterative_best_column(self.mover, self.opponent, 4, time_limit=60)
+
+        assert self.search.completed_depth == 3
+        assert (column_index, value) == ai.ExpectimaxSearch(depth=3).best_column(self.mover, self.opponent, 4)
+
+    def test_expired_deadline_still_returns_a_move(self):
+        column_index, value = self.search.iterative_best_column(self.mover, self.opponent, 4, time_limit=0)
+
+        assert self.search.completed_depth == 1
+        assert (column_index, value) == ai.ExpectimaxSearch(depth=1).best_column(self.mover, self.opponent, 4)
+
+    def test_deadline_stops_a_search_part_way(self, monkeypatch):
+        ticks = iter(range(1000000))
+        monkeypatch.setattr(ai, 'DEADLINE_CHECK_INTERVAL', 1)
+        monkeypatch.setattr(ai.time, 'perf_counter', lambda: next(ticks))
+
+        column_index, _ = self.search.iterative_best_column(self.mover, self.opponent, 4, time_limit=30, max_depth=10)
+
+        assert 1 <= self.search.completed_depth < 10
+        assert column_index in bitboard.open_columns(self.mover)
+
+    def test_timed_out_search_leaves_no_partial_entries(self, monkeypatch):
+        ticks = iter(range(1000000))
+        monkeypatch.setattr(ai, 'DEADLINE_CHECK_INTERVAL', 1)
+        monkeypatch.setattr(ai.time, 'perf_counter', lambda: next(ticks))
+        self.search.iterative_best_column(self.mover, self.opponent, 4, time_limit=30, max_depth=10)
+        monkeypatch.undo()
+
+        # Whatever the table kept must agree with a fresh search.
+        assert self.search.best_column(self.mover, self.opponent, 4, depth=2) == ai.ExpectimaxSearch().best_column(self.mover, self.opponent, 4, depth=2)
+
+
+class TestExpectimaxPlayer:
+
+    @pytest.fixture
+    def mock_input(self):
+        with mock.patch.object(helpers, 'input') as mock_input:
+            yield mock_input
+
+    def test_bot_has_a_default_name(self):
+        player = ai.ExpectimaxPlayer(depth=1)
+        player.set_player_name()
+
+        assert player.name == 'COMPUTER'
+
+    def test_bot_refuses_other_board_sizes(self):
+        with pytest.raises(ValueError):
+            knucklebones.KnucklebonesGame(['Jane'], players=[knucklebones.KnucklebonesPlayer(), ai.ExpectimaxPlayer(depth=1)], columns=4)
+
+    def test_bots_must_pick_their_own_columns(self):
+        with pytest.raises(TypeError):
+            ai.BotPlayer()
+
+    def test_bot_adds_to_matrix_without_prompting(self, mock_input):
+        player = ai.ExpectimaxPlayer(depth=2)
+        opponent = knucklebones.KnucklebonesPlayer()
+        opponent.place_die(4, 1)
+
+        player.add_to_matrix(4, opponent)
+
+        assert mock_input.call_count == 0
+        assert player.current_column == 1
+        assert player.matrix[1] == [0, 0, 4]
+
+    def test_timed_bot_deepens_iteratively(self, mock_input):
+        player = ai.ExpectimaxPlayer(**ai.DIFFICULTIES['medium'])
+        opponent = knucklebones.KnucklebonesPlayer()
+        opponent.place_die(4, 1)
+
+        player.add_to_matrix(4, opponent)
+
+        assert player.current_column == 1
+        assert player.search.completed_depth == 2
+
+    def test_game_against_bot(self, mock_input):
+        players = [knucklebones.KnucklebonesPlayer(), ai.ExpectimaxPlayer(depth=1)]
+        game = knucklebones.KnucklebonesGame(['Jane'], players=players)
+
+        with mock.patch.object(knucklebones, 'system'), mock.patch.object(knucklebones, 'print'):
+            with mock.patch.object(game.rng, 'shuffle'), mock.patch.object(game.rng, 'randint') as mock_randint:
+                mock_randint.side_effect = [6, 5] * 8 + [6] # The bot's fives can never knock out the human's sixes.
+                mock_input.side_effect = ['ENTER', 'L'] * 3 + ['ENTER', 'M'] * 3 + ['ENTER', 'R'] * 3 + ['N']
+
+                game.loop()
+
+        assert game.player_two.name == 'COMPUTER'
+        assert game.player_one.score == 162
+        assert game.player_one.wins == 1
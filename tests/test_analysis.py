@@ -0,0 +1,108 @@
+from app import analysis, bitboard, records, solver
+
+import pytest
+
+
+def write_game(path, moves):
+    with records.GameRecordWriter(path) as writer:
+        for player_index, die_value, column_index in moves:
+            writer.record_move(player_index, die_value, column_index)
+        writer.end_game()
+
+
+class TestMoveAnalyzer:
+
+    def setup_method(self, method):
+        self.analyzer = analysis.MoveAnalyzer(depth=1)
+
+    def test_best_move_has_no_loss(self):
+        game = bytes([records.encode_move(0, 6, 0), records.encode_move(1, 6, 0)])
+
+        reports = self.analyzer.analyze_game(game)
+
+        assert reports[1]['best_column'] == 0 # Knocking out the opponent's six.
+        assert reports[1]['loss'] == 0
+        assert reports[1]['blunder'] == False
+
+    def test_missed_knockout_is_a_blunder(self):
+        game = bytes([records.encode_move(0, 6, 0), records.encode_move(0, 6, 0), records.encode_move(1, 6, 2)])
+
+        report = self.analyzer.analyze_game(game)[2]
+
+        assert report['best_column'] == 0
+        assert report['loss'] == pytest.approx(24)
+        assert report['blunder'] == True
+
+    def test_loss_leaves_out_the_win_bonus(self):
+        analyzer = analysis.MoveAnalyzer(depth=2)
+        mover = bitboard.pack_matrix([[0, 0, 1], [0, 6, 6], [0, 0, 1]])
+        opponent = bitboard.pack_matrix([[0, 4, 4], [3, 3, 3], [3, 3, 3]])
+
+        values = analyzer.evaluate(mover, opponent, 4)
+
+        # Leaving the opponent's fours lets them fill their board and win, which is worth 18 points here.
+        assert values[1] - values[0] == pytest.approx(-18)
+
+    def test_positions_are_cached(self):
+        game = bytes([records.encode_move(0, 3, 1)])
+
+        self.analyzer.analyze_game(game)
+        self.analyzer.analyze_game(game)
+
+        assert self.analyzer.cache.hits == 1
+
+    def test_win_probability_loss_from_tablebase(self, tmp_path):
+        mover = bitboard.pack_matrix([[1, 1, 1], [2, 2, 2], [0, 3, 3]])
+        opponent = bitboard.pack_matrix([[0, 0, 6], [0, 6, 6], [0, 0, 0]])
+        path = tmp_path / 'test.tb'
+        solver.write_tablebase(path, solver.Solver().solve([(mover, opponent)]).entries())
+        analyzer = analysis.MoveAnalyzer(depth=1, tablebase=str(path))
+
+        assert analyzer._win_probability_loss(mover, opponent, 3, 2) == 0.0
+        assert analyzer._win_probability_loss(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD, 3, 2) == None
+
+
+class TestAnalyzeFiles:
+
+    def test_files_are_analysed_in_order(self, tmp_path):
+        paths = [tmp_path / 'one.kbr', tmp_path / 'two.kbr']
+        write_game(paths[0], [(0, 6, 0), (1, 2, 1)])
+        write_game(paths[1], [(1, 4, 2)])
+
+        results = list(analysis.analyze_files(paths, depth=1))
+
+        assert [path for path, _, _ in results] == paths
+        assert [len(games[0][2]) for _, games, _ in results] == [2, 1]
+
+    def test_worker_processes_match_a_single_process(self, tmp_path):
+        paths = [tmp_path / 'one.kbr', tmp_path / 'two.kbr']
+        write_game(paths[0], [(0, 6, 0), (1, 6, 1), (0, 5, 1)])
+        write_game(paths[1], [(1, 4, 2), (0, 4, 0)])
+
+        single = [games for _, games, _ in analysis.analyze_files(paths, depth=1)]
+        pooled = [games for _, games, _ in analysis.analyze_files(paths, depth=1, workers=2)]
+
+        assert single == pooled
+
+    def test_summary_totals_per_player(self):
+        games = [(0, None, [
+            {'player': 0, 'loss': 4.0, 'blunder': False},
+            {'player': 1, 'loss': 12.0, 'blunder': True},
+            {'player': 0, 'loss': 0.0, 'blunder': False},
+        ])]
+
+        summary = analysis.summarize(games)
+
+        assert summary['PLAYER 1']['mean_loss'] == 2.0
+        assert summary['PLAYER 2']['blunders'] == 1
+
+    def test_summary_follows_players_by_name(self):
+        games = [
+            (0, ('JANE', 'JILL'), [{'player': 0, 'loss': 4.0, 'blunder': False}]),
+            (1, ('JILL', 'JANE'), [{'player': 1, 'loss': 2.0, 'blunder': False}]),
+        ]
+
+        summary = analysis.summarize(games)
+
+        assert list(summary) == ['JANE']
+        assert summary['JANE']['moves'] == 2
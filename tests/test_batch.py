@@ -0,0 +1,82 @@
+from app import batch, engine
+
+import numpy as np
+import random
+
+
+class TestBatchRules:
+
+    def test_column_scores_match_engine(self):
+        boards = batch.new_boards(1)
+        boards[0, 0] = [[0, 5, 5], [6, 6, 6], [1, 2, 3]]
+
+        assert batch.column_scores(boards)[0, 0].tolist() == [20, 54, 6]
+        assert batch.scores(boards)[0].tolist() == [80, 0]
+
+    def test_place_and_remove(self):
+        boards = batch.new_boards(2)
+        boards[0, 1, 2] = [4, 1, 4]
+        boards[1, 1, 0] = [0, 0, 3]
+
+        finished, removed = batch.step(boards, np.array([0, 0]), np.array([2, 0]), np.array([4, 5], dtype=np.int8))
+
+        assert boards[0, 0, 2].tolist() == [0, 0, 4]
+        assert boards[0, 1, 2].tolist() == [0, 0, 1]
+        assert boards[1, 1, 0].tolist() == [0, 0, 3]
+        assert removed.tolist() == [2, 0]
+        assert finished.tolist() == [False, False]
+
+    def test_legal_columns(self):
+        boards = batch.new_boards(1)
+        boards[0, 1, 1] = [2, 2, 2]
+
+        assert batch.legal_columns(boards, np.array([1]))[0].tolist() == [True, False, True]
+
+    def test_random_moves_match_engine(self):
+        rng = random.Random(11)
+        games = 20
+        boards = batch.new_boards(games)
+        states = [engine.KnucklebonesState() for _ in range(games)]
+
+        while not all(state.is_terminal() for state in states):
+            active = [i for i, state in enumerate(states) if not state.is_terminal()]
+            to_move = np.array([states[i].player_to_move for i in active])
+            dice = np.array([rng.randint(1, 6) for _ in active], dtype=np.int8)
+            columns = np.array([rng.choice(states[i].legal_moves()) for i in active])
+
+            trial = boards[active]
+            finished, _ = batch.step(trial, to_move, columns, dice)
+            boards[active] = trial
+
+            for i, game in enumerate(active):
+                states[game].apply(int(dice[i]), int(columns[i]))
+                assert boards[game].tolist() == states[game].matrices
+                assert bool(finished[i]) == states[game].is_terminal()
+
+
+class TestBatchSimulator:
+
+    def test_all_games_finish(self):
+        simulator = batch.BatchSimulator(500, seed=3)
+
+        final_scores = simulator.run()
+
+        assert final_scores.shape == (500, 2)
+        assert simulator.finished.all()
+        assert ((simulator.boards[np.arange(500), simulator.to_move, :, 0] != 0).all(axis=1)).all()
+
+    def test_runs_are_reproducible(self):
+        first = batch.BatchSimulator(200, seed=9).run()
+        second = batch.BatchSimulator(200, seed=9).run()
+
+        assert (first == second).all()
+
+    def test_greedy_policy_beats_random(self):
+        simulator = batch.BatchSimulator(2000, policies=(batch.greedy_policy, batch.random_policy), seed=1)
+        simulator.run()
+
+        summary = simulator.summary()
+
+        assert summary['games'] == 2000
+        assert summary['player_one_win_rate'] > 0.6
+        assert abs(summary['player_one_win_rate'] + summary['player_two_win_rate'] + summary['draw_rate'] - 1.0) < 1e-9
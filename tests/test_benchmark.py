@@ -0,0 +1,56 @@
+from app import benchmark
+
+import pytest
+
+
+class TestBenchmarks:
+
+    @pytest.mark.parametrize('name', list(benchmark.BENCHMARKS))
+    def test_every_benchmark_runs(self, name):
+        function, operations = benchmark.BENCHMARKS[name]()
+
+        assert benchmark.measure(function, operations, min_time=0.001, repeats=1) > 0
+
+    def test_game_loop_benchmark_prints_nothing(self, capsys):
+        function, _ = benchmark.BENCHMARKS['game_loop']()
+
+        function()
+
+        assert capsys.readouterr().out == ''
+
+    def test_every_footprint_is_measured(self):
+        footprints = benchmark.measure_footprints(count=50)
+
+        assert sorted(footprints) == sorted(benchmark.FOOTPRINTS)
+        assert all(footprint > 0 for footprint in footprints.values())
+
+    def test_drawn_game_shares_its_render_tables(self):
+        game_footprint = benchmark.measure_footprint(benchmark.FOOTPRINTS['game'], count=200)
+
+        assert benchmark.measure_footprint(benchmark.FOOTPRINTS['drawn_game'], count=200) < game_footprint * 2
+
+    def test_baseline_round_trips(self, tmp_path):
+        path = tmp_path / 'baseline.json'
+
+        benchmark.save_baseline(path, {'headless_game': 1000.0})
+
+        assert benchmark.load_baseline(path) == {'headless_game': 1000.0}
+
+
+class TestCompare:
+
+    def test_slowdown_past_threshold_regresses(self):
+        _, regressions = benchmark.compare({'a': 60.0, 'b': 80.0}, {'a': 100.0, 'b': 100.0}, threshold=0.3)
+
+        assert regressions == ['a']
+
+    def test_speedups_never_regress(self):
+        rows, regressions = benchmark.compare({'a': 200.0}, {'a': 100.0})
+
+        assert regressions == []
+        assert rows == [('a', 200.0, 100.0, 2.0)]
+
+    def test_benchmarks_missing_from_the_baseline_are_skipped(self):
+        rows, regressions = benchmark.compare({'new': 1.0}, {'old': 100.0})
+
+        assert (rows, regressions) == ([], [])
@@ -0,0 +1,69 @@
+from app import bitboard, engine
+
+import random
+import pytest
+
+
+class TestBitboard:
+
+    def test_column_round_trip(self):
+        for column in ([0, 0, 0], [0, 0, 6], [0, 3, 5], [6, 6, 6]):
+            assert bitboard.unpack_column(bitboard.pack_column(column)) == column
+
+    def test_matrix_round_trip(self):
+        matrix = [[0, 0, 4], [1, 2, 3], [0, 6, 6]]
+
+        assert bitboard.unpack_board(bitboard.pack_matrix(matrix)) == matrix
+
+    def test_column_score_table_matches_engine(self):
+        for code in range(bitboard.COLUMN_STATES):
+            assert bitboard.COLUMN_SCORE[code] == engine.score_column(bitboard.unpack_column(code))
+
+    def test_place_fills_from_the_bottom(self):
+        board = bitboard.place(bitboard.EMPTY_BOARD, 1, 5)
+        board = bitboard.place(board, 1, 2)
+
+        assert bitboard.unpack_board(board) == [[0, 0, 0], [0, 2, 5], [0, 0, 0]]
+        assert bitboard.board_score(board) == 7
+
+    def test_place_in_full_column_raises(self):
+        board = bitboard.pack_matrix([[1, 2, 3], [0, 0, 0], [0, 0, 0]])
+
+        with pytest.raises(ValueError):
+            bitboard.place(board, 0, 4)
+
+    def test_remove_knocks_out_matching_dice(self):
+        board = bitboard.pack_matrix([[0, 0, 0], [0, 0, 0], [4, 1, 4]])
+
+        board = bitboard.remove(board, 2, 4)
+
+        assert bitboard.unpack_board(board) == [[0, 0, 0], [0, 0, 0], [0, 0, 1]]
+
+    def test_full_board_and_open_columns(self):
+        board = bitboard.pack_matrix([[1, 1, 1], [0, 2, 2], [3, 3, 3]])
+
+        assert bitboard.is_board_full(board) == False
+        assert bitboard.open_columns(board) == [1]
+        assert bitboard.is_board_full(bitboard.place(board, 1, 2)) == True
+
+    def test_random_games_match_engine(self):
+        rng = random.Random(3)
+
+        for _ in range(50):
+            state = engine.KnucklebonesState()
+            boards = [bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD]
+
+            while not state.is_terminal():
+                mover = state.player_to_move
+                die_value = rng.randint(1, 6)
+                column_index = rng.choice(state.legal_moves())
+
+                assert bitboard.open_columns(boards[mover]) == state.legal_moves()
+
+                state.apply(die_value, column_index)
+                boards[mover], boards[1 - mover] = bitboard.apply(boards[mover], boards[1 - mover], column_index, die_value)
+
+                assert bitboard.from_state(state)[:2] == tuple(boards)
+                assert state.scores == (bitboard.board_score(boards[0]), bitboard.board_score(boards[1]))
+
+            assert bitboard.is_board_full(boards[1 - state.player_to_move]) == True
@@ -0,0 +1,155 @@
+from app import engine
+
+import random
+import pytest
+
+
+class TestRules:
+
+    def test_empty_column_scores_zero(self):
+        assert engine.score_column([0, 0, 0]) == 0
+
+    def test_column_without_matches_is_summed(self):
+        assert engine.score_column([2, 4, 5]) == 11
+
+    def test_column_with_a_pair(self):
+        assert engine.score_column([0, 5, 5]) == 20
+        assert engine.score_column([2, 5, 5]) == 22
+
+    def test_column_with_three_of_a_kind(self):
+        assert engine.score_column([6, 6, 6]) == 54
+
+    def test_tall_column_scores_every_group(self):
+        assert engine.score_column([0, 0, 1, 1, 1, 1, 7, 3], faces=8) == 16 + 7 + 3
+
+    def test_new_matrix_takes_any_size(self):
+        assert engine.new_matrix(4, 2) == [[0, 0]] * 4
+
+    def test_die_is_placed_in_highest_open_index(self):
+        column = [0, 0, 4]
+
+        engine.place_die(column, 2)
+
+        assert column == [0, 2, 4]
+
+    def test_placing_in_full_column_raises(self):
+        with pytest.raises(ValueError):
+            engine.place_die([1, 2, 3], 4)
+
+    def test_matching_dice_are_removed_and_column_is_shifted_down(self):
+        column = [3, 1, 3]
+
+        removed = engine.remove_die_value(column, 3)
+
+        assert removed == 2
+        assert column == [0, 0, 1]
+
+    def test_remaining_dice_keep_their_order_in_the_same_list(self):
+        column = [4, 2, 4, 5, 4]
+        original = column
+
+        engine.remove_die_value(column, 4)
+
+        assert column is original
+        assert column == [0, 0, 0, 2, 5]
+
+    def test_column_is_untouched_without_a_match(self):
+        column = [0, 2, 4]
+
+        assert engine.remove_die_value(column, 5) == 0
+        assert column == [0, 2, 4]
+
+
+class TestKnucklebonesState:
+
+    def setup_method(self, method):
+        self.state = engine.KnucklebonesState()
+
+    def test_state_is_initialized_empty(self):
+        assert self.state.scores == (0, 0)
+        assert self.state.player_to_move == 0
+        assert self.state.is_terminal() == False
+        assert self.state.legal_moves() == [0, 1, 2]
+
+    def test_apply_places_die_and_passes_turn(self):
+        self.state.apply(5, 1)
+
+        assert self.state.matrices[0] == [[0, 0, 0], [0, 0, 5], [0, 0, 0]]
+        assert self.state.scores == (5, 0)
+        assert self.state.player_to_move == 1
+
+    def test_apply_removes_opponent_dice(self):
+        self.state.apply(5, 1)
+        removed = self.state.apply(5, 1)
+
+        assert removed == 1
+        assert self.state.matrices[0][1] == [0, 0, 0]
+        assert self.state.scores == (0, 5)
+
+    def test_full_column_is_not_a_legal_move(self):
+        for _ in range(3):
+            self.state.apply(1, 0)
+            self.state.apply(2, 2)
+
+        assert self.state.legal_moves() == [1, 2]
+
+    def test_game_ends_when_mover_fills_board(self):
+        matrices = [[[1, 1, 1], [2, 2, 2], [0, 3, 3]], engine.new_matrix()]
+        state = engine.KnucklebonesState(matrices)
+
+        state.apply(3, 2)
+
+        assert state.is_terminal() == True
+        assert state.scores == (9 + 18 + 27, 0)
+        assert state.winner == 0
+
+    def test_apply_after_game_over_raises(self):
+        state = engine.KnucklebonesState([[[1, 1, 1]] * 3, engine.new_matrix()])
+
+        with pytest.raises(ValueError):
+            state.apply(1, 0)
+
+    def test_copy_is_independent(self):
+        self.state.apply(4, 0)
+        clone = self.state.copy()
+        clone.apply(3, 0)
+
+        assert self.state.matrices[1] == engine.new_matrix()
+        assert self.state.player_to_move == 1
+
+    def test_headless_game_runs_to_completion(self):
+        rng = random.Random(7)
+        policies = [lambda state, die: engine.random_policy(state, die, rng)] * 2
+
+        state = engine.play_headless_game(policies, rng=rng)
+
+        assert state.is_terminal() == True
+        assert any(engine.is_matrix_full(matrix) for matrix in state.matrices)
+
+    def test_headless_game_uses_pre_rolled_dice(self):
+        policies = [lambda state, die: state.legal_moves()[0]] * 2
+
+        state = engine.play_headless_game(policies, dice=[1, 2] * 8 + [1])
+
+        assert state.matrices[0] == [[1, 1, 1]] * 3
+        assert state.scores == (27, 44)
+
+    def test_larger_variant_tracks_open_cells(self):
+        state = engine.KnucklebonesState(columns=4, rows=2, faces=8)
+
+        state.apply(8, 3)
+        state.apply(8, 3)
+
+        assert state.open_cells == [8, 7] # The second eight knocked the first one out.
+        assert state.scores == (0, 8)
+        assert state.legal_moves() == [0, 1, 2, 3]
+
+    def test_larger_variant_plays_to_the_end(self):
+        rng = random.Random(3)
+        policies = [lambda state, die: engine.random_policy(state, die, rng)] * 2
+
+        state = engine.play_headless_game(policies, rng=rng, columns=5, rows=4, faces=10)
+
+        assert state.is_terminal() == True
+        assert any(engine.is_matrix_full(matrix) for matrix in state.matrices)
+        assert len(state.matrices[0]) == 5 and len(state.matrices[0][0]) == 4
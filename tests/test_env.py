@@ -0,0 +1,103 @@
+from app import batch, engine, env
+
+import numpy as np
+import pytest
+import random
+
+
+class TestKnucklebonesEnv:
+
+    def setup_method(self, method):
+        self.env = env.KnucklebonesEnv(seed=5)
+
+    def test_reset_starts_empty_games(self):
+        observations, info = self.env.reset(8)
+
+        assert observations.shape == (8, env.OBSERVATION_SIZE)
+        assert observations.dtype == np.int8
+        assert observations.flags['C_CONTIGUOUS'] == True
+        assert (observations[:, :env.DIE_CELL] == 0).all()
+        assert ((observations[:, env.DIE_CELL] >= 1) & (observations[:, env.DIE_CELL] <= 6)).all()
+        assert info['legal'].all()
+        assert set(info['to_move'].tolist()) <= {0, 1}
+
+    def test_boards_live_in_the_observation_buffer(self):
+        self.env.reset(4)
+
+        assert np.shares_memory(self.env.boards, self.env._observations)
+
+    def test_observations_are_seen_from_the_player_to_move(self):
+        observations, _ = self.env.reset(1)
+        die = int(observations[0, env.DIE_CELL])
+
+        observations, rewards, dones, info = self.env.step([2])
+
+        opponent_board = observations[0, env.BOARD_CELLS:env.DIE_CELL].reshape(3, 3)
+        assert opponent_board.tolist() == [[0, 0, 0], [0, 0, 0], [0, 0, die]]
+        assert (observations[0, :env.BOARD_CELLS] == 0).all()
+        assert rewards.tolist() == [die]
+
+    def test_board_scores_match_batch(self):
+        boards = np.random.default_rng(1).integers(0, 7, (500, 2, 3, 3)).astype(np.int8)
+
+        assert (env.board_scores(boards) == batch.scores(boards)).all()
+
+    def test_random_play_matches_engine(self):
+        rng = random.Random(3)
+        games = 16
+        observations, info = self.env.reset(games)
+        states = [engine.KnucklebonesState(player_to_move=int(seat)) for seat in info['to_move']]
+        finished = 0
+
+        while finished < 40:
+            dice = observations[:, env.DIE_CELL]
+            actions = [rng.choice(np.flatnonzero(legal).tolist()) for legal in info['legal']]
+            observations, rewards, dones, info = self.env.step(actions)
+
+            for game, state in enumerate(states):
+                mover = state.player_to_move
+                lead_before = state.scores[mover] - state.scores[1 - mover]
+                state.apply(int(dice[game]), actions[game])
+                lead_after = state.scores[mover] - state.scores[1 - mover]
+
+                assert rewards[game] == lead_after - lead_before
+                assert bool(dones[game]) == state.is_terminal()
+
+                if dones[game]:
+                    assert info['final_margin'][game] == lead_after
+                    states[game] = engine.KnucklebonesState(player_to_move=int(info['to_move'][game]))
+                    finished += 1
+                else:
+                    mover_board = observations[game, :env.BOARD_CELLS].reshape(3, 3).tolist()
+                    opponent_board = observations[game, env.BOARD_CELLS:env.DIE_CELL].reshape(3, 3).tolist()
+                    assert [mover_board, opponent_board] == [state.matrices[state.player_to_move], state.matrices[1 - state.player_to_move]]
+                    assert info['to_move'][game] == state.player_to_move
+                    assert info['legal'][game].tolist() == [column_index in state.legal_moves() for column_index in range(3)]
+
+    def test_full_columns_are_refused(self):
+        self.env.reset(1)
+        for _ in range(3):
+            self.env.step([0])
+            self.env.step([1])
+
+        with pytest.raises(ValueError):
+            self.env.step([0])
+
+    def test_wrong_number_of_actions_is_refused(self):
+        self.env.reset(3)
+
+        with pytest.raises(ValueError):
+            self.env.step([0, 1])
+
+        with pytest.raises(ValueError):
+            self.env.step([0, 1, 3])
+
+    def test_runs_are_reproducible(self):
+        def play(seed):
+            knucklebones_env = env.KnucklebonesEnv(seed=seed)
+            observations, info = knucklebones_env.reset(32)
+            for _ in range(30):
+                observations, rewards, dones, info = knucklebones_env.step(info['legal'].argmax(axis=1))
+            return observations
+
+        assert (play(7) == play(7)).all()
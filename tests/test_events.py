@@ -0,0 +1,67 @@
+from app import events
+
+import pytest
+
+
+class TestEventHooks:
+
+    def setup_method(self, method):
+        self.hooks = events.EventHooks()
+
+    def test_hooks_start_out_not_listening(self):
+        assert self.hooks.listening == False
+
+    def test_subscriber_receives_structured_events(self):
+        received = []
+        self.hooks.subscribe(received.append)
+
+        self.hooks.emit(events.PLACEMENT, 3, 'JANE', die=4, column=1)
+
+        assert received == [events.Event('placement', 3, 'JANE', {'die': 4, 'column': 1})]
+
+    def test_subscriber_only_receives_chosen_events(self):
+        received = []
+        self.hooks.subscribe(received.append, [events.GAME_END])
+
+        self.hooks.emit(events.ROLL, 1, 'JANE', die=2)
+        self.hooks.emit(events.GAME_END, 1, None, scores=(10, 10))
+
+        assert [event.name for event in received] == ['game_end']
+
+    def test_subscribe_works_as_a_decorator(self):
+        @self.hooks.subscribe
+        def on_event(event):
+            pass
+
+        assert callable(on_event)
+        assert self.hooks.listening == True
+
+    def test_unknown_event_is_rejected(self):
+        with pytest.raises(ValueError):
+            self.hooks.subscribe(print, ['nope'])
+
+    def test_unsubscribing_the_last_callback_stops_listening(self):
+        received = []
+        self.hooks.subscribe(received.append)
+        self.hooks.unsubscribe(received.append)
+
+        self.hooks.emit(events.ROLL, 1, 'JANE', die=2)
+
+        assert received == []
+        assert self.hooks.listening == False
+
+
+class TestPhaseTimer:
+
+    def test_laps_add_up_per_phase(self):
+        ticks = iter([1.0, 3.0])
+        timer = events.PhaseTimer(clock=lambda: next(ticks))
+
+        mark = timer.lap('roll', 0.0)
+        timer.lap('roll', mark)
+
+        assert timer.totals == {'roll': 3.0}
+        assert timer.mean('roll') == 1.5
+
+    def test_mean_of_an_unseen_phase_is_zero(self):
+        assert events.PhaseTimer().mean('render') == 0.0
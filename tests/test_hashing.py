@@ -0,0 +1,114 @@
+from app import ai, bitboard, hashing, knucklebones, solver
+
+import itertools
+import pytest
+import random
+
+
+def random_board(rng):
+    return bitboard.pack_matrix([[0] * (3 - height) + [rng.randint(1, 6) for _ in range(height)] for height in (rng.randint(0, 3) for _ in range(3))])
+
+def permuted(board, order):
+    return bitboard.pack_matrix([bitboard.unpack_board(board)[index] for index in order])
+
+
+class TestCanonicalKey:
+
+    def setup_method(self, method):
+        self.rng = random.Random(6)
+
+    def test_columns_reduce_to_84_classes(self):
+        assert hashing.COLUMN_CLASSES == 84
+
+    def test_column_pair_orders_share_a_key(self):
+        mover, opponent = random_board(self.rng), random_board(self.rng)
+        keys = {hashing.canonical_key(permuted(mover, order), permuted(opponent, order)) for order in itertools.permutations(range(3))}
+
+        assert keys == {hashing.canonical_key(mover, opponent)}
+
+    def test_dice_order_within_a_column_does_not_matter(self):
+        mover = bitboard.pack_matrix([[1, 2, 3], [0, 0, 0], [0, 5, 6]])
+        shuffled = bitboard.pack_matrix([[3, 1, 2], [0, 0, 0], [0, 6, 5]])
+
+        assert hashing.canonical_key(mover, bitboard.EMPTY_BOARD) == hashing.canonical_key(shuffled, bitboard.EMPTY_BOARD)
+
+    def test_columns_only_move_in_pairs(self):
+        mover = bitboard.pack_matrix([[0, 0, 1], [0, 0, 2], [0, 0, 0]])
+        opponent = bitboard.pack_matrix([[0, 0, 3], [0, 0, 0], [0, 0, 0]])
+
+        assert hashing.canonical_key(mover, opponent) != hashing.canonical_key(mover, permuted(opponent, (1, 0, 2)))
+        assert hashing.canonical_key(mover, opponent) != hashing.canonical_key(opponent, mover)
+
+    def test_keys_agree_with_the_solver(self):
+        positions = [(random_board(self.rng), random_board(self.rng)) for _ in range(300)]
+        positions += [(permuted(mover, (2, 0, 1)), permuted(opponent, (2, 0, 1))) for mover, opponent in positions[:100]]
+
+        by_key, by_solver = {}, {}
+        for index, position in enumerate(positions):
+            by_key.setdefault(hashing.canonical_key(*position), set()).add(index)
+            by_solver.setdefault(solver.canonical_position(*position)[:2], set()).add(index)
+
+        assert sorted(map(sorted, by_key.values())) == sorted(map(sorted, by_solver.values()))
+
+    def test_search_reuses_entries_for_equivalent_positions(self):
+        search = ai.ExpectimaxSearch(depth=3)
+        mover = bitboard.pack_matrix([[0, 1, 2], [0, 0, 3], [0, 0, 0]])
+        opponent = bitboard.pack_matrix([[0, 0, 2], [0, 0, 0], [0, 4, 4]])
+
+        values = search.column_values(mover, opponent, 4)
+        misses = search.table.misses
+        permuted_values = search.column_values(permuted(mover, (2, 0, 1)), permuted(opponent, (2, 0, 1)), 4)
+
+        assert search.table.misses == misses
+        assert [permuted_values[index] for index in (1, 2, 0)] == [values[index] for index in (0, 1, 2)]
+
+
+class TestPositionHash:
+
+    def setup_method(self, method):
+        self.player = knucklebones.KnucklebonesPlayer()
+        self.opponent = knucklebones.KnucklebonesPlayer()
+        self.hash = hashing.PositionHash(self.player, self.opponent)
+
+    def test_empty_boards_hash_alike_from_either_side(self):
+        assert self.hash.hash_for(self.player) == self.hash.hash_for(self.opponent)
+
+    def test_hash_is_canonical(self):
+        mover = [[0, 1, 2], [0, 0, 3], [4, 4, 4]]
+        opponent = [[0, 0, 5], [0, 0, 0], [0, 0, 6]]
+
+        assert hashing.position_hash(mover, opponent) == hashing.position_hash([mover[2], [0, 2, 1], mover[1]], [opponent[2], opponent[0], opponent[1]])
+        assert hashing.position_hash(mover, opponent) != hashing.position_hash(opponent, mover)
+
+    def test_equal_column_pairs_do_not_cancel(self):
+        assert hashing.position_hash([[0, 0, 1]] * 2 + [[0, 0, 0]], [[0, 0, 0]] * 3) != hashing.position_hash([[0, 0, 0]] * 3, [[0, 0, 0]] * 3)
+
+    def test_updates_follow_make_and_unmake(self):
+        rng = random.Random(2)
+        players = [self.player, self.opponent]
+        moves = []
+
+        for turn in range(14):
+            mover, other = players[turn % 2], players[1 - turn % 2]
+            if mover.is_matrix_full(): break
+
+            column_index = rng.choice([i for i, column in enumerate(mover.matrix) if not column[0]])
+            moves.append((mover, other, mover.make_move(rng.randint(1, 3), column_index, other)))
+            self.hash.update(column_index)
+
+            assert self.hash.hash_for(mover) == hashing.position_hash(mover.matrix, other.matrix)
+            assert self.hash.hash_for(other) == hashing.position_hash(other.matrix, mover.matrix)
+
+        while moves:
+            mover, other, move = moves.pop()
+            mover.unmake_move(move, other)
+            self.hash.update(move.column_index)
+
+        assert self.hash.hash_for(self.player) == hashing.position_hash(self.player.matrix, self.opponent.matrix)
+        assert self.hash.hash_for(self.player) == self.hash.hash_for(self.opponent)
+
+    def test_larger_variants_are_refused(self):
+        self.player.set_board_size(3, 4)
+
+        with pytest.raises(ValueError):
+            hashing.PositionHash(self.player, self.opponent)
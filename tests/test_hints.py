@@ -0,0 +1,157 @@
+from app import ai, bitboard, hints
+
+import http.client
+import json
+import pytest
+import random
+import threading
+import urllib.error
+import urllib.request
+
+
+POSITION = {'mover': [[0, 0, 3], [0, 2, 5], [0, 0, 0]], 'opponent': [[0, 0, 0], [0, 0, 4], [0, 4, 4]], 'die': 4}
+
+
+class TestParsing:
+
+    def test_position_is_packed(self):
+        mover_board, opponent_board, die_value = hints.parse_position(POSITION)
+
+        assert bitboard.unpack_board(mover_board) == POSITION['mover']
+        assert bitboard.unpack_board(opponent_board) == POSITION['opponent']
+        assert die_value == 4
+
+    @pytest.mark.parametrize('change', [
+        {'die': 7},
+        {'die': '4'},
+        {'mover': [[0, 0, 3], [0, 2, 5]]},
+        {'mover': [[3, 0, 0], [0, 0, 0], [0, 0, 0]]},
+        {'opponent': [[0, 0, 9], [0, 0, 0], [0, 0, 0]]},
+        {'mover': [[1, 1, 1], [2, 2, 2], [3, 3, 3]]},
+    ])
+    def test_bad_positions_are_refused(self, change):
+        with pytest.raises(hints.PositionError):
+            hints.parse_position(dict(POSITION, **change))
+
+
+class TestMoveEvaluator:
+
+    def setup_method(self, method):
+        self.evaluator = hints.MoveEvaluator(depth=2)
+
+    def test_results_match_the_search(self):
+        rng = random.Random(4)
+        search = ai.ExpectimaxSearch(depth=2)
+
+        for _ in range(20):
+            boards = [[[0] * (3 - height) + [rng.randint(1, 6) for _ in range(height)] for height in (rng.randint(0, 2) for _ in range(3))] for _ in range(2)]
+            position = hints.parse_position({'mover': boards[0], 'opponent': boards[1], 'die': rng.randint(1, 6)})
+
+            result, = self.evaluator.evaluate_batch([position])
+            values = search.column_values(*position)
+
+            assert result['values'] == {hints.COLUMN_NAMES[column_index]: pytest.approx(value) for column_index, value in values.items()}
+            assert values[result['column_index']] == pytest.approx(max(values.values()))
+            assert result['column'] == hints.COLUMN_NAMES[result['column_index']]
+
+    def test_reordered_columns_share_a_cache_entry(self):
+        first, = self.evaluator.evaluate_batch([hints.parse_position(POSITION)])
+        reordered = {'mover': POSITION['mover'][::-1], 'opponent': POSITION['opponent'][::-1], 'die': 4}
+        second, = self.evaluator.evaluate_batch([hints.parse_position(reordered)])
+
+        assert (self.evaluator.cache.hits, self.evaluator.cache.misses) == (1, 1)
+        assert second['column_index'] == 2 - first['column_index']
+        assert second['value'] == first['value']
+
+    def test_repeats_within_a_batch_are_searched_once(self):
+        position = hints.parse_position(POSITION)
+
+        results = self.evaluator.evaluate_batch([position] * 5)
+
+        assert self.evaluator.coalesced == 4
+        assert self.evaluator.cache.misses == 1
+        assert all(result == results[0] for result in results)
+
+    def test_concurrent_requests_are_batched(self):
+        evaluator = hints.MoveEvaluator(depth=1, batch_window=0.2)
+        evaluator.start()
+        position = hints.parse_position(POSITION)
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(evaluator.evaluate([position]))) for _ in range(12)]
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+        evaluator.close()
+
+        metrics = evaluator.metrics()
+
+        assert len(results) == 12
+        assert metrics['requests'] == 12
+        assert metrics['batches'] < 12
+        assert metrics['cache_misses'] == 1
+
+
+class TestHintServer:
+
+    def setup_method(self, method):
+        self.server = hints.HintServer(port=0, evaluator=hints.MoveEvaluator(depth=2))
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def teardown_method(self, method):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request(self, path, body=None):
+        data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode()
+        url = f"http://127.0.0.1:{self.server.port}{path}"
+
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, data)) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as error:
+            return error.code, json.loads(error.read())
+
+    def test_one_position(self):
+        status, result = self.request('/evaluate', POSITION)
+
+        assert status == 200
+        assert result['column'] == 'R'
+        assert set(result['values']) == {'L', 'M', 'R'}
+
+    def test_many_positions(self):
+        status, body = self.request('/evaluate', {'positions': [POSITION, dict(POSITION, die=1)]})
+
+        assert status == 200
+        assert len(body['results']) == 2
+
+    def test_metrics_count_cache_hits(self):
+        self.request('/evaluate', POSITION)
+        self.request('/evaluate', POSITION)
+
+        status, metrics = self.request('/metrics')
+
+        assert status == 200
+        assert metrics['requests'] == 2
+        assert metrics['cache_hit_rate'] == 0.5
+
+    def test_bad_requests_are_refused(self):
+        assert self.request('/evaluate', b'not json')[0] == 400
+        assert self.request('/evaluate', dict(POSITION, die=0))[0] == 400
+        assert self.request('/evaluate', {'positions': []})[0] == 400
+        assert self.request('/nowhere')[0] == 404
+
+    def test_bad_content_length_is_refused(self):
+        statuses = []
+
+        for headers in [{}, {'Content-Length': 'ten'}, {'Content-Length': '-5'}]:
+            connection = http.client.HTTPConnection('127.0.0.1', self.server.port)
+            connection.putrequest('POST', '/evaluate')
+            for header, value in headers.items():
+                connection.putheader(header, value)
+            connection.endheaders()
+
+            statuses.append(connection.getresponse().status)
+            connection.close()
+
+        assert statuses == [411, 400, 400]
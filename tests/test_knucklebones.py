@@ -1,9 +1,23 @@
-from app import knucklebones
+from app import events, knucklebones, meter, records, renderer, stats
 from app.utils import helpers
 
 import pytest
+import random
 import mock
 import copy
+import io
+import os
+import sys
+
+
+class FirstOpenColumnPlayer(knucklebones.KnucklebonesPlayer):
+
+    is_human = False
+
+    def choose_column(self, die_value, opponent=None):
+        self._current_column = [column[0] for column in self.matrix].index(0)
+
+        return None
 
 
 class TestKnucklebonesGame:
@@ -38,6 +52,17 @@ class TestKnucklebonesGame:
     def test_die_lookup_contains_seven_keys(self):
         assert len(self.game.die_render_lookup.keys()) == 7
 
+    def test_render_tables_are_shared_between_games(self):
+        other_game = knucklebones.KnucklebonesGame(['Jack', 'Jill'])
+
+        assert other_game.die_render_lookup is self.game.die_render_lookup
+        assert self.game.die_render_lookup['3'] == self.game.render_die_3
+        assert not hasattr(self.game, '__dict__')
+
+    def test_event_hooks_are_built_on_first_use(self):
+        assert self.game._events is None
+        assert self.game.events is self.game.events
+
     def test_die_heights_are_all_the_same_value(self):
         assert len(self.game.render_no_die) == self.game.die_height
         assert len(self.game.render_die_1) == self.game.die_height
@@ -61,10 +86,42 @@ class TestKnucklebonesGame:
 
         assert self.game.current_die_value in [1, 2, 3, 4, 5, 6]
 
+    def test_seeded_games_roll_the_same_dice(self, mock_input):
+        rolls = []
+
+        for _ in range(2):
+            game = knucklebones.KnucklebonesGame(['Jane', 'Jill'], rng=random.Random(5))
+            game.set_player_order(game.players)
+            order = [player.name for player in game.players]
+
+            for _ in range(10):
+                game.roll_the_die(order[0], prompt=False)
+                order.append(game.current_die_value)
+
+            rolls.append(order)
+
+        assert rolls[0] == rolls[1]
+
+    def test_every_game_has_its_own_rng(self):
+        other_game = knucklebones.KnucklebonesGame(['Jack', 'Jill'])
+
+        assert isinstance(self.game.rng, random.Random)
+        assert self.game.rng is not other_game.rng
+        assert self.game.rng is not random._inst # Not the random module's shared generator.
+
+    def test_pre_rolled_dice_are_used_in_order(self, mock_input):
+        game = knucklebones.KnucklebonesGame(['Jane', 'Jill'], dice=[4, 2])
+
+        game.roll_the_die(game.player_one.name, prompt=False)
+        first = game.current_die_value
+        game.roll_the_die(game.player_one.name, prompt=False)
+
+        assert (first, game.current_die_value) == (4, 2)
+
     def test_grid_renders_both_player_matrices(self, mock_print):
         self.game.show_grid(matrices=self.matrices)
 
-        assert mock_print.call_count == (self.game.die_height * len(self.game.player_one.matrix) * 2 + 1)
+        assert mock_print.call_count == 1 # The whole board goes out in one write.
 
     def test_scoreboard_renders_at_proper_length(self, capfd):
         self.game.show_grid(matrices=self.matrices)
@@ -89,6 +146,21 @@ class TestKnucklebonesGame:
         assert str(self.game.player_one.score) in out
         assert str(self.game.player_two.score) in out
 
+    def test_grid_lines_match_printed_grid(self, capfd):
+        self.game.show_grid(matrices=self.matrices)
+
+        out, err = capfd.readouterr()
+
+        assert out == "\n".join(self.game.grid_lines(self.matrices)) + "\n"
+
+    def test_column_lines_are_cached(self):
+        first = self.game._column_lines([0, 2, 5])
+        second = self.game._column_lines([0, 2, 5])
+
+        assert first is second
+        assert len(first) == self.game.die_height * 3
+        assert first[self.game.die_height:self.game.die_height * 2] == self.game.render_die_2
+
     def test_screen_is_cleared(self, mock_system):
         self.game.clear_screen()
 
@@ -132,22 +204,57 @@ class TestKnucklebonesGame:
         assert "THE GAME WAS A DRAW! WOW!" in out
 
     def test_simulated_game_loop(self, mock_system, mock_input):
-        with mock.patch.object(knucklebones.random, 'randint') as mock_randint:
+        with mock.patch.object(self.game.rng, 'randint') as mock_randint:
             mock_randint.side_effect = [6, 5] * 8 + [6] # Player one receives all sixes; player two receives all fives.
 
             mock_input.side_effect = self.simulated_game_inputs
 
             self.game.loop()
 
-            assert mock_system.call_count == 17 # 9 die in each column for each player - 1
+            assert mock_system.call_count == 0 # The board is redrawn in place; no shell is spawned to clear it.
             assert self.game.player_one.score == 162 # (6 * 3) * 3 * 3
             assert self.game.player_two.score == 110 # (5 * 3) * 3 * 2 + 20
             assert self.game.player_one.wins == 1
             assert self.game.player_two.wins == 0
 
+    def test_messages_never_scroll_a_partly_redrawn_board(self, mock_input):
+        writes = [] # ('draw' or 'text', output), in the order it was written.
+
+        class Recorder:
+            def __init__(self, kind): self.kind = kind
+            def write(self, text): writes.append((self.kind, text))
+            def flush(self): pass
+
+        answers = iter(['ENTER', 'X'] + self.simulated_game_inputs[1:]) # The first column answer is re-asked.
+
+        def answer(prompt):
+            sys.stdout.write(prompt + "\n") # The terminal echoes the Enter key.
+            return next(answers)
+
+        game = knucklebones.KnucklebonesGame(['Jane', 'Jill'], dice=[6, 5] * 8 + [6])
+        game.renderer.stream = Recorder('draw')
+        height = len(game.grid_lines([game.player_one.matrix, game.player_two.matrix]))
+        mock_input.side_effect = answer
+
+        with mock.patch.object(renderer.shutil, 'get_terminal_size', return_value=os.terminal_size((120, height + renderer.MESSAGE_LINES))), \
+                mock.patch.object(sys, 'stdout', Recorder('text')):
+            game.loop()
+
+        newlines, partial_draws = None, 0
+        for kind, text in writes:
+            if kind == 'text':
+                if newlines is not None: newlines += text.count("\n")
+            else:
+                if not text.startswith(renderer.CURSOR_HOME):
+                    assert newlines < renderer.MESSAGE_LINES # The cursor is still on screen, so nothing has scrolled.
+                    partial_draws += 1
+                newlines = 0
+
+        assert partial_draws > 0
+
     def test_player_board_is_reset_when_playing_another_round(self, mock_system, mock_input):
-        with mock.patch.object(knucklebones.random, 'randint') as mock_randint:
-            with mock.patch.object(knucklebones.random, 'shuffle') as mock_shuffle:
+        with mock.patch.object(self.game.rng, 'randint') as mock_randint:
+            with mock.patch.object(self.game.rng, 'shuffle') as mock_shuffle:
                 mock_shuffle.return_value = [self.game.player_one, self.game.player_two]
                 mock_randint.side_effect = [6, 5] * 8 + [6] + [6, 5] * 8 + [6]
 
@@ -159,12 +266,128 @@ class TestKnucklebonesGame:
 
                 self.game.loop()
 
-                assert mock_system.call_count == 34
+                assert mock_system.call_count == 0
                 assert self.game.player_one.score == 162
                 assert self.game.player_two.score == 110
                 assert self.game.player_one.wins == 2
                 assert self.game.player_two.wins == 0
 
+    def test_series_counts_games_and_draws(self, mock_system, mock_input):
+        with mock.patch.object(self.game.rng, 'randint') as mock_randint:
+            mock_randint.side_effect = [6, 5] * 8 + [6]
+            mock_input.side_effect = self.simulated_game_inputs
+
+            self.game.loop()
+
+            assert self.game.games_played == 1
+            assert self.game.draws == 0
+
+    def test_long_series_does_not_grow_the_stack(self):
+        games = sys.getrecursionlimit() + 10
+        game = knucklebones.KnucklebonesGame(['Bot', 'Other Bot'], players=[FirstOpenColumnPlayer(), FirstOpenColumnPlayer()])
+
+        with mock.patch.object(knucklebones, 'print', lambda *args: None), \
+                mock.patch.object(knucklebones, 'render_nice_message', lambda *args: None), \
+                mock.patch.object(knucklebones, 'system', lambda *args: None):
+            game.loop(games=games)
+
+        assert game.games_played == games
+        assert game.player_one.wins + game.player_two.wins + game.draws == games
+
+    def test_events_describe_every_turn(self, capsys):
+        game = knucklebones.KnucklebonesGame(['Bot', 'Other Bot'], players=[FirstOpenColumnPlayer(), FirstOpenColumnPlayer()], rng=random.Random(4))
+        received = []
+        game.events.subscribe(received.append)
+
+        game.loop(games=1)
+
+        names = [event.name for event in received]
+        turns = names.count('roll')
+
+        assert names[0] == 'game_start' and names[-1] == 'game_end'
+        assert names.count('placement') == names.count('removal') == names.count('score_change') == turns
+        assert received[-1].data['scores'] == (game.player_one.score, game.player_two.score)
+        assert received[-2].data['scores'] == received[-1].data['scores']
+
+    def test_events_only_reach_their_subscribers(self, capsys):
+        game = knucklebones.KnucklebonesGame(['Bot', 'Other Bot'], players=[FirstOpenColumnPlayer(), FirstOpenColumnPlayer()], rng=random.Random(4))
+        removals = []
+        game.events.subscribe(removals.append, ['removal'])
+
+        game.loop(games=1)
+
+        assert {event.name for event in removals} == {'removal'}
+        assert all(event.data['removed'] in (0, 1, 2, 3) for event in removals)
+
+    def test_phase_timer_counts_every_turn(self, capsys):
+        game = knucklebones.KnucklebonesGame(['Bot', 'Other Bot'], players=[FirstOpenColumnPlayer(), FirstOpenColumnPlayer()], rng=random.Random(4))
+        game.timer = events.PhaseTimer()
+        rolls = []
+        game.events.subscribe(rolls.append, ['roll'])
+
+        game.loop(games=1)
+
+        assert game.timer.counts == {phase: len(rolls) for phase in ('roll', 'place', 'remove', 'render', 'turn')}
+        assert game.timer.totals['turn'] >= game.timer.totals['render']
+
+    def test_larger_variant_renders_every_column_and_row(self):
+        game = knucklebones.KnucklebonesGame(['Jane', 'Jill'], columns=4, rows=5, faces=8)
+        game.player_one.place_die(8, 3)
+
+        lines = game.grid_lines([game.player_one.matrix, game.player_two.matrix])
+
+        assert len(lines) == 2 * 5 * game.die_height + 3
+        assert len({len(line) for line in lines if line}) == 1
+        assert any('8' in line for line in lines)
+
+    def test_larger_variant_game_ends_on_a_full_board(self, capsys):
+        game = knucklebones.KnucklebonesGame(
+            ['Bot', 'Other Bot'], players=[FirstOpenColumnPlayer(), FirstOpenColumnPlayer()], rng=random.Random(2), columns=2, rows=4, faces=4
+        )
+
+        game.loop(games=1)
+
+        assert any(player.is_matrix_full() for player in game.players)
+        assert all(die <= 4 for player in game.players for column in player.matrix for die in column)
+
+    def test_meter_shows_both_players_chances(self, capsys):
+        game = knucklebones.KnucklebonesGame(
+            ['Bot', 'Other Bot'], players=[FirstOpenColumnPlayer(), FirstOpenColumnPlayer()], rng=random.Random(4), meter=meter.WinProbabilityMeter()
+        )
+        game.renderer.stream = io.StringIO()
+
+        game.loop(games=1)
+        lines = game.grid_lines([game.player_one.matrix, game.player_two.matrix])
+        readings = [line.strip('*').split('*')[0].strip() for line in lines if '% WIN' in line]
+        margin = game.player_one.score - game.player_two.score
+
+        assert len(readings) == 2
+        assert f"{1.0 if margin > 0 else 0.5 if margin == 0 else 0.0:.0%} WIN {margin:+.1f}" in readings # The finished game reads exactly.
+
+    def test_meter_needs_the_standard_board(self):
+        with pytest.raises(ValueError):
+            knucklebones.KnucklebonesGame(['Jane', 'Jill'], columns=4, meter=meter.WinProbabilityMeter())
+
+    def test_recorder_needs_the_standard_board(self, tmp_path):
+        with records.GameRecordWriter(tmp_path / 'games.kbr') as writer:
+            with pytest.raises(ValueError):
+                knucklebones.KnucklebonesGame(['Jane', 'Jill'], faces=8, recorder=writer)
+
+    def test_results_are_kept_in_the_stats_store(self, tmp_path, capsys):
+        with stats.StatsStore(tmp_path / 'stats.db') as store:
+            for seed in range(2):
+                game = knucklebones.KnucklebonesGame(
+                    ['Bot', 'Other Bot'], players=[FirstOpenColumnPlayer(), FirstOpenColumnPlayer()], rng=random.Random(seed), stats=store
+                )
+                game.loop(games=1)
+
+            wins, losses, draws = store.head_to_head(game.player_one.name, game.player_two.name)
+
+        out, err = capsys.readouterr()
+
+        assert wins + losses + draws == 2
+        assert f"ALL TIME: {game.player_one.name} {wins} TO {game.player_two.name} {losses}, WITH {draws} DRAWS" in out
+
     def test_series_winner_determined(self, capfd):
         for i in range(3):
             self.game.player_one.increment_wins()
@@ -203,11 +426,37 @@ class TestKnucklebonesPlayer:
     def test_players_current_column_selection_is_initialized_as_none(self):
         assert self.player.current_column == None
 
+    def test_larger_variant_columns_are_chosen_by_number(self, mock_input):
+        mock_input.side_effect = ['L', '4']
+        self.player.set_board_size(4, 3)
+
+        self.player.add_to_matrix(2)
+
+        assert self.player.matrix[3] == [0, 0, 2]
+        assert mock_input.call_count == 2
+
+    def test_open_cells_are_counted_as_dice_come_and_go(self):
+        for die_value in (2, 2, 3):
+            self.player.place_die(die_value, 0)
+        for column_index in (1, 2):
+            for die_value in (1, 1, 1):
+                self.player.place_die(die_value, column_index)
+
+        assert self.player.is_matrix_full() == True
+
+        self.player.remove_from_matrix(2, 0)
+
+        assert self.player.is_matrix_full() == False
+
     def test_players_column_lookup(self):
         assert self.player.column_lookup['L'] == 0
         assert self.player.column_lookup['M'] == 1
         assert self.player.column_lookup['R'] == 2
 
+    def test_players_share_the_column_lookup(self):
+        assert knucklebones.KnucklebonesPlayer().column_lookup is self.player.column_lookup
+        assert not hasattr(self.player, '__dict__')
+
     def test_player_is_initialized_with_empty_game_board(self):
         assert self.player.matrix == [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
 
@@ -279,8 +528,9 @@ class TestKnucklebonesPlayer:
         for i in range(3):
             self.player.add_to_matrix(2)
 
-        self.player.remove_from_matrix(2, 0)
+        removed = self.player.remove_from_matrix(2, 0)
 
+        assert removed == 3
         assert self.player.matrix == [[0, 0, 0], [0, 0, 0], [0, 0, 0]]
         assert self.player.score == 0
 
@@ -307,3 +557,50 @@ class TestKnucklebonesPlayer:
             self.player.add_to_matrix(3)
 
         assert self.player.is_column_full() == False
+
+    def test_make_move_places_and_knocks_out_in_place(self):
+        opponent = knucklebones.KnucklebonesPlayer()
+        opponent.place_die(4, 1)
+        opponent.place_die(2, 1)
+        opponent.place_die(4, 1)
+        columns = self.player.matrix + opponent.matrix
+
+        move = self.player.make_move(4, 1, opponent)
+
+        assert self.player.matrix == [[0, 0, 0], [0, 0, 4], [0, 0, 0]]
+        assert opponent.matrix == [[0, 0, 0], [0, 0, 2], [0, 0, 0]]
+        assert (move.row, move.opponent_column, move.removed) == (2, (4, 2, 4), 2)
+        assert all(column is original for column, original in zip(self.player.matrix + opponent.matrix, columns))
+
+    def test_unmake_move_restores_both_players(self):
+        rng = random.Random(8)
+        opponent = knucklebones.KnucklebonesPlayer()
+        players = [self.player, opponent]
+        snapshots, moves = [], []
+
+        for turn in range(12):
+            mover, other = players[turn % 2], players[1 - turn % 2]
+            if mover.is_matrix_full(): break
+
+            snapshots.append(copy.deepcopy([(player.matrix, player.column_scores, player._open_cells, player.current_column) for player in players]))
+            die_value = rng.randint(1, 3) # Low faces, so dice are often knocked out.
+            column_index = rng.choice([i for i, column in enumerate(mover.matrix) if not column[0]])
+            moves.append((mover, other, mover.make_move(die_value, column_index, other)))
+
+        while moves:
+            mover, other, move = moves.pop()
+            mover.unmake_move(move, other)
+
+            assert [(player.matrix, player.column_scores, player._open_cells, player.current_column) for player in players] == snapshots.pop()
+
+    def test_make_move_into_a_full_column_changes_nothing(self):
+        opponent = knucklebones.KnucklebonesPlayer()
+        opponent.place_die(5, 0)
+        for i in range(3):
+            self.player.place_die(5, 0)
+
+        with pytest.raises(ValueError):
+            self.player.make_move(5, 0, opponent)
+
+        assert opponent.matrix[0] == [0, 0, 5]
+        assert self.player.score == 45
@@ -0,0 +1,76 @@
+from app import bitboard, knucklebones, mcts
+
+import random
+
+
+class TestRandomPlayout:
+
+    def test_finished_position_result(self):
+        mover = bitboard.pack_matrix([[6, 6, 6], [6, 6, 6], [0, 6, 6]])
+        opponent = bitboard.pack_matrix([[1, 1, 1], [1, 1, 1], [0, 0, 0]])
+
+        # The mover's last die fills the board, and nothing can catch 54 + 54 + 24 from here.
+        assert mcts.random_playout(mover, opponent, random.Random(1)) == 1.0
+
+    def test_playouts_are_reproducible(self):
+        positions = [(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD)] * 20
+
+        assert mcts.run_playouts(positions, 5) == mcts.run_playouts(positions, 5)
+
+
+class TestMonteCarloTreeSearch:
+
+    def test_single_open_column_needs_no_search(self):
+        search = mcts.MonteCarloTreeSearch(playouts=100, seed=1)
+        mover = bitboard.pack_matrix([[1, 2, 3], [0, 0, 0], [4, 5, 6]])
+
+        assert search.best_column(mover, bitboard.EMPTY_BOARD, 2) == 1
+        assert len(search) == 1
+
+    def test_search_knocks_out_opponent_dice(self):
+        search = mcts.MonteCarloTreeSearch(playouts=600, seed=1)
+        opponent = bitboard.pack_matrix([[0, 0, 1], [0, 0, 0], [0, 6, 6]])
+
+        assert search.best_column(bitboard.EMPTY_BOARD, opponent, 6) == 2
+
+    def test_root_statistics_are_kept_between_turns(self):
+        search = mcts.MonteCarloTreeSearch(playouts=200, seed=1)
+
+        search.best_column(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD, 3)
+        statistics = search.root_statistics(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD, 3)
+
+        assert sum(visits for visits, _ in statistics.values()) == 200
+
+    def test_playouts_run_in_worker_processes(self):
+        search = mcts.MonteCarloTreeSearch(playouts=64, workers=2, seed=1)
+
+        try:
+            column_index = search.best_column(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD, 4)
+        finally:
+            search.close()
+
+        assert column_index in (0, 1, 2)
+        assert sum(visits for visits, _ in search.root_statistics(0, 0, 4).values()) == 64
+
+
+class TestMCTSPlayer:
+
+    def test_player_picks_an_open_column(self):
+        player = mcts.MCTSPlayer(playouts=50, seed=1)
+        opponent = knucklebones.KnucklebonesPlayer()
+
+        player.add_to_matrix(2, opponent)
+
+        assert player.is_human == False
+        assert player.current_column in (0, 1, 2)
+        assert player.score == 2
+        assert not hasattr(player, '__dict__')
+
+    def test_player_closes_its_worker_processes(self):
+        with mcts.MCTSPlayer(playouts=32, workers=2, seed=1) as player:
+            column_index = player.pick_column(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD, 4)
+
+            assert player.search._executor is not None
+
+        assert column_index in (0, 1, 2)
+        assert player.search._executor is None
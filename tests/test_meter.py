@@ -0,0 +1,60 @@
+from app import bitboard, meter
+
+import pytest
+
+
+class TestWinProbabilityMeter:
+
+    def setup_method(self, method):
+        self.meter = meter.WinProbabilityMeter(depth=2)
+
+    def test_last_move_is_read_exactly(self):
+        mover = bitboard.pack_matrix([[1, 1, 1], [2, 2, 2], [0, 3, 3]])
+        opponent = bitboard.pack_matrix([[0, 0, 6], [0, 6, 6], [0, 0, 0]])
+
+        win_probability, margin, exact = self.meter.evaluate(mover, opponent)
+
+        assert exact == True
+        assert win_probability == 1.0
+        assert margin == pytest.approx(39 - 30 + (1 + 2 + 15 + 4 + 5 + 6) / 6) # A three turns the pair of threes into a triple.
+
+    def test_open_game_is_an_estimate_near_even(self):
+        win_probability, margin, exact = self.meter.evaluate(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD)
+
+        assert exact == False
+        assert 0.4 < win_probability < 0.6
+
+    def test_big_lead_reads_as_likely_win(self):
+        mover = bitboard.pack_matrix([[0, 6, 6], [0, 5, 5], [0, 0, 0]])
+
+        win_probability, margin, _ = self.meter.evaluate(mover, bitboard.EMPTY_BOARD)
+
+        assert win_probability > 0.7
+        assert margin > 20
+
+    def test_readings_are_cached_across_calls(self):
+        self.meter.evaluate(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD)
+        misses = self.meter.cache.misses
+
+        self.meter.evaluate(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD)
+
+        assert self.meter.cache.misses == misses
+        assert self.meter.cache.hits > 0
+
+    def test_column_order_does_not_change_the_reading(self):
+        mover = bitboard.pack_matrix([[0, 0, 6], [0, 0, 0], [0, 1, 2]])
+        opponent = bitboard.pack_matrix([[0, 0, 3], [0, 0, 4], [0, 0, 0]])
+        swapped_mover = bitboard.pack_matrix([[0, 1, 2], [0, 0, 6], [0, 0, 0]])
+        swapped_opponent = bitboard.pack_matrix([[0, 0, 0], [0, 0, 3], [0, 0, 4]])
+
+        assert self.meter.evaluate(mover, opponent) == self.meter.evaluate(swapped_mover, swapped_opponent)
+
+    def test_cache_stays_bounded(self):
+        small = meter.WinProbabilityMeter(depth=2, cache_size=10)
+
+        small.evaluate(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD)
+
+        assert len(small.cache) == 10
+
+    def test_open_cells_are_counted(self):
+        assert meter.open_cells(bitboard.pack_matrix([[0, 1, 2], [0, 0, 0], [3, 3, 3]])) == 4
@@ -0,0 +1,111 @@
+from app import ai, bitboard, engine, knucklebones, policy, solver
+
+import mock
+import random
+import pytest
+
+
+def random_positions(count, seed):
+    """
+    Distinct canonical positions from random play.
+    """
+    rng = random.Random(seed)
+    positions = set()
+
+    while len(positions) < count:
+        state = engine.KnucklebonesState()
+        for _ in range(rng.randrange(1, 12)):
+            state.apply(rng.randint(1, 6), rng.choice(state.legal_moves()))
+            if state.is_terminal():
+                break
+
+        mover, opponent, _ = solver.canonical_position(*(bitboard.pack_matrix(matrix) for matrix in state.matrices))
+        positions.add((mover, opponent))
+
+    return sorted(positions)
+
+
+class TestPolicyFile:
+
+    def setup_method(self, method):
+        self.mover = bitboard.pack_matrix([[1, 1, 1], [0, 0, 0], [2, 2, 2]])
+        self.opponent = bitboard.pack_matrix([[1, 1, 1], [0, 0, 0], [2, 2, 2]])
+        self.solver = solver.Solver().solve([(self.mover, self.opponent)])
+
+    def test_policy_matches_the_tablebase(self, tmp_path):
+        solver.write_tablebase(tmp_path / 'test.tb', self.solver.entries())
+        policy.write_policy(tmp_path / 'test.kbp', self.solver.policies())
+        tablebase = solver.Tablebase(tmp_path / 'test.tb')
+        policy_file = policy.PolicyFile(tmp_path / 'test.kbp')
+
+        for mover, opponent in self.solver._positions:
+            for die_value in engine.DIE_VALUES:
+                assert policy_file.lookup(mover, opponent, die_value) == tablebase.lookup(mover, opponent, die_value)[1]
+
+        assert len(policy_file) == self.solver.position_count()
+        tablebase.close()
+        policy_file.close()
+
+    def test_column_order_follows_the_caller(self, tmp_path):
+        policy.write_policy(tmp_path / 'test.kbp', self.solver.policies())
+        policy_file = policy.PolicyFile(tmp_path / 'test.kbp')
+
+        swapped_mover = bitboard.pack_matrix([[0, 0, 0], [1, 1, 1], [2, 2, 2]])
+        swapped_opponent = bitboard.pack_matrix([[0, 0, 0], [1, 1, 1], [2, 2, 2]])
+
+        assert policy_file.lookup(self.mover, self.opponent, 4) == 1 # The only open column.
+        assert policy_file.lookup(swapped_mover, swapped_opponent, 4) == 0
+        policy_file.close()
+
+    def test_every_position_is_found_in_a_large_file(self, tmp_path):
+        positions = random_positions(3000, seed=5)
+        rng = random.Random(6)
+        policies = [(solver.position_key(mover, opponent), tuple(rng.randrange(3) for _ in range(6))) for mover, opponent in positions]
+
+        policy.write_policy(tmp_path / 'test.kbp', policies)
+        policy_file = policy.PolicyFile(tmp_path / 'test.kbp')
+
+        for (mover, opponent), (_, best_columns) in zip(positions, policies):
+            assert [policy_file.lookup(mover, opponent, die_value) for die_value in engine.DIE_VALUES] == list(best_columns)
+
+        policy_file.close()
+
+    def test_file_takes_a_few_bits_per_state(self, tmp_path):
+        positions = random_positions(3000, seed=7)
+        policy.write_policy(tmp_path / 'test.kbp', ((solver.position_key(*position), (0,) * 6) for position in positions))
+
+        assert (tmp_path / 'test.kbp').stat().st_size * 8 / (len(positions) * 6) < 6
+
+    def test_unsolved_position_is_missing(self, tmp_path):
+        policy.write_policy(tmp_path / 'test.kbp', self.solver.policies())
+        policy_file = policy.PolicyFile(tmp_path / 'test.kbp')
+
+        assert policy_file.lookup(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD, 1) == None
+        policy_file.close()
+
+    def test_other_files_are_rejected(self, tmp_path):
+        path = tmp_path / 'junk.kbp'
+        path.write_bytes(b'\0' * 64)
+
+        with pytest.raises(ValueError):
+            policy.PolicyFile(path)
+
+    def test_oracle_player_plays_the_policy(self, tmp_path):
+        policy.write_policy(tmp_path / 'test.kbp', self.solver.policies())
+        player = ai.OraclePlayer(str(tmp_path / 'test.kbp'), depth=1)
+        opponent = knucklebones.KnucklebonesPlayer()
+        player._matrix = bitboard.unpack_board(self.mover)
+        opponent._matrix = bitboard.unpack_board(self.opponent)
+
+        with mock.patch.object(player.search, 'best_column') as search:
+            player.choose_column(3, opponent)
+
+        assert player.current_column == 1
+        assert search.called == False
+
+    def test_oracle_player_searches_unknown_positions(self, tmp_path):
+        policy.write_policy(tmp_path / 'test.kbp', self.solver.policies())
+        player = ai.OraclePlayer(str(tmp_path / 'test.kbp'), depth=1)
+
+        assert player.pick_column(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD, 6) in (0, 1, 2)
+
@@ -0,0 +1,152 @@
+from app import engine, knucklebones, records
+
+import mock
+import random
+import pytest
+
+
+def record_random_games(path, count, seed=1):
+    """
+    Play random headless games and record them; returns the engine's final states.
+    """
+    rng = random.Random(seed)
+    states = []
+
+    with records.GameRecordWriter(path) as writer:
+        for _ in range(count):
+            state = engine.KnucklebonesState(player_to_move=rng.randrange(2))
+
+            while not state.is_terminal():
+                die_value = rng.randint(1, 6)
+                column_index = rng.choice(state.legal_moves())
+                writer.record_move(state.player_to_move, die_value, column_index)
+                state.apply(die_value, column_index)
+
+            writer.end_game()
+            states.append(state)
+
+    return states
+
+
+class TestMoveEncoding:
+
+    def test_every_move_fits_in_six_bits(self):
+        for player_index in (0, 1):
+            for column_index in range(3):
+                for die_value in range(1, 7):
+                    move = records.encode_move(player_index, die_value, column_index)
+
+                    assert 0 < move < 64
+                    assert records.decode_move(move) == (player_index, die_value, column_index)
+
+    def test_invalid_move_byte_is_rejected(self):
+        with pytest.raises(ValueError):
+            records.decode_move(0)
+
+    def test_moves_off_the_standard_board_are_rejected(self):
+        for player_index, die_value, column_index in [(0, 8, 0), (0, 0, 1), (1, 3, 3), (2, 3, 0)]:
+            with pytest.raises(ValueError):
+                records.encode_move(player_index, die_value, column_index)
+
+
+class TestGameRecords:
+
+    def test_recorded_games_replay_to_the_same_scores(self, tmp_path):
+        path = tmp_path / 'games.kbr'
+        states = record_random_games(path, 30)
+
+        games = list(records.iter_games(path))
+
+        assert len(games) == 30
+        assert [records.final_scores(game) for game in games] == [state.scores for state in states]
+
+    def test_games_split_across_read_chunks(self, tmp_path):
+        path = tmp_path / 'games.kbr'
+        record_random_games(path, 10)
+
+        assert list(records.iter_games(path, chunk_size=7)) == list(records.iter_games(path))
+
+    def test_writer_appends_to_an_existing_file(self, tmp_path):
+        path = tmp_path / 'games.kbr'
+        record_random_games(path, 3)
+        record_random_games(path, 2, seed=2)
+
+        assert len(list(records.iter_games(path))) == 5
+
+    def test_unfinished_game_is_reported(self, tmp_path):
+        path = tmp_path / 'games.kbr'
+        path.write_bytes(records.HEADER + bytes([records.encode_move(0, 3, 1)]))
+
+        with pytest.raises(ValueError):
+            list(records.iter_games(path))
+
+    def test_names_are_kept_by_seat(self, tmp_path):
+        path = tmp_path / 'games.kbr'
+
+        with records.GameRecordWriter(path) as writer:
+            writer.start_game('Jane', 'Jülle')
+            writer.record_move(1, 6, 0)
+            writer.end_game()
+            writer.record_move(0, 2, 2)
+            writer.end_game()
+
+        assert list(records.iter_named_games(path)) == [
+            (('Jane', 'Jülle'), bytes([records.encode_move(1, 6, 0)])),
+            (None, bytes([records.encode_move(0, 2, 2)])),
+        ]
+        assert list(records.iter_games(path)) == [game for _, game in records.iter_named_games(path)]
+
+    def test_version_1_files_are_read(self, tmp_path):
+        path = tmp_path / 'games.kbr'
+        path.write_bytes(records.RECORD_MAGIC + b'\x01' + bytes([records.encode_move(0, 3, 1)]) + records.END_OF_GAME)
+
+        assert list(records.iter_named_games(path)) == [(None, bytes([records.encode_move(0, 3, 1)]))]
+
+    def test_other_files_are_rejected(self, tmp_path):
+        path = tmp_path / 'games.kbr'
+        path.write_bytes(b'not a record')
+
+        with pytest.raises(ValueError):
+            list(records.iter_games(path))
+
+    def test_game_loop_records_each_move(self, tmp_path):
+        path = tmp_path / 'games.kbr'
+        game = knucklebones.KnucklebonesGame(['Jane', 'Jill'], recorder=records.GameRecordWriter(path))
+
+        with mock.patch.object(game.rng, 'randint') as mock_randint, \
+                mock.patch.object(game.rng, 'shuffle'), \
+                mock.patch.object(knucklebones, 'print'), \
+                mock.patch('app.utils.helpers.input') as mock_input:
+            mock_randint.side_effect = [6, 5] * 8 + [6]
+            mock_input.side_effect = ['ENTER', 'L'] * 6 + ['ENTER', 'R'] * 6 + ['ENTER', 'M'] * 5 + ['N']
+
+            game.loop()
+
+        game.recorder.close()
+        games = list(records.iter_games(path))
+
+        assert len(games) == 1
+        assert len(games[0]) == 17
+        assert records.decode_move(games[0][0]) == (0, 6, 0)
+        assert records.final_scores(games[0]) == (162, 110)
+
+    def test_game_loop_records_players_by_seat(self, tmp_path):
+        path = tmp_path / 'games.kbr'
+        game = knucklebones.KnucklebonesGame(['Jane', 'Jill'], recorder=records.GameRecordWriter(path))
+
+        with mock.patch.object(game.rng, 'randint') as mock_randint, \
+                mock.patch.object(game.rng, 'shuffle') as mock_shuffle, \
+                mock.patch.object(knucklebones, 'print'), \
+                mock.patch('app.utils.helpers.input') as mock_input:
+            mock_randint.side_effect = [6, 5] * 8 + [6]
+            mock_shuffle.side_effect = lambda players: players.reverse() # Jill goes first.
+            mock_input.side_effect = ['ENTER', 'L'] * 6 + ['ENTER', 'R'] * 6 + ['ENTER', 'M'] * 5 + ['N']
+
+            game.loop()
+
+        game.recorder.close()
+        (names, moves), = records.iter_named_games(path)
+
+        assert names == ('JANE', 'JILL')
+        assert records.decode_move(moves[0]) == (1, 6, 0)
+        assert records.final_scores(moves) == (110, 162)
@@ -0,0 +1,74 @@
+from app import renderer
+
+import io
+import os
+
+import mock
+
+
+class TestTerminalRenderer:
+
+    def setup_method(self, method):
+        self.stream = io.StringIO()
+        self.renderer = renderer.TerminalRenderer(self.stream)
+
+    def test_first_frame_clears_and_draws_everything(self):
+        self.renderer.draw(['one', 'two'])
+
+        output = self.stream.getvalue()
+
+        assert output.startswith(renderer.CURSOR_HOME + renderer.CLEAR_SCREEN)
+        assert 'one\ntwo' in output
+        assert output.endswith(renderer.move_to(2) + renderer.CLEAR_SCREEN_END)
+
+    def test_only_changed_lines_are_redrawn(self):
+        self.renderer.draw(['one', 'two', 'three'])
+        self.stream.truncate(0)
+        self.stream.seek(0)
+
+        self.renderer.draw(['one', 'TWO', 'three'])
+
+        output = self.stream.getvalue()
+
+        assert output == renderer.move_to(1) + 'TWO' + renderer.CLEAR_LINE_END + renderer.move_to(3) + renderer.CLEAR_SCREEN_END
+
+    def test_unchanged_frame_only_clears_below(self):
+        self.renderer.draw(['one'])
+        self.stream.truncate(0)
+        self.stream.seek(0)
+
+        self.renderer.draw(['one'])
+
+        assert self.stream.getvalue() == renderer.move_to(1) + renderer.CLEAR_SCREEN_END
+
+    def test_reset_forces_a_full_redraw(self):
+        self.renderer.draw(['one'])
+        self.renderer.reset()
+        self.stream.truncate(0)
+        self.stream.seek(0)
+
+        self.renderer.draw(['one'])
+
+        assert self.stream.getvalue().startswith(renderer.CURSOR_HOME + renderer.CLEAR_SCREEN)
+
+    def test_frame_of_a_different_height_is_redrawn_in_full(self):
+        self.renderer.draw(['one'])
+        self.stream.truncate(0)
+        self.stream.seek(0)
+
+        self.renderer.draw(['one', 'two'])
+
+        assert self.stream.getvalue().startswith(renderer.CURSOR_HOME + renderer.CLEAR_SCREEN)
+
+    def test_frame_taller_than_the_terminal_is_redrawn_in_full(self):
+        with mock.patch.object(renderer.shutil, 'get_terminal_size', return_value=os.terminal_size((80, 5))):
+            self.renderer.draw(['one', 'two'])
+            self.stream.truncate(0)
+            self.stream.seek(0)
+
+            self.renderer.draw(['one', 'TWO'])
+
+        output = self.stream.getvalue()
+
+        assert output.startswith(renderer.CURSOR_HOME + renderer.CLEAR_SCREEN)
+        assert 'one\nTWO' in output
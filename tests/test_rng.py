@@ -0,0 +1,48 @@
+from app import engine
+from app.rng import DiceStream, spawn_rngs, spawn_seeds
+
+import random
+
+
+class TestSpawnSeeds:
+
+    def test_same_seed_spawns_the_same_children(self):
+        assert spawn_seeds(42, 4) == spawn_seeds(42, 4)
+
+    def test_children_are_distinct(self):
+        assert len(set(spawn_seeds(42, 1000))) == 1000
+
+    def test_child_does_not_depend_on_how_many_are_spawned(self):
+        assert spawn_seeds(42, 10)[7] == spawn_seeds(42, 1, start=7)[0]
+
+    def test_different_parents_spawn_different_children(self):
+        assert spawn_seeds(1, 3) != spawn_seeds(2, 3)
+
+    def test_spawned_rngs_are_independent_streams(self):
+        first, second = spawn_rngs(3, 2)
+
+        assert [first.random() for _ in range(5)] != [second.random() for _ in range(5)]
+
+
+class TestDiceStream:
+
+    def test_take_returns_exactly_the_count(self):
+        assert len(DiceStream(random.Random(1), block_size=16).take(100)) == 100
+
+    def test_dice_are_in_range_and_roughly_uniform(self):
+        dice = DiceStream(random.Random(1)).take(60000)
+        counts = [dice.count(face) for face in range(1, engine.DIE_FACES + 1)]
+
+        assert min(dice) == 1 and max(dice) == engine.DIE_FACES
+        assert max(counts) - min(counts) < 600
+
+    def test_same_seed_rolls_the_same_dice(self):
+        assert DiceStream(random.Random(9)).take(50) == DiceStream(random.Random(9)).take(50)
+
+    def test_stream_feeds_a_headless_game(self):
+        rng = random.Random(2)
+        policies = [lambda state, die: engine.random_policy(state, die, rng)] * 2
+
+        state = engine.play_headless_game(policies, dice=DiceStream(random.Random(2)))
+
+        assert state.is_terminal() == True
@@ -0,0 +1,190 @@
+from app import server, stats
+
+import asyncio
+import threading
+
+
+def run_with_server(scenario, **options):
+    """
+    Start a server on a free port, run the scenario coroutine against it, and shut it down.
+    """
+    async def main():
+        knucklebones_server = server.KnucklebonesServer(port=0, seed=1, **options)
+        await knucklebones_server.start()
+
+        try:
+            return await scenario(knucklebones_server)
+        finally:
+            await knucklebones_server.close()
+
+    return asyncio.run(main())
+
+async def read_until(reader, command):
+    while True:
+        line = (await reader.readline()).decode().strip()
+        if line.startswith(command):
+            return line
+
+async def send(writer, line):
+    writer.write((line + "\n").encode())
+    await writer.drain()
+
+
+class TestKnucklebonesServer:
+
+    def test_board_format(self):
+        assert server.format_board([[0, 0, 3], [0, 2, 5], [1, 1, 1]]) == '003,025,111'
+
+    def test_many_concurrent_matches_finish(self):
+        async def scenario(knucklebones_server):
+            games, seconds = await server.run_load_test('127.0.0.1', knucklebones_server.port, 40, seed=2)
+            return games, knucklebones_server.matches_finished
+
+        games, finished = run_with_server(scenario)
+
+        assert games == 20
+        assert finished == 20
+
+    def test_invalid_commands_are_rejected_and_disconnect_forfeits(self):
+        async def scenario(knucklebones_server):
+            first_reader, first_writer = await asyncio.open_connection('127.0.0.1', knucklebones_server.port)
+            await send(first_writer, 'JOIN Jane')
+            assert await read_until(first_reader, 'WAITING') == 'WAITING'
+
+            second_reader, second_writer = await asyncio.open_connection('127.0.0.1', knucklebones_server.port)
+            await send(second_writer, 'JOIN Jill')
+
+            first_start = await read_until(first_reader, 'START')
+            if first_start.endswith('FIRST'):
+                mover, mover_writer, other = first_reader, first_writer, second_reader
+            else:
+                mover, mover_writer, other = second_reader, second_writer, first_reader
+
+            await read_until(mover, 'YOUR_TURN')
+            await send(mover_writer, 'PLACE X')
+            error = await read_until(mover, 'ERROR')
+
+            mover_writer.close()
+            result = await read_until(other, 'GAME_OVER')
+
+            second_writer.close()
+            first_writer.close()
+
+            return error, result
+
+        error, result = run_with_server(scenario)
+
+        assert error.startswith('ERROR Expected PLACE')
+        assert result.startswith('GAME_OVER FORFEIT_WIN')
+
+    def test_idle_player_hanging_up_forfeits(self):
+        async def scenario(knucklebones_server):
+            players = []
+            for name in ('Jane', 'Jill'):
+                reader, writer = await asyncio.open_connection('127.0.0.1', knucklebones_server.port)
+                await send(writer, f"JOIN {name}")
+                players.append((reader, writer))
+
+            starts = [await read_until(reader, 'START') for reader, _ in players]
+            mover = 0 if starts[0].endswith('FIRST') else 1
+            (reader, writer), (_, idle_writer) = players[mover], players[1 - mover]
+            idle_writer.close()
+
+            while True:
+                line = (await asyncio.wait_for(reader.readline(), 2)).decode().strip()
+                if not line or line.startswith('GAME_OVER'):
+                    break
+                elif line.startswith('YOUR_TURN'):
+                    await send(writer, f"PLACE {line.split()[2][0]}")
+
+            writer.close()
+
+            return line
+
+        assert run_with_server(scenario).startswith('GAME_OVER FORFEIT_WIN')
+
+    def test_overlong_line_is_an_error_and_disconnects(self):
+        async def scenario(knucklebones_server):
+            reader, writer = await asyncio.open_connection('127.0.0.1', knucklebones_server.port)
+            await send(writer, 'JOIN ' + 'x' * 4096)
+
+            error = await read_until(reader, 'ERROR')
+            rest = await reader.read()
+            writer.close()
+
+            return error, rest
+
+        error, rest = run_with_server(scenario)
+
+        assert error == 'ERROR Line too long'
+        assert rest == b'' # The server hung up.
+
+    def test_player_who_hangs_up_while_waiting_is_let_go(self):
+        async def scenario(knucklebones_server):
+            first_reader, first_writer = await asyncio.open_connection('127.0.0.1', knucklebones_server.port)
+            await send(first_writer, 'JOIN Jane')
+            await read_until(first_reader, 'WAITING')
+            first_writer.write_eof()
+            await asyncio.sleep(0.05)
+
+            second_reader, second_writer = await asyncio.open_connection('127.0.0.1', knucklebones_server.port)
+            await send(second_writer, 'JOIN Jill')
+            waiting = await read_until(second_reader, 'WAITING')
+
+            rest = await asyncio.wait_for(first_reader.read(), 2) # The server closes the first connection.
+            first_writer.close()
+            second_writer.close()
+
+            return waiting, rest
+
+        assert run_with_server(scenario) == ('WAITING', b'')
+
+    def test_slow_player_forfeits(self):
+        async def scenario(knucklebones_server):
+            readers = []
+            for name in ('Jane', 'Jill'):
+                reader, writer = await asyncio.open_connection('127.0.0.1', knucklebones_server.port)
+                await send(writer, f"JOIN {name}")
+                readers.append((reader, writer))
+
+            results = [await read_until(reader, 'GAME_OVER') for reader, _ in readers]
+
+            for _, writer in readers: writer.close()
+
+            return sorted(result.split()[1] for result in results)
+
+        assert run_with_server(scenario, turn_timeout=0.2) == ['FORFEIT_LOSS', 'FORFEIT_WIN']
+
+    def test_finished_matches_are_recorded(self, tmp_path):
+        store = stats.StatsStore(tmp_path / 'stats.db', flush_interval=3600)
+
+        async def scenario(knucklebones_server):
+            await server.run_load_test('127.0.0.1', knucklebones_server.port, 8, seed=3)
+
+        run_with_server(scenario, stats=store)
+
+        assert store.game_count() == 4
+        assert sum(games for *_, games in store.leaderboard()) == 8
+        store.close()
+
+    def test_stats_are_written_on_the_writer_thread(self, tmp_path):
+        store = stats.StatsStore(tmp_path / 'stats.db', flush_interval=3600)
+        threads = []
+        flush = store.flush
+
+        def tracked_flush():
+            threads.append(threading.current_thread().name)
+            return flush()
+
+        store.flush = tracked_flush
+
+        async def scenario(knucklebones_server):
+            await server.run_load_test('127.0.0.1', knucklebones_server.port, 8, seed=3)
+            return knucklebones_server._flush_timer
+
+        timer = run_with_server(scenario, stats=store)
+
+        assert timer is not None # One timer covers every match queued since the last write.
+        assert len(threads) == 1 and threads[0].startswith('stats-writer') # Written once, as the server closed.
+        assert store.pending == 0
+        store.close()
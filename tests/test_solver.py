@@ -0,0 +1,111 @@
+from app import ai, bitboard, knucklebones, solver
+
+import pytest
+
+
+class TestCanonicalPosition:
+
+    def test_dice_order_inside_a_column_is_ignored(self):
+        first = solver.canonical_position(bitboard.pack_matrix([[0, 2, 5], [0, 0, 0], [0, 0, 0]]), 0)
+        second = solver.canonical_position(bitboard.pack_matrix([[0, 5, 2], [0, 0, 0], [0, 0, 0]]), 0)
+
+        assert first[:2] == second[:2]
+
+    def test_column_pairs_are_interchangeable(self):
+        mover = bitboard.pack_matrix([[0, 0, 6], [0, 0, 0], [0, 1, 2]])
+        opponent = bitboard.pack_matrix([[0, 0, 3], [0, 0, 4], [0, 0, 0]])
+        swapped_mover = bitboard.pack_matrix([[0, 1, 2], [0, 0, 6], [0, 0, 0]])
+        swapped_opponent = bitboard.pack_matrix([[0, 0, 0], [0, 0, 3], [0, 0, 4]])
+
+        canonical = solver.canonical_position(mover, opponent)
+        swapped = solver.canonical_position(swapped_mover, swapped_opponent)
+
+        assert canonical[:2] == swapped[:2]
+
+    def test_order_maps_canonical_columns_back(self):
+        mover = bitboard.pack_matrix([[0, 0, 6], [0, 0, 0], [0, 0, 0]])
+
+        canonical_mover, _, order = solver.canonical_position(mover, 0)
+
+        assert bitboard.unpack_board(canonical_mover)[order.index(0)] == [0, 0, 6]
+
+
+class TestSolver:
+
+    def test_last_move_is_solved_exactly(self):
+        mover = bitboard.pack_matrix([[1, 1, 1], [2, 2, 2], [0, 3, 3]])
+        opponent = bitboard.pack_matrix([[0, 0, 6], [0, 6, 6], [0, 0, 0]])
+
+        knucklebones_solver = solver.Solver().solve([(mover, opponent)])
+
+        # The mover already leads 39 to 30 and the last die can only add to that.
+        assert knucklebones_solver.position_count() == 1
+        assert knucklebones_solver.win_probability(mover, opponent) == 1.0
+
+    def test_contested_column_with_cycles_converges(self):
+        mover = bitboard.pack_matrix([[1, 1, 1], [2, 2, 2], [0, 0, 3]])
+        opponent = bitboard.pack_matrix([[1, 1, 1], [2, 2, 2], [0, 0, 0]])
+
+        knucklebones_solver = solver.Solver().solve([(mover, opponent)])
+        win_probability = knucklebones_solver.win_probability(mover, opponent)
+
+        assert knucklebones_solver.position_count() > 1
+        assert 0.0 < win_probability < 1.0
+
+    def test_finished_game_is_rejected(self):
+        full = bitboard.pack_matrix([[1, 1, 1], [2, 2, 2], [3, 3, 3]])
+
+        with pytest.raises(ValueError):
+            solver.Solver().solve([(full, bitboard.EMPTY_BOARD)])
+
+    def test_limit_is_enforced(self):
+        with pytest.raises(solver.SolverLimitError):
+            solver.Solver(max_positions=50).solve([(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD)])
+
+
+class TestTablebase:
+
+    def setup_method(self, method):
+        self.mover = bitboard.pack_matrix([[1, 1, 1], [0, 0, 3], [2, 2, 2]])
+        self.opponent = bitboard.pack_matrix([[1, 1, 1], [0, 0, 0], [2, 2, 2]])
+        self.solver = solver.Solver().solve([(self.mover, self.opponent)])
+
+    def test_round_trip(self, tmp_path):
+        path = tmp_path / 'test.tb'
+        solver.write_tablebase(path, self.solver.entries())
+        tablebase = solver.Tablebase(path)
+
+        win_probability, best_column = tablebase.lookup(self.mover, self.opponent, 3)
+
+        assert len(tablebase) == self.solver.position_count() * 6
+        assert best_column == 1 # The only open column, in the caller's column order.
+        assert 0.0 <= win_probability <= 1.0
+        tablebase.close()
+
+    def test_unsolved_position_is_missing(self, tmp_path):
+        path = tmp_path / 'test.tb'
+        solver.write_tablebase(path, self.solver.entries())
+        tablebase = solver.Tablebase(path)
+
+        assert tablebase.lookup(bitboard.EMPTY_BOARD, bitboard.EMPTY_BOARD, 1) == None
+        tablebase.close()
+
+    def test_other_files_are_rejected(self, tmp_path):
+        path = tmp_path / 'junk.tb'
+        path.write_bytes(b'\0' * 64)
+
+        with pytest.raises(ValueError):
+            solver.Tablebase(path)
+
+    def test_tablebase_player_uses_solved_move(self, tmp_path):
+        path = tmp_path / 'test.tb'
+        solver.write_tablebase(path, self.solver.entries())
+
+        player = ai.TablebasePlayer(str(path), depth=1)
+        opponent = knucklebones.KnucklebonesPlayer()
+        player._matrix = bitboard.unpack_board(self.mover)
+        opponent._matrix = bitboard.unpack_board(self.opponent)
+
+        player.choose_column(3, opponent)
+
+        assert player.current_column == 1
@@ -0,0 +1,99 @@
+from app import stats
+
+import pytest
+import sqlite3
+
+
+class TestStatsStore:
+
+    @pytest.fixture(autouse=True)
+    def store(self, tmp_path):
+        self.path = tmp_path / 'stats.db'
+        self.stats = stats.StatsStore(self.path, batch_size=3, flush_interval=3600)
+        yield
+        self.stats.close()
+
+    def test_games_are_written_in_batches(self):
+        self.stats.record_game('Jane', 'Jill', 30, 20)
+        self.stats.record_game('Jane', 'Jill', 10, 20)
+
+        assert self.stats.pending == 2
+        assert self.stats.batches_written == 0
+
+        self.stats.record_game('Jane', 'Jill', 15, 15)
+
+        assert self.stats.pending == 0
+        assert self.stats.batches_written == 1
+
+    def test_queries_write_queued_games_first(self):
+        self.stats.record_game('Jane', 'Jill', 30, 20)
+
+        assert self.stats.player_record('Jane') == (1, 0, 0)
+        assert self.stats.pending == 0
+
+    def test_long_wait_writes_the_queue(self):
+        self.stats.flush_interval = 0
+
+        self.stats.record_game('Jane', 'Jill', 30, 20)
+
+        assert self.stats.pending == 0
+
+    def test_leaderboard_orders_by_wins_then_losses(self):
+        for scores in [(30, 20), (30, 20), (10, 20)]:
+            self.stats.record_game('Jane', 'Jill', *scores)
+        self.stats.record_game('Jack', 'Jill', 40, 5)
+        self.stats.record_game('Jack', 'Jane', 5, 40)
+
+        assert self.stats.leaderboard() == [
+            ('Jane', 3, 1, 0, 4),
+            ('Jack', 1, 1, 0, 2),
+            ('Jill', 1, 3, 0, 4),
+        ]
+        assert [row[0] for row in self.stats.leaderboard(limit=1)] == ['Jane']
+        assert [row[0] for row in self.stats.leaderboard(min_games=3)] == ['Jane', 'Jill']
+
+    def test_leaderboard_reads_the_ranking_index(self):
+        plan = self.stats._connection.execute("EXPLAIN QUERY PLAN " + stats.LEADERBOARD_QUERY, (1, 10)).fetchall()
+
+        assert [row[3] for row in plan] == ['SCAN players USING INDEX players_by_rank'] # No sort of the whole table.
+
+    def test_totals_are_filled_in_for_older_stores(self, tmp_path):
+        self.stats.record_game('Jane', 'Jill', 30, 20)
+        self.stats.record_game('Jill', 'Jane', 25, 25)
+        self.stats.close()
+
+        connection = sqlite3.connect(self.path)
+        connection.executescript("""
+            DROP INDEX players_by_rank;
+            CREATE TABLE old_players AS SELECT id, name FROM players;
+            DROP TABLE players;
+            ALTER TABLE old_players RENAME TO players;
+        """)
+        connection.close()
+
+        self.stats = stats.StatsStore(self.path)
+
+        assert self.stats.leaderboard() == [('Jane', 1, 0, 1, 2), ('Jill', 0, 1, 1, 2)]
+
+    def test_head_to_head_counts_one_pairing(self):
+        self.stats.record_game('Jane', 'Jill', 30, 20)
+        self.stats.record_game('Jill', 'Jane', 25, 25)
+        self.stats.record_game('Jane', 'Jack', 5, 40)
+
+        assert self.stats.head_to_head('Jane', 'Jill') == (1, 0, 1)
+        assert self.stats.head_to_head('Jill', 'Jane') == (0, 1, 1)
+        assert self.stats.player_record('Jane') == (1, 1, 1)
+
+    def test_unknown_player_has_an_empty_record(self):
+        assert self.stats.player_record('Nobody') == (0, 0, 0)
+        assert self.stats.head_to_head('Nobody', 'Jane') == (0, 0, 0)
+
+    def test_results_outlive_the_store(self):
+        self.stats.record_game('Jane', 'Jill', 30, 20)
+        self.stats.close()
+
+        self.stats = stats.StatsStore(self.path)
+        self.stats.record_game('Jill', 'Jane', 30, 20)
+
+        assert self.stats.game_count() == 2
+        assert self.stats.head_to_head('Jane', 'Jill') == (1, 1, 0)
@@ -0,0 +1,93 @@
+from app import tournament
+
+import random
+import pytest
+
+
+class TestPlayMatch:
+
+    def test_game_is_played_to_the_end(self):
+        rng = random.Random(1)
+        policies = (tournament.STRATEGIES['random'](rng), tournament.STRATEGIES['greedy'](rng))
+
+        score_one, score_two = tournament.play_game(policies, rng)
+
+        assert score_one > 0 or score_two > 0
+
+    def test_matches_are_reproducible(self):
+        assert tournament.play_match('random', 'greedy', 10, 4) == tournament.play_match('random', 'greedy', 10, 4)
+
+    def test_match_returns_every_game(self):
+        strategy_one, strategy_two, results = tournament.play_match('random', 'random', 7, 1)
+
+        assert (strategy_one, strategy_two) == ('random', 'random')
+        assert len(results) == 7
+
+
+class TestEloRatings:
+
+    def test_stronger_strategy_is_rated_higher(self):
+        ratings = tournament.EloRatings(['a', 'b'])
+        ratings.add('a', 'b', 75, 100)
+
+        fitted = ratings.ratings()
+
+        assert fitted['a'][0] > 1500 > fitted['b'][0]
+        assert fitted['a'][0] - fitted['b'][0] == pytest.approx(190, abs=10) # 75% expected score is about 191 Elo.
+
+    def test_interval_narrows_with_more_games(self):
+        few = tournament.EloRatings(['a', 'b'])
+        few.add('a', 'b', 50, 100)
+        many = tournament.EloRatings(['a', 'b'])
+        many.add('a', 'b', 5000, 10000)
+
+        assert many.ratings()['a'][1] < few.ratings()['a'][1]
+
+    def test_unbeaten_strategy_has_a_finite_rating(self):
+        ratings = tournament.EloRatings(['a', 'b'])
+        ratings.add('a', 'b', 10, 10)
+
+        assert ratings.ratings()['a'][0] < 3000
+
+
+class TestTournament:
+
+    def test_unknown_strategy_is_rejected(self):
+        with pytest.raises(ValueError):
+            tournament.Tournament(['random', 'nope'])
+
+    def test_round_robin_plays_every_pairing(self):
+        streamed = []
+        knucklebones_tournament = tournament.Tournament(
+            ['random', 'greedy', 'expectimax-2'], games_per_match=20, chunk_size=10, seed=1,
+            on_result=lambda one, two, results: streamed.append((one, two, len(results)))
+        )
+
+        table = knucklebones_tournament.round_robin()
+
+        assert len(streamed) == 6
+        assert all(standing.games == 40 for standing in table)
+        assert table[-1].name == 'random'
+
+    def test_swiss_pairs_every_strategy_each_round(self, monkeypatch):
+        monkeypatch.setitem(tournament.STRATEGIES, 'random-2', tournament.STRATEGIES['random'])
+        knucklebones_tournament = tournament.Tournament(['random', 'greedy', 'expectimax-2', 'random-2'], games_per_match=10, seed=1)
+
+        table = knucklebones_tournament.swiss(rounds=2)
+
+        assert all(standing.games == 20 for standing in table)
+
+    def test_worker_processes_give_the_same_totals(self):
+        knucklebones_tournament = tournament.Tournament(['random', 'greedy'], games_per_match=40, chunk_size=10, workers=2, seed=1)
+
+        table = knucklebones_tournament.round_robin()
+
+        assert sum(standing.wins + standing.draws / 2 for standing in table) == 40
+
+    def test_parallel_results_match_serial_results(self):
+        tables = [
+            tournament.Tournament(['random', 'greedy'], games_per_match=40, chunk_size=10, workers=workers, seed=3).round_robin()
+            for workers in (1, 2)
+        ]
+
+        assert [(s.name, s.wins, s.losses, s.draws) for s in tables[0]] == [(s.name, s.wins, s.losses, s.draws) for s in tables[1]]